@@ -1,9 +1,15 @@
+from domain.exceptions.pagination import InvalidCursorException
 from domain.exceptions.promo import (
     PromoCodeAlreadyExistsException,
     PromoCodeAlreadyUsedException,
     PromoCodeExpiredException,
     PromoCodeNotFoundException,
 )
+from domain.exceptions.storefront import (
+    CardNotFoundException,
+    CardPriceMismatchException,
+    PromoOutOfStockException,
+)
 from fastapi import FastAPI, Request
 from fastapi.responses import ORJSONResponse
 
@@ -24,3 +30,19 @@ def register_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(PromoCodeAlreadyUsedException)
     async def promo_already_used_handler(request: Request, exc: PromoCodeAlreadyUsedException):
         return ORJSONResponse(status_code=400, content={"detail": exc.message})
+
+    @app.exception_handler(InvalidCursorException)
+    async def invalid_cursor_handler(request: Request, exc: InvalidCursorException):
+        return ORJSONResponse(status_code=400, content={"detail": exc.message})
+
+    @app.exception_handler(CardNotFoundException)
+    async def card_not_found_handler(request: Request, exc: CardNotFoundException):
+        return ORJSONResponse(status_code=404, content={"detail": exc.message})
+
+    @app.exception_handler(CardPriceMismatchException)
+    async def card_price_mismatch_handler(request: Request, exc: CardPriceMismatchException):
+        return ORJSONResponse(status_code=409, content={"detail": exc.message})
+
+    @app.exception_handler(PromoOutOfStockException)
+    async def promo_out_of_stock_handler(request: Request, exc: PromoOutOfStockException):
+        return ORJSONResponse(status_code=409, content={"detail": exc.message})
@@ -0,0 +1,13 @@
+from .idempotency import IdempotencyMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .query_source import QuerySourceMiddleware
+from .rate_limit import RateLimitMiddleware
+
+__all__ = (
+    "RateLimitMiddleware",
+    "IdempotencyMiddleware",
+    "MetricsMiddleware",
+    "ProfilingMiddleware",
+    "QuerySourceMiddleware",
+)
@@ -0,0 +1,149 @@
+import hashlib
+import re
+from typing import List, Optional, Sequence
+
+from fastapi.responses import ORJSONResponse
+from infra.cache.idempotency import IdempotencyKeyInFlight, IdempotencyStore, StoredResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+
+# Создание и погашение промокодов, которые бот и клиенты повторяют при сбоях сети
+IDEMPOTENT_PATHS = (
+    re.compile(r"^/promocode/?$"),
+    re.compile(r"^/promocode/[^/]+/use$"),
+    re.compile(r"^/promocode/code/[^/]+/use$"),
+    re.compile(r"^/api/v1/set_by_user_card$"),
+)
+
+
+def _error(status_code: int, detail: str) -> ORJSONResponse:
+    return ORJSONResponse(status_code=status_code, content={"detail": detail})
+
+
+class IdempotencyMiddleware:
+    """Повтор ответа на POST-запросы с заголовком Idempotency-Key
+
+    Первый ответ (кроме 429 и 5xx) сохраняется в Redis и при повторах
+    отдается без обращения к маршрутам и базе. Тот же ключ с другими
+    параметрами или телом запроса отклоняется с 422.
+    """
+
+    def __init__(self, app: ASGIApp, paths: Sequence[re.Pattern] = IDEMPOTENT_PATHS) -> None:
+        self.app = app
+        self.paths = paths
+        self._store: Optional[IdempotencyStore] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not any(path.match(scope["path"]) for path in self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        idempotency_key = Headers(scope=scope).get(IDEMPOTENCY_HEADER)
+        store = await self._get_store(scope) if idempotency_key else None
+        if store is None:
+            await self.app(scope, receive, send)
+            return
+
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await _error(400, "Слишком длинный Idempotency-Key")(scope, receive, send)
+            return
+
+        key = f"{scope['path']}:{idempotency_key}"
+        request_body = await self._read_body(receive)
+        fingerprint = hashlib.sha256(scope["query_string"] + b"\n" + request_body).hexdigest()
+        try:
+            stored = await store.begin(key)
+        except IdempotencyKeyInFlight:
+            await _error(409, "Запрос с этим Idempotency-Key еще выполняется")(scope, receive, send)
+            return
+
+        if stored is not None:
+            await self._replay(stored, fingerprint, scope, receive, send)
+            return
+
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": request_body, "more_body": False}
+            return await receive()
+
+        start: Optional[Message] = None
+        body: List[bytes] = []
+
+        async def send_and_capture(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_and_capture)
+        except BaseException:
+            await store.abort(key)
+            raise
+
+        if start is None or start["status"] == 429 or start["status"] >= 500:
+            await store.abort(key)
+            return
+
+        await store.complete(
+            key,
+            StoredResponse(
+                fingerprint=fingerprint,
+                status=start["status"],
+                headers=list(start.get("headers", [])),
+                body=b"".join(body),
+            ),
+        )
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        # Тело нужно целиком до вызова маршрута: оно входит в отпечаток запроса
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    async def _replay(
+        stored: StoredResponse, fingerprint: str, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if stored.fingerprint != fingerprint:
+            await _error(422, "Idempotency-Key уже использован с другими параметрами")(
+                scope, receive, send
+            )
+            return
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": stored.status,
+                "headers": [*stored.headers, (b"idempotent-replayed", b"true")],
+            }
+        )
+        await send({"type": "http.response.body", "body": stored.body})
+
+    async def _get_store(self, scope: Scope) -> Optional[IdempotencyStore]:
+        if self._store is None:
+            container = getattr(scope["app"].state, "dishka_container", None)
+            if container is None:
+                return None
+            self._store = await container.get(IdempotencyStore)
+        return self._store
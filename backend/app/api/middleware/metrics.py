@@ -0,0 +1,42 @@
+import time
+
+from infra.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_PROGRESS
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+METRICS_PATH = "/metrics"
+# Запросы, не попавшие ни в один маршрут, не должны плодить значения метки
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """Гистограммы длительности запросов по шаблону маршрута и статусу"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Маршрутизатор FastAPI кладет найденный маршрут в тот же scope
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method, getattr(route, "path_format", UNMATCHED_ROUTE), str(status)
+            ).observe(time.perf_counter() - started)
+            in_progress.dec()
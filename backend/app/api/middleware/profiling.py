@@ -0,0 +1,157 @@
+import logging
+import random
+import re
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List, Optional
+
+import pyinstrument
+from pyinstrument import Profiler
+from pyinstrument.renderers import SpeedscopeRenderer
+from starlette.datastructures import Headers
+from starlette.responses import HTMLResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Значения заголовка: профиль в файл или вместо ответа
+PROFILE_TO_FILE = "1"
+PROFILE_INLINE_HTML = "html"
+PROFILE_INLINE_SPEEDSCOPE = "speedscope"
+TOP_ALLOCATIONS = 30
+PYINSTRUMENT_FILES = str(Path(pyinstrument.__file__).parent / "*")
+
+
+class ProfilingMiddleware:
+    """Профилирование отдельных запросов сэмплирующим профилировщиком
+
+    Запрос профилируется по заголовку (см. PROFILE_* значения) или случайно
+    с вероятностью sample_rate. Профиль в формате speedscope пишется в
+    output_dir, его имя возвращается в заголовке X-Profile-File; html и
+    speedscope возвращают профиль вместо ответа. С trace_allocations для
+    профилируемого запроса включается tracemalloc, и в заголовок
+    X-Profile-Memory пишутся пик и число живых блоков памяти (учитываются и
+    выделения конкурентных запросов этого воркера).
+
+    В воркере одновременно профилируется один запрос, остальные
+    обрабатываются как обычно. Без PROFILING_ENABLED middleware не
+    добавляется в приложение и ничего не стоит.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        header: str,
+        sample_rate: float,
+        interval: float,
+        output_dir: str,
+        trace_allocations: bool,
+    ) -> None:
+        self.app = app
+        self.header = header.lower()
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.output_dir = Path(output_dir)
+        self.trace_allocations = trace_allocations
+        self._active = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._active:
+            await self.app(scope, receive, send)
+            return
+
+        mode = Headers(scope=scope).get(self.header)
+        if mode is None and self.sample_rate and random.random() < self.sample_rate:
+            mode = PROFILE_TO_FILE
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        try:
+            await self._profile(mode, scope, receive, send)
+        finally:
+            self._active = False
+
+    async def _profile(self, mode: str, scope: Scope, receive: Receive, send: Send) -> None:
+        inline = mode in (PROFILE_INLINE_HTML, PROFILE_INLINE_SPEEDSCOPE)
+        messages: List[Message] = []
+        extra_headers: List[tuple[bytes, bytes]] = []
+
+        async def send_or_hold(message: Message) -> None:
+            # Ответ отдается после остановки профилировщика: нужны его заголовки
+            messages.append(message)
+
+        tracing = self.trace_allocations and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_or_hold)
+        finally:
+            profiler.stop()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            allocations = self._stop_tracing() if tracing else None
+
+        if allocations is not None:
+            extra_headers.append((b"x-profile-memory", allocations[0].encode()))
+
+        if inline:
+            if mode == PROFILE_INLINE_HTML:
+                response: Response = HTMLResponse(profiler.output_html())
+            else:
+                response = Response(
+                    profiler.output(renderer=SpeedscopeRenderer()), media_type="application/json"
+                )
+            response.raw_headers.extend(extra_headers)
+            await response(scope, receive, send)
+            return
+
+        path = self._write(scope, profiler, elapsed_ms, allocations)
+        if path is not None:
+            extra_headers.append((b"x-profile-file", path.name.encode()))
+
+        for message in messages:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *extra_headers]}
+            await send(message)
+
+    @staticmethod
+    def _stop_tracing() -> tuple[str, List[str]]:
+        # Выделения самого профилировщика не относятся к запросу
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, PYINSTRUMENT_FILES),
+                tracemalloc.Filter(False, tracemalloc.__file__),
+            ]
+        )
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        statistics = snapshot.statistics("lineno")
+        summary = f"peak={peak}; blocks={sum(stat.count for stat in statistics)}"
+        return summary, [str(stat) for stat in statistics[:TOP_ALLOCATIONS]]
+
+    def _write(
+        self,
+        scope: Scope,
+        profiler: Profiler,
+        elapsed_ms: float,
+        allocations: Optional[tuple[str, List[str]]],
+    ) -> Optional[Path]:
+        route = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{route}-{elapsed_ms:.0f}ms"
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / f"{name}.speedscope.json"
+            path.write_text(profiler.output(renderer=SpeedscopeRenderer()))
+            if allocations is not None:
+                (self.output_dir / f"{name}.alloc.txt").write_text(
+                    "\n".join([allocations[0], *allocations[1]])
+                )
+        except OSError as e:
+            logger.warning("Profile write failed: %s", e)
+            return None
+        return path
@@ -0,0 +1,23 @@
+from infra.db.slow_query import request_scope
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class QuerySourceMiddleware:
+    """Связывает SQL-запросы с HTTP-запросом, в котором они выполняются
+
+    Журнал медленных запросов берет из этого scope метод и шаблон маршрута.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
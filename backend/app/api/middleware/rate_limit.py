@@ -0,0 +1,77 @@
+import math
+import re
+from typing import Optional, Sequence
+
+from fastapi.responses import ORJSONResponse
+from infra.cache.rate_limit import TokenBucket, TokenBucketRateLimiter
+from starlette.datastructures import QueryParams
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Маршруты погашения промокодов: каждое обращение держит соединение из пула
+RATE_LIMITED_PATHS = (
+    re.compile(r"^/promocode/[^/]+/use$"),
+    re.compile(r"^/promocode/code/[^/]+/use$"),
+)
+
+
+class RateLimitMiddleware:
+    """Ограничение частоты погашений по user_id и IP клиента
+
+    Проверка выполняется до маршрутизации, поэтому отклоненный запрос
+    получает 429 раньше, чем DI откроет сессию базы данных.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        user_bucket: TokenBucket,
+        ip_bucket: TokenBucket,
+        paths: Sequence[re.Pattern] = RATE_LIMITED_PATHS,
+    ) -> None:
+        self.app = app
+        self.user_bucket = user_bucket
+        self.ip_bucket = ip_bucket
+        self.paths = paths
+        self._limiter: Optional[TokenBucketRateLimiter] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not any(path.match(scope["path"]) for path in self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = await self._get_limiter(scope)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        buckets = []
+        user_id = QueryParams(scope["query_string"]).get("user_id")
+        if user_id:
+            buckets.append((f"user:{user_id}", self.user_bucket))
+        client = scope.get("client")
+        if client:
+            buckets.append((f"ip:{client[0]}", self.ip_bucket))
+
+        decision = await limiter.acquire(buckets)
+        if decision.allowed:
+            await self.app(scope, receive, send)
+            return
+
+        response = ORJSONResponse(
+            status_code=429,
+            content={"detail": "Слишком много запросов, повторите позже"},
+            headers={"Retry-After": str(math.ceil(decision.retry_after_seconds))},
+        )
+        await response(scope, receive, send)
+
+    async def _get_limiter(self, scope: Scope) -> Optional[TokenBucketRateLimiter]:
+        if self._limiter is None:
+            container = getattr(scope["app"].state, "dishka_container", None)
+            if container is None:
+                return None
+            self._limiter = await container.get(TokenBucketRateLimiter)
+        return self._limiter
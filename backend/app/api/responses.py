@@ -0,0 +1,59 @@
+from typing import Optional, Sequence
+
+import orjson
+from domain.entities import PromoEntity
+from domain.values import PromoListRow
+from starlette.responses import Response
+
+# Z вместо +00:00, как у datetime в JSON-режиме pydantic
+JSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+class RawJSONResponse(Response):
+    """Ответ из уже сериализованных байт JSON
+
+    FastAPI отдает возвращенный Response как есть: response_model остается
+    в схеме OpenAPI, но ответ не проверяется и не сериализуется повторно.
+    """
+
+    media_type = "application/json"
+
+
+def dumps(content: object) -> bytes:
+    # Enum, datetime и uuid.UUID orjson пишет сам; UUID из asyncpg -
+    # подкласс uuid.UUID, его orjson не принимает, он уходит в default
+    return orjson.dumps(content, default=str, option=JSON_OPTIONS)
+
+
+def promo_list_json(rows: Sequence[PromoListRow], next_cursor: Optional[str]) -> bytes:
+    """Тело PromoListResponse из строк чтения, поля в порядке схемы"""
+    return dumps(
+        {
+            "items": [
+                {
+                    "id": oid,
+                    "code": code,
+                    "uc_amount": uc_amount,
+                    "expires_at": expires_at,
+                    "status": status,
+                }
+                for oid, code, uc_amount, status, expires_at, _ in rows
+            ],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+def promo_json(promo: PromoEntity) -> bytes:
+    """Тело PromoResponse из сущности"""
+    return dumps(
+        {
+            "id": promo.oid,
+            "code": promo.code,
+            "uc_amount": promo.uc_amount,
+            "expires_at": promo.expires_at,
+            "status": promo.status,
+            "used_by": promo.usage.used_by,
+            "used_at": promo.usage.used_at,
+        }
+    )
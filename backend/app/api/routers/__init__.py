@@ -1,7 +1,15 @@
 from fastapi import APIRouter
 
+from .internal import router as internal_router
+from .metrics import router as metrics_router
 from .promocode import router as promocode_router
+from .storefront import router as storefront_router
+from .users import router as users_router
 
 main_router = APIRouter()
 
 main_router.include_router(promocode_router)
+main_router.include_router(users_router)
+main_router.include_router(storefront_router)
+main_router.include_router(internal_router)
+main_router.include_router(metrics_router)
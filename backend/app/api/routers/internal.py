@@ -0,0 +1,41 @@
+from dataclasses import asdict
+from typing import Optional
+
+from api.schemas import BloomFilterStatsResponse, CacheStatsResponse, SingleFlightStatsResponse
+from dishka.integrations.fastapi import DishkaRoute, FromDishka
+from fastapi import APIRouter, HTTPException, status
+from infra.cache.bloom import BloomFilter
+from infra.cache.promo import CacheStats
+from infra.cache.single_flight import SingleFlightStats
+
+router = APIRouter(prefix="/internal", tags=["Internal"], route_class=DishkaRoute)
+
+
+@router.get("/cache", response_model=CacheStatsResponse)
+async def get_cache_stats(cache_stats: FromDishka[CacheStats]):
+    """Счетчики попаданий и промахов кэша промокодов в этом воркере"""
+    return CacheStatsResponse(
+        hits=cache_stats.hits,
+        misses=cache_stats.misses,
+        errors=cache_stats.errors,
+        hit_ratio=cache_stats.hit_ratio,
+    )
+
+
+@router.get("/bloom", response_model=BloomFilterStatsResponse)
+async def get_bloom_filter_stats(bloom_filter: FromDishka[Optional[BloomFilter]]):
+    """Размер и оценка доли ложных срабатываний фильтра Блума"""
+    if bloom_filter is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Фильтр Блума выключен")
+    return BloomFilterStatsResponse(**asdict(bloom_filter.stats()))
+
+
+@router.get("/single-flight", response_model=SingleFlightStatsResponse)
+async def get_single_flight_stats(stats: FromDishka[SingleFlightStats]):
+    """Счетчики объединенных поисков промокодов в этом воркере"""
+    return SingleFlightStatsResponse(
+        leaders=stats.leaders,
+        coalesced=stats.coalesced,
+        window_hits=stats.window_hits,
+        coalesced_ratio=stats.coalesced_ratio,
+    )
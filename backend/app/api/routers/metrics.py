@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+from infra.metrics import render_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Метрики Prometheus всех воркеров gunicorn"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -1,18 +1,24 @@
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
+from api.responses import RawJSONResponse, promo_json, promo_list_json
 from api.schemas import (
     MessageResponse,
+    PromoBatchResponse,
     PromoListResponse,
     PromoResponse,
     PromoShortResponse,
     UsePromoResponse,
 )
-from application.services import PromoService
+from application.services import PromoQueryService, PromoService
 from dishka.integrations.fastapi import DishkaRoute, FromDishka
-from domain.enums import PromoStatus, UcAmount
+from domain.enums import ExportFormat, PromoStatus, UcAmount
 from domain.exceptions.promo import PromoCodeAlreadyExistsException, PromoCodeNotFoundException
+from domain.values import PageCursor
 from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from settings.config import settings
 
 router = APIRouter(prefix="/promocode", tags=["Promocodes"], route_class=DishkaRoute)
 
@@ -39,6 +45,59 @@ async def create_promo(
     )
 
 
+@router.post("/batch", response_model=PromoBatchResponse)
+async def create_promo_batch(
+    promo_service: FromDishka[PromoService],
+    uc_amount: UcAmount,
+    count: int = Query(ge=1, le=100_000),
+    duration_days: int = Query(ge=1, le=365),
+    prefix: Optional[str] = Query(None, max_length=20, pattern=r"^[A-Z0-9-]+$"),
+):
+    """Пакетная генерация промокодов"""
+    batch = await promo_service.create_promo_batch(
+        uc_amount=uc_amount, count=count, duration_days=duration_days, prefix=prefix or ""
+    )
+    return PromoBatchResponse(
+        uc_amount=batch.uc_amount,
+        expires_at=batch.expires_at,
+        created=len(batch.codes),
+        codes=list(batch.codes),
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_promos(
+    promo_service: FromDishka[PromoService],
+    format: ExportFormat = ExportFormat.NDJSON,
+    gzip: bool = False,
+    uc_amount: Optional[UcAmount] = None,
+    status: Optional[PromoStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """Потоковая выгрузка промокодов в NDJSON или CSV"""
+    chunks = promo_service.export_promos(
+        export_format=format,
+        compress=gzip,
+        uc_amount=uc_amount.value if uc_amount else None,
+        status=status.value if status else None,
+        created_from=created_from,
+        created_to=created_to,
+    )
+
+    filename = f"promo_codes.{format.value}"
+    media_type = "text/csv" if format == ExportFormat.CSV else "application/x-ndjson"
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/{promo_id}", response_model=PromoResponse)
 async def get_promo(promo_service: FromDishka[PromoService], promo_id: UUID):
     """Получение промокода по ID"""
@@ -46,6 +105,8 @@ async def get_promo(promo_service: FromDishka[PromoService], promo_id: UUID):
     if not promo:
         raise PromoCodeNotFoundException(code=str(promo_id))
 
+    if settings.serialization.fast_path:
+        return RawJSONResponse(promo_json(promo))
     return PromoResponse(
         id=UUID(promo.oid),
         code=promo.code,
@@ -64,6 +125,8 @@ async def get_promo_by_code(promo_service: FromDishka[PromoService], promo_code:
     if not promo:
         raise PromoCodeNotFoundException(code=promo_code)
 
+    if settings.serialization.fast_path:
+        return RawJSONResponse(promo_json(promo))
     return PromoResponse(
         id=UUID(promo.oid),
         code=promo.code,
@@ -77,53 +140,49 @@ async def get_promo_by_code(promo_service: FromDishka[PromoService], promo_code:
 
 @router.get("/", response_model=PromoListResponse)
 async def get_all_promos(
-    promo_service: FromDishka[PromoService],
+    promo_query_service: FromDishka[PromoQueryService],
     uc_amount: Optional[UcAmount] = None,
     status: Optional[PromoStatus] = None,
-    limit: Optional[int] = Query(None, ge=1, le=100),
-    offset: Optional[int] = Query(None, ge=0),
+    limit: int = Query(settings.pagination.default_limit, ge=1, le=settings.pagination.max_limit),
+    cursor: Optional[str] = None,
 ):
-    """Получение всех промокодов"""
-    promos = await promo_service.get_all_promos(
+    """Получение всех промокодов постранично"""
+    page = await promo_query_service.list_promos(
         uc_amount=uc_amount.value if uc_amount else None,
         status=status.value if status else None,
         limit=limit,
-        offset=offset,
+        cursor=PageCursor.decode(cursor) if cursor else None,
     )
+    next_cursor = page.next_cursor.encode() if page.next_cursor else None
 
+    if settings.serialization.fast_path:
+        # Строки из базы - доверенные данные: без модели ответа на каждую строку
+        return RawJSONResponse(promo_list_json(page.items, next_cursor))
     items = [
         PromoShortResponse(
-            id=UUID(promo.oid),
-            code=promo.code,
-            uc_amount=promo.uc_amount,
-            expires_at=promo.expires_at,
-            status=promo.status,
+            id=row.oid,
+            code=row.code,
+            uc_amount=row.uc_amount,
+            expires_at=row.expires_at,
+            status=row.status,
         )
-        for promo in promos
+        for row in page.items
     ]
 
-    return PromoListResponse(items=items)
+    return PromoListResponse(items=items, next_cursor=next_cursor)
 
 
 @router.post("/{promo_id}/use", response_model=UsePromoResponse)
 async def use_promo(promo_service: FromDishka[PromoService], promo_id: UUID, user_id: str):
     """Использование промокода"""
-    promo = await promo_service.get_promo(promo_id)
-    if not promo:
-        raise PromoCodeNotFoundException(code=str(promo_id))
-
-    await promo_service.use_promo(promo_id, user_id)
+    promo = await promo_service.use_promo(promo_id, user_id)
     return UsePromoResponse(message="Промокод успешно использован", uc_amount=promo.uc_amount.value)
 
 
 @router.post("/code/{promo_code}/use", response_model=UsePromoResponse)
 async def use_promo_by_code(promo_service: FromDishka[PromoService], promo_code: str, user_id: str):
     """Использование промокода по коду"""
-    promo = await promo_service.get_promo_by_code(promo_code)
-    if not promo:
-        raise PromoCodeNotFoundException(code=promo_code)
-
-    await promo_service.use_promo(UUID(promo.oid), user_id)
+    promo = await promo_service.use_promo_by_code(promo_code, user_id)
     return UsePromoResponse(message="Промокод успешно использован", uc_amount=promo.uc_amount.value)
 
 
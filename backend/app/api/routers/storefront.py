@@ -0,0 +1,44 @@
+from typing import List
+
+from api.schemas import CardResponse, PurchaseRequest, PurchaseResponse
+from application.services import CatalogService, PromoService
+from dishka.integrations.fastapi import DishkaRoute, FromDishka
+from fastapi import APIRouter
+
+router = APIRouter(prefix="/api/v1", tags=["Storefront"], route_class=DishkaRoute)
+
+
+@router.get("/get_card", response_model=List[CardResponse])
+async def get_cards(catalog_service: FromDishka[CatalogService]):
+    """Витрина: номиналы UC с ценами и числом доступных промокодов"""
+    catalog = await catalog_service.get_catalog()
+    return [
+        CardResponse(
+            title=item.title,
+            price=item.price,
+            image_url=item.image_url,
+            uc_amount=item.uc_amount,
+            stock=item.stock,
+        )
+        for item in catalog
+    ]
+
+
+@router.post("/set_by_user_card", response_model=List[PurchaseResponse])
+async def purchase_card(
+    catalog_service: FromDishka[CatalogService],
+    promo_service: FromDishka[PromoService],
+    purchase: PurchaseRequest,
+):
+    """Покупка: выдача пользователю Telegram свободного промокода выбранного номинала"""
+    uc_amount = catalog_service.resolve_card(purchase.card_title, purchase.price)
+    promo = await promo_service.purchase_promo(uc_amount, str(purchase.tg_id))
+    return [
+        PurchaseResponse(
+            tg_id=purchase.tg_id,
+            card_title=purchase.card_title,
+            price=purchase.price,
+            by_product_date=promo.usage.used_at,
+            promocode=promo.code,
+        )
+    ]
@@ -0,0 +1,43 @@
+from typing import Optional
+
+from api.schemas import UserPromoListResponse, UserPromoResponse, WalletBalanceResponse
+from application.services import PromoService, WalletService
+from dishka.integrations.fastapi import DishkaRoute, FromDishka
+from domain.values import PageCursor
+from fastapi import APIRouter, Query
+from settings.config import settings
+
+router = APIRouter(prefix="/users", tags=["Users"], route_class=DishkaRoute)
+
+
+@router.get("/{user_id}/balance", response_model=WalletBalanceResponse)
+async def get_user_balance(wallet_service: FromDishka[WalletService], user_id: str):
+    """Сумма UC, начисленная пользователю за использованные промокоды"""
+    balance = await wallet_service.get_balance(user_id)
+    return WalletBalanceResponse(
+        user_id=balance.user_id, balance=balance.balance, updated_at=balance.updated_at
+    )
+
+
+@router.get("/{user_id}/promos", response_model=UserPromoListResponse)
+async def get_user_promos(
+    promo_service: FromDishka[PromoService],
+    user_id: str,
+    limit: int = Query(settings.pagination.default_limit, ge=1, le=settings.pagination.max_limit),
+    cursor: Optional[str] = None,
+):
+    """Промокоды, использованные или купленные пользователем, от новых к старым"""
+    page = await promo_service.get_user_promos(
+        user_id, limit=limit, cursor=PageCursor.decode(cursor) if cursor else None
+    )
+
+    items = [
+        UserPromoResponse(
+            id=record.oid, code=record.code, uc_amount=record.uc_amount, used_at=record.used_at
+        )
+        for record in page.items
+    ]
+
+    return UserPromoListResponse(
+        items=items, next_cursor=page.next_cursor.encode() if page.next_cursor else None
+    )
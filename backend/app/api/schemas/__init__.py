@@ -1,15 +1,29 @@
+from .internal import BloomFilterStatsResponse, CacheStatsResponse, SingleFlightStatsResponse
 from .promo import (
     MessageResponse,
+    PromoBatchResponse,
     PromoListResponse,
     PromoResponse,
     PromoShortResponse,
     UsePromoResponse,
 )
+from .storefront import CardResponse, PurchaseRequest, PurchaseResponse
+from .wallet import UserPromoListResponse, UserPromoResponse, WalletBalanceResponse
 
 __all__ = (
     "PromoResponse",
     "PromoListResponse",
     "PromoShortResponse",
+    "PromoBatchResponse",
     "UsePromoResponse",
     "MessageResponse",
+    "CacheStatsResponse",
+    "BloomFilterStatsResponse",
+    "SingleFlightStatsResponse",
+    "WalletBalanceResponse",
+    "CardResponse",
+    "PurchaseRequest",
+    "PurchaseResponse",
+    "UserPromoResponse",
+    "UserPromoListResponse",
 )
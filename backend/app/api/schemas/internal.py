@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+
+
+class CacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    errors: int
+    hit_ratio: float
+
+
+class SingleFlightStatsResponse(BaseModel):
+    leaders: int
+    coalesced: int
+    window_hits: int
+    coalesced_ratio: float
+
+
+class BloomFilterStatsResponse(BaseModel):
+    capacity: int
+    bits: int
+    hash_count: int
+    size_bytes: int
+    fill_ratio: float
+    estimated_false_positive_rate: float
+    bytes_per_million: int
+    synced: bool
@@ -3,7 +3,7 @@ from typing import List, Optional
 from uuid import UUID
 
 from domain.enums import PromoStatus, UcAmount
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class PromoShortResponse(BaseModel):
@@ -13,12 +13,7 @@ class PromoShortResponse(BaseModel):
     expires_at: datetime
     status: PromoStatus
 
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            UcAmount: lambda v: v.value,
-            PromoStatus: lambda v: v.value,
-        }
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PromoResponse(BaseModel):
@@ -27,19 +22,22 @@ class PromoResponse(BaseModel):
     uc_amount: UcAmount
     expires_at: datetime
     status: PromoStatus
-    used_by: Optional[UUID] = None
+    used_by: Optional[str] = None
     used_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            UcAmount: lambda v: v.value,
-            PromoStatus: lambda v: v.value,
-        }
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PromoListResponse(BaseModel):
     items: List[PromoShortResponse]
+    next_cursor: Optional[str] = None
+
+
+class PromoBatchResponse(BaseModel):
+    uc_amount: UcAmount
+    expires_at: datetime
+    created: int
+    codes: List[str]
 
 
 class UsePromoResponse(BaseModel):
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Optional
+
+from domain.enums import UcAmount
+from pydantic import BaseModel
+
+
+class CardResponse(BaseModel):
+    title: str
+    price: int
+    image_url: str
+    uc_amount: UcAmount
+    stock: int
+
+
+class PurchaseRequest(BaseModel):
+    tg_id: int
+    card_title: str
+    price: int
+    by_product_date: Optional[datetime] = None
+
+
+class PurchaseResponse(BaseModel):
+    tg_id: int
+    card_title: str
+    price: int
+    by_product_date: datetime
+    promocode: str
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from domain.enums import UcAmount
+from pydantic import BaseModel
+
+
+class WalletBalanceResponse(BaseModel):
+    user_id: str
+    balance: int
+    updated_at: Optional[datetime] = None
+
+
+class UserPromoResponse(BaseModel):
+    id: UUID
+    code: str
+    uc_amount: UcAmount
+    used_at: datetime
+
+
+class UserPromoListResponse(BaseModel):
+    items: List[UserPromoResponse]
+    next_cursor: Optional[str] = None
@@ -1,11 +1,22 @@
 import logging
 from contextlib import asynccontextmanager
+from typing import Optional
 
 from api.exception_handler import register_exception_handlers
+from api.middleware import (
+    IdempotencyMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    QuerySourceMiddleware,
+    RateLimitMiddleware,
+)
 from application.di import setup_di
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
+from infra.cache.bloom import BloomFilter
+from infra.cache.rate_limit import TokenBucket
+from settings.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -13,8 +24,14 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting FastAPI Lifespan")
+    container = getattr(app.state, "dishka_container", None)
+    if container is not None:
+        # Фильтр Блума строится при старте, а не на первом запросе
+        await container.get(Optional[BloomFilter])
     yield
     logger.info("Stopping FastAPI Lifespan")
+    if container is not None:
+        await container.close()
 
 
 def create_app(
@@ -26,6 +43,35 @@ def create_app(
         docs_url=None if create_custom_static_urls else "/docs",
         redoc_url=None if create_custom_static_urls else "/redoc",
     )
+    if settings.slow_query.enabled:
+        app.add_middleware(QuerySourceMiddleware)
+    if settings.profiling.enabled:
+        # Самый внутренний слой: в профиль попадают DI, маршрут и сериализация
+        app.add_middleware(
+            ProfilingMiddleware,
+            header=settings.profiling.header,
+            sample_rate=settings.profiling.sample_rate,
+            interval=settings.profiling.interval,
+            output_dir=settings.profiling.output_dir,
+            trace_allocations=settings.profiling.trace_allocations,
+        )
+    if settings.rate_limit.enabled:
+        # Добавляется раньше CORS, чтобы ответ 429 тоже получил CORS-заголовки
+        app.add_middleware(
+            RateLimitMiddleware,
+            user_bucket=TokenBucket(
+                rate=settings.rate_limit.user_rate, capacity=settings.rate_limit.user_burst
+            ),
+            ip_bucket=TokenBucket(
+                rate=settings.rate_limit.ip_rate, capacity=settings.rate_limit.ip_burst
+            ),
+        )
+    if settings.idempotency.enabled:
+        # Снаружи ограничителя: повтор из Redis не расходует жетоны
+        app.add_middleware(IdempotencyMiddleware)
+    if settings.metrics.enabled:
+        # Снаружи ограничителя и повтора ответов: их отказы тоже попадают в метрики
+        app.add_middleware(MetricsMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -1,3 +1,3 @@
-from .container import setup_di
+from .container import setup_di, setup_worker_di
 
-__all__ = "setup_di"
+__all__ = ("setup_di", "setup_worker_di")
@@ -1,18 +1,34 @@
-from dishka import make_async_container
-from dishka.integrations.fastapi import FastapiProvider, setup_dishka
+from dishka import AsyncContainer, Provider, make_async_container
+from dishka.integrations.fastapi import FastapiProvider
+from dishka.integrations.fastapi import setup_dishka as setup_fastapi_dishka
+from dishka.integrations.taskiq import TaskiqProvider
+from dishka.integrations.taskiq import setup_dishka as setup_taskiq_dishka
 from fastapi import FastAPI
+from infra.metrics import TaskMetricsMiddleware
 from settings.config import settings
+from taskiq import AsyncBroker, TaskiqEvents, TaskiqState
 
-from .providers import DatabaseProvider, PromoValidatorProvider, RepositoryProvider, ServiceProvider
+from .providers import (
+    BloomFilterProvider,
+    CacheProvider,
+    DatabaseProvider,
+    PromoValidatorProvider,
+    RepositoryProvider,
+    ServiceProvider,
+)
 
 
-def create_container():
+def create_container(*extra_providers: Provider, with_bloom_filter: bool = True) -> AsyncContainer:
     providers = [
-        DatabaseProvider(url=settings.db.url.encoded_string()),
+        DatabaseProvider(
+            url=settings.db.url.encoded_string(), replica_urls=settings.db.replica_urls
+        ),
+        CacheProvider(),
+        BloomFilterProvider(enabled=with_bloom_filter and settings.bloom.enabled),
         RepositoryProvider(),
-        FastapiProvider(),
         ServiceProvider(),
         PromoValidatorProvider(),
+        *extra_providers,
     ]
 
     return make_async_container(*providers)
@@ -20,6 +36,21 @@ def create_container():
 
 def setup_di(app: FastAPI):
     """Настройка DI для FastAPI приложения"""
-    container = create_container()
-    setup_dishka(container, app)
+    container = create_container(FastapiProvider())
+    setup_fastapi_dishka(container, app)
+    return container
+
+
+def setup_worker_di(broker: AsyncBroker, *extra_providers: Provider) -> AsyncContainer:
+    """Настройка DI для воркеров taskiq"""
+    # Воркерам фильтр Блума не нужен, а его построение заняло бы время старта
+    container = create_container(TaskiqProvider(), *extra_providers, with_bloom_filter=False)
+    if settings.metrics.enabled:
+        broker.add_middlewares(TaskMetricsMiddleware(port=settings.metrics.worker_port))
+    setup_taskiq_dishka(container, broker)
+
+    @broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
+    async def close_container(state: TaskiqState) -> None:
+        await container.close()
+
     return container
@@ -1,5 +1,16 @@
+from .bloom import BloomFilterProvider
+from .cache import CacheProvider
 from .database import DatabaseProvider
+from .outbox import OutboxProvider
 from .repositories import RepositoryProvider
 from .services import PromoValidatorProvider, ServiceProvider
 
-__all__ = ("RepositoryProvider", "DatabaseProvider", "ServiceProvider", "PromoValidatorProvider")
+__all__ = (
+    "RepositoryProvider",
+    "DatabaseProvider",
+    "ServiceProvider",
+    "PromoValidatorProvider",
+    "CacheProvider",
+    "BloomFilterProvider",
+    "OutboxProvider",
+)
@@ -0,0 +1,76 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from contextlib import suppress
+from typing import Optional
+
+from dishka import Provider, Scope, provide
+from infra.cache.bloom import BloomFilter, BloomFilterFeed, BloomFilterFollower, open_or_build
+from infra.db.repositories import PromoRepositoryImpl
+from redis.asyncio import Redis
+from settings.config import settings
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class BloomFilterProvider(Provider):
+    """Провайдер фильтра Блума по существующим кодам"""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        super().__init__()
+
+    @provide(scope=Scope.APP)
+    def get_bloom_filter_feed(self, redis: Redis) -> BloomFilterFeed:
+        return BloomFilterFeed(
+            redis, stream=settings.bloom.feed_stream, maxlen=settings.bloom.feed_maxlen
+        )
+
+    @provide(scope=Scope.APP)
+    async def get_bloom_filter(
+        self, session_factory: async_sessionmaker[AsyncSession], feed: BloomFilterFeed
+    ) -> AsyncGenerator[Optional[BloomFilter], None]:
+        if not self.enabled:
+            yield None
+            return
+
+        async def build() -> BloomFilter:
+            async with session_factory() as session:
+                return await open_or_build(
+                    settings.bloom.path,
+                    capacity=settings.bloom.capacity,
+                    error_rate=settings.bloom.error_rate,
+                    codes=PromoRepositoryImpl(session).iter_codes(),
+                    feed=feed,
+                )
+
+        bloom_filter = await build()
+
+        async def rebuild() -> None:
+            (await build()).close()
+            bloom_filter.reopen()
+
+        # Блокирующее чтение потока держит соединение до block_ms, поэтому идет
+        # через отдельный клиент с таймаутом на секунду больше: общий оборвал бы
+        # его по CACHE_SOCKET_TIMEOUT
+        listener = Redis.from_url(
+            settings.redis.url.encoded_string(),
+            socket_timeout=settings.bloom.feed_block_ms / 1000 + 1,
+            socket_connect_timeout=settings.cache.socket_timeout,
+        )
+        follower = BloomFilterFollower(
+            bloom_filter,
+            feed,
+            BloomFilterFeed(
+                listener, stream=settings.bloom.feed_stream, maxlen=settings.bloom.feed_maxlen
+            ),
+            rebuild,
+            batch_size=settings.bloom.feed_batch_size,
+            block_ms=settings.bloom.feed_block_ms,
+            retry_seconds=settings.bloom.feed_retry_seconds,
+        )
+        task = asyncio.create_task(follower.run())
+        yield bloom_filter
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        await listener.aclose()
+        bloom_filter.close()
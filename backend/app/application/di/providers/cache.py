@@ -0,0 +1,55 @@
+from collections.abc import AsyncGenerator
+
+from dishka import Provider, Scope, provide
+from domain.repositories import StockCounter
+from infra.cache.idempotency import IdempotencyStore
+from infra.cache.promo import CacheStats
+from infra.cache.rate_limit import TokenBucketRateLimiter
+from infra.cache.single_flight import PromoLookupFlights, SingleFlightStats
+from infra.cache.stock import PromoStockCounter
+from redis.asyncio import Redis
+from settings.config import settings
+
+
+class CacheProvider(Provider):
+    """Провайдер для зависимостей кэша"""
+
+    @provide(scope=Scope.APP)
+    async def get_redis(self) -> AsyncGenerator[Redis, None]:
+        redis = Redis.from_url(
+            settings.redis.url.encoded_string(),
+            socket_timeout=settings.cache.socket_timeout,
+            socket_connect_timeout=settings.cache.socket_timeout,
+        )
+        yield redis
+        await redis.aclose()
+
+    @provide(scope=Scope.APP)
+    def get_cache_stats(self) -> CacheStats:
+        return CacheStats()
+
+    @provide(scope=Scope.APP)
+    def get_single_flight_stats(self) -> SingleFlightStats:
+        return SingleFlightStats()
+
+    @provide(scope=Scope.APP)
+    def get_promo_lookup_flights(self, stats: SingleFlightStats) -> PromoLookupFlights:
+        return PromoLookupFlights(stats, window_seconds=settings.single_flight.window_seconds)
+
+    @provide(scope=Scope.APP)
+    def get_stock_counter(self, redis: Redis) -> StockCounter:
+        return PromoStockCounter(redis, ttl_seconds=settings.storefront.stock_cache_seconds)
+
+    @provide(scope=Scope.APP)
+    def get_rate_limiter(self, redis: Redis) -> TokenBucketRateLimiter:
+        return TokenBucketRateLimiter(redis)
+
+    @provide(scope=Scope.APP)
+    def get_idempotency_store(self, redis: Redis) -> IdempotencyStore:
+        return IdempotencyStore(
+            redis,
+            ttl_seconds=settings.idempotency.ttl_seconds,
+            lock_seconds=settings.idempotency.lock_seconds,
+            wait_seconds=settings.idempotency.wait_seconds,
+            poll_interval=settings.idempotency.poll_interval,
+        )
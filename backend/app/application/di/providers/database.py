@@ -1,40 +1,100 @@
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Sequence
 
 from dishka import Provider, Scope, provide
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from infra.db.engine import check_connection_budget, engine_options
+from infra.db.routing import ReplicaSet, RoutingSession
+from infra.db.slow_query import instrument_slow_queries
+from infra.metrics import InstrumentedAsyncAdaptedQueuePool, instrument_engine
+from settings.config import settings
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 
 class DatabaseProvider(Provider):
     """Провайдер для зависимостей базы данных"""
 
-    def __init__(self, url: str):
+    def __init__(self, url: str, replica_urls: Sequence[str] = ()):
         self.url = url
+        self.replica_urls = replica_urls
         super().__init__()
 
     @provide(scope=Scope.APP)
-    def create_engine(self) -> async_sessionmaker[AsyncSession]:
-        engine = create_async_engine(
-            url=self.url,
-            pool_pre_ping=True,
+    async def create_engine(self) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+        engine = self._create_engine(
+            self.url,
+            poolclass=(
+                InstrumentedAsyncAdaptedQueuePool
+                if settings.metrics.enabled
+                else AsyncAdaptedQueuePool
+            ),
         )
+        # Через PgBouncer лимит соединений сервера к пулам приложения не относится
+        if settings.db.check_connection_budget and not settings.db.pgbouncer:
+            await check_connection_budget(
+                engine,
+                required=settings.gunicorn.workers
+                * (settings.db.pool_size + settings.db.max_overflow),
+            )
+        if not self.replica_urls:
+            yield async_sessionmaker(engine, class_=AsyncSession)
+            await engine.dispose()
+            return
 
-        session_factory = async_sessionmaker(
-            engine,
-            class_=AsyncSession,
+        # Метрики пула считаются только для primary: у реплик свои пулы
+        replicas = ReplicaSet(
+            [
+                self._create_engine(url, poolclass=AsyncAdaptedQueuePool)
+                for url in self.replica_urls
+            ],
+            max_lag_seconds=settings.db.replica_max_lag_seconds,
+            check_interval=settings.db.replica_check_interval,
+            check_timeout=settings.db.replica_check_timeout,
+        )
+        await replicas.start()
+        yield async_sessionmaker(
+            engine, class_=AsyncSession, sync_session_class=RoutingSession, replicas=replicas
         )
+        await replicas.close()
+        await engine.dispose()
 
-        return session_factory
+    @staticmethod
+    def _create_engine(url: str, poolclass: type[AsyncAdaptedQueuePool]) -> AsyncEngine:
+        engine = create_async_engine(
+            url=url,
+            poolclass=poolclass,
+            **engine_options(
+                pool_size=settings.db.pool_size,
+                max_overflow=settings.db.max_overflow,
+                pool_timeout=settings.db.pool_timeout,
+                pool_recycle=settings.db.pool_recycle,
+                pool_pre_ping=settings.db.pool_pre_ping,
+                prepared_statement_cache_size=settings.db.prepared_statement_cache_size,
+                statement_timeout_ms=settings.db.statement_timeout_ms,
+                pgbouncer=settings.db.pgbouncer,
+            ),
+        )
+        if settings.metrics.enabled:
+            instrument_engine(engine)
+        if settings.slow_query.enabled:
+            instrument_slow_queries(
+                engine,
+                threshold_ms=settings.slow_query.threshold_ms,
+                explain_sample_rate=settings.slow_query.explain_sample_rate,
+                explain_interval_seconds=settings.slow_query.explain_interval_seconds,
+                explain_timeout_seconds=settings.slow_query.explain_timeout_seconds,
+            )
+        return engine
 
     @provide(scope=Scope.REQUEST)
     async def get_session(
         self, session_factory: async_sessionmaker[AsyncSession]
     ) -> AsyncGenerator[AsyncSession, None]:
+        # Изменения фиксирует UnitOfWork на границе сервиса; все, что не
+        # зафиксировано к концу запроса, откатывается при закрытии сессии
         async with session_factory() as session:
-            try:
-                yield session
-                await session.commit()
-            except Exception:
-                await session.rollback()
-                raise
-            finally:
-                await session.close()
+            yield session
@@ -0,0 +1,30 @@
+from collections.abc import AsyncGenerator
+
+from aio_pika import connect_robust
+from aio_pika.abc import AbstractChannel
+from dishka import Provider, Scope, provide
+from infra.broker.outbox import OutboxRelay
+from settings.config import settings
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class OutboxProvider(Provider):
+    """Провайдер relay для outbox (только для воркера RabbitMQ)"""
+
+    @provide(scope=Scope.APP)
+    async def get_channel(self) -> AsyncGenerator[AbstractChannel, None]:
+        connection = await connect_robust(settings.rabbit.url.encoded_string())
+        channel = await connection.channel(publisher_confirms=True)
+        yield channel
+        await connection.close()
+
+    @provide(scope=Scope.APP)
+    def get_outbox_relay(
+        self, session_factory: async_sessionmaker[AsyncSession], channel: AbstractChannel
+    ) -> OutboxRelay:
+        return OutboxRelay(
+            session_factory,
+            channel,
+            exchange_name=settings.outbox.exchange,
+            batch_size=settings.outbox.batch_size,
+        )
@@ -1,11 +1,68 @@
+from typing import Optional
+
 from dishka import Provider, Scope, provide
-from domain.repositories.promo import PromoRepository
-from domain.services import PromoValidator
-from infra.db.repositories import PromoRepositoryImpl
+from domain.repositories import (
+    PromoQueries,
+    PromoRepository,
+    StockCounter,
+    UnitOfWork,
+    WalletRepository,
+)
+from infra.cache.bloom import BloomFilter, BloomFilteredPromoRepository, BloomFilterFeed
+from infra.cache.promo import CachedPromoRepository, CacheStats
+from infra.cache.single_flight import PromoLookupFlights, SingleFlightPromoRepository
+from infra.cache.stock import StockCountingPromoRepository
+from infra.db.repositories import (
+    PromoQueriesImpl,
+    PromoRepositoryImpl,
+    SqlAlchemyUnitOfWork,
+    WalletRepositoryImpl,
+)
+from redis.asyncio import Redis
+from settings.config import settings
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class RepositoryProvider(Provider):
     @provide(scope=Scope.REQUEST)
-    def get_promo_repository(self, session: AsyncSession) -> PromoRepository:
-        return PromoRepositoryImpl(session)
+    def get_promo_repository(
+        self,
+        session: AsyncSession,
+        redis: Redis,
+        cache_stats: CacheStats,
+        bloom_filter: Optional[BloomFilter],
+        bloom_filter_feed: BloomFilterFeed,
+        stock_counter: StockCounter,
+        flights: PromoLookupFlights,
+        unit_of_work: UnitOfWork,
+    ) -> PromoRepository:
+        repository: PromoRepository = StockCountingPromoRepository(
+            PromoRepositoryImpl(session), stock_counter, unit_of_work
+        )
+        if settings.cache.enabled:
+            repository = CachedPromoRepository(
+                repository,
+                redis,
+                cache_stats,
+                ttl_seconds=settings.cache.ttl_seconds,
+                unit_of_work=unit_of_work,
+            )
+        if settings.single_flight.enabled:
+            repository = SingleFlightPromoRepository(repository, flights, unit_of_work)
+        if bloom_filter is not None:
+            repository = BloomFilteredPromoRepository(
+                repository, bloom_filter, bloom_filter_feed, unit_of_work
+            )
+        return repository
+
+    @provide(scope=Scope.REQUEST)
+    def get_promo_queries(self, session: AsyncSession) -> PromoQueries:
+        return PromoQueriesImpl(session)
+
+    @provide(scope=Scope.REQUEST)
+    def get_wallet_repository(self, session: AsyncSession) -> WalletRepository:
+        return WalletRepositoryImpl(session)
+
+    @provide(scope=Scope.REQUEST)
+    def get_unit_of_work(self, session: AsyncSession) -> UnitOfWork:
+        return SqlAlchemyUnitOfWork(session)
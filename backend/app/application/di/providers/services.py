@@ -1,7 +1,14 @@
-from application.services import PromoService
+from application.services import CatalogService, PromoQueryService, PromoService, WalletService
 from dishka import Provider, Scope, provide
-from domain.repositories.promo import PromoRepository
-from domain.services import PromoValidator
+from domain.repositories import (
+    PromoQueries,
+    PromoRepository,
+    StockCounter,
+    UnitOfWork,
+    WalletRepository,
+)
+from domain.services import PromoCodeGenerator, PromoValidator
+from settings.config import settings
 
 
 class PromoValidatorProvider(Provider):
@@ -9,10 +16,40 @@ class PromoValidatorProvider(Provider):
     def get_promo_validator(self) -> PromoValidator:
         return PromoValidator()
 
+    @provide(scope=Scope.APP)
+    def get_promo_code_generator(self) -> PromoCodeGenerator:
+        return PromoCodeGenerator()
+
 
 class ServiceProvider(Provider):
     @provide(scope=Scope.REQUEST)
     def get_promo_service(
-        self, promo_repository: PromoRepository, promo_validator: PromoValidator
+        self,
+        promo_repository: PromoRepository,
+        promo_validator: PromoValidator,
+        code_generator: PromoCodeGenerator,
+        wallet_repository: WalletRepository,
+        unit_of_work: UnitOfWork,
     ) -> PromoService:
-        return PromoService(promo_repository, promo_validator)
+        return PromoService(
+            promo_repository, promo_validator, code_generator, wallet_repository, unit_of_work
+        )
+
+    @provide(scope=Scope.REQUEST)
+    def get_promo_query_service(self, promo_queries: PromoQueries) -> PromoQueryService:
+        return PromoQueryService(promo_queries)
+
+    @provide(scope=Scope.REQUEST)
+    def get_wallet_service(self, wallet_repository: WalletRepository) -> WalletService:
+        return WalletService(wallet_repository)
+
+    @provide(scope=Scope.REQUEST)
+    def get_catalog_service(
+        self, promo_repository: PromoRepository, stock_counter: StockCounter
+    ) -> CatalogService:
+        return CatalogService(
+            promo_repository,
+            stock_counter,
+            prices=settings.storefront.prices,
+            image_url_template=settings.storefront.image_url_template,
+        )
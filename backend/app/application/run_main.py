@@ -1,19 +1,28 @@
 from application.main import main_app
+from infra.metrics import clear_multiprocess_dir, mark_process_dead
 from settings.app import Application, get_app_options
 from settings.config import settings
 
 
+def on_starting(server) -> None:
+    clear_multiprocess_dir()
+
+
+def child_exit(server, worker) -> None:
+    mark_process_dead(worker.pid)
+
+
 def main() -> None:
-    Application(
-        application=main_app,
-        options=get_app_options(
-            host=settings.gunicorn.host,
-            port=settings.gunicorn.port,
-            timeout=settings.gunicorn.timeout,
-            workers=settings.gunicorn.workers,
-            log_level=settings.logging.log_level,
-        ),
-    ).run()
+    options = get_app_options(
+        host=settings.gunicorn.host,
+        port=settings.gunicorn.port,
+        timeout=settings.gunicorn.timeout,
+        workers=settings.gunicorn.workers,
+        log_level=settings.logging.log_level,
+    )
+    if settings.metrics.enabled:
+        options.update(on_starting=on_starting, child_exit=child_exit)
+    Application(application=main_app, options=options).run()
 
 
 if __name__ == "__main__":
@@ -1,3 +1,13 @@
-from .promo import PromoService
+from .catalog import CatalogItem, CatalogService
+from .promo import ExpirySweepResult, PromoService
+from .promo_queries import PromoQueryService
+from .wallet import WalletService
 
-__all__ = ("PromoService",)
+__all__ = (
+    "PromoService",
+    "PromoQueryService",
+    "ExpirySweepResult",
+    "WalletService",
+    "CatalogService",
+    "CatalogItem",
+)
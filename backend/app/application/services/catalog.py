@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+from typing import Dict, List, Mapping
+
+from domain.enums import UcAmount
+from domain.exceptions.storefront import CardNotFoundException, CardPriceMismatchException
+from domain.repositories import PromoRepository, StockCounter
+
+
+@dataclass(frozen=True)
+class CatalogItem:
+    uc_amount: UcAmount
+    title: str
+    price: int
+    image_url: str
+    stock: int
+
+
+class CatalogService:
+    def __init__(
+        self,
+        promo_repository: PromoRepository,
+        stock_counter: StockCounter,
+        prices: Mapping[str, int],
+        image_url_template: str,
+    ) -> None:
+        self.promo_repository = promo_repository
+        self.stock_counter = stock_counter
+        self.prices = prices
+        self.image_url_template = image_url_template
+
+    async def get_catalog(self) -> List[CatalogItem]:
+        """Номиналы с ценами и остатками; база читается, только пока счетчики не заполнены"""
+        stock = await self.stock_counter.snapshot()
+        if stock is None:
+            stock = await self.reconcile_stock()
+
+        return [
+            CatalogItem(
+                uc_amount=uc_amount,
+                title=uc_amount.value,
+                price=self.prices[uc_amount.name],
+                image_url=self.image_url_template.format(units=uc_amount.units),
+                stock=max(stock.get(uc_amount, 0), 0),
+            )
+            for uc_amount in UcAmount
+            if uc_amount.name in self.prices
+        ]
+
+    def resolve_card(self, card_title: str, price: int) -> UcAmount:
+        """Номинал по названию карточки; цена должна совпадать с текущей"""
+        try:
+            uc_amount = UcAmount(card_title)
+        except ValueError:
+            raise CardNotFoundException(card_title=card_title)
+
+        if uc_amount.name not in self.prices:
+            raise CardNotFoundException(card_title=card_title)
+        if self.prices[uc_amount.name] != price:
+            raise CardPriceMismatchException(card_title=card_title, price=price)
+        return uc_amount
+
+    async def reconcile_stock(self) -> Dict[UcAmount, int]:
+        """Пересчет остатков по базе и перезапись счетчиков"""
+        stock = await self.promo_repository.count_available()
+        await self.stock_counter.reset(stock)
+        return stock
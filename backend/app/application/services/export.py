@@ -0,0 +1,68 @@
+import csv
+import io
+import zlib
+from enum import Enum
+from typing import AsyncIterator, Sequence, Tuple
+
+import orjson
+from domain.enums import ExportFormat
+from domain.repositories import PROMO_EXPORT_FIELDS
+
+Partitions = AsyncIterator[Sequence[Tuple]]
+
+
+async def iter_ndjson(partitions: Partitions) -> AsyncIterator[bytes]:
+    """Строки в NDJSON: orjson сам сериализует UUID, datetime и Enum"""
+    async for rows in partitions:
+        # Список, а не генератор: join все равно соберет его, но без
+        # переключения в генератор на каждой строке
+        yield b"".join(
+            [
+                orjson.dumps(
+                    dict(zip(PROMO_EXPORT_FIELDS, row)),
+                    # UUID из asyncpg не является точным uuid.UUID, для него нужен str
+                    default=str,
+                    option=orjson.OPT_APPEND_NEWLINE,
+                )
+                for row in rows
+            ]
+        )
+
+
+def _csv_value(value: object) -> object:
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+async def iter_csv(partitions: Partitions) -> AsyncIterator[bytes]:
+    """Строки в CSV с заголовком, по буферу на пачку"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(PROMO_EXPORT_FIELDS)
+    async for rows in partitions:
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def iter_gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Потоковое сжатие в формат gzip"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def encode_export(
+    partitions: Partitions, export_format: ExportFormat, compress: bool = False
+) -> AsyncIterator[bytes]:
+    chunks = iter_csv(partitions) if export_format == ExportFormat.CSV else iter_ndjson(partitions)
+    return iter_gzip(chunks) if compress else chunks
@@ -1,22 +1,41 @@
-from typing import List, Optional
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
 
+from application.services.export import encode_export
 from domain.entities.promo import PromoEntity
-from domain.enums import PromoStatus, UcAmount
-from domain.exceptions.promo import (
-    PromoCodeAlreadyExistsException,
-    PromoCodeAlreadyUsedException,
-    PromoCodeExpiredException,
-    PromoCodeNotFoundException,
-)
-from domain.repositories.promo import PromoRepository
-from domain.services import PromoValidator
+from domain.enums import ExportFormat, UcAmount
+from domain.exceptions.promo import PromoCodeAlreadyExistsException
+from domain.repositories import PromoRepository, UnitOfWork, WalletRepository
+from domain.services import PromoCodeGenerator, PromoValidator
+from domain.values import Page, PageCursor, PromoBatch, UserPromoRecord
+
+MAX_BATCH_ATTEMPTS = 5
+
+
+@dataclass(frozen=True)
+class ExpirySweepResult:
+    expired: int
+    batches: int
+    duration_seconds: float
 
 
 class PromoService:
-    def __init__(self, promo_repository: PromoRepository, promo_validator: PromoValidator) -> None:
+    def __init__(
+        self,
+        promo_repository: PromoRepository,
+        promo_validator: PromoValidator,
+        code_generator: PromoCodeGenerator,
+        wallet_repository: WalletRepository,
+        unit_of_work: UnitOfWork,
+    ) -> None:
         self.promo_repository = promo_repository
         self.promo_validator = promo_validator
+        self.code_generator = code_generator
+        self.wallet_repository = wallet_repository
+        self.unit_of_work = unit_of_work
 
     async def create_promo(self, code: str, uc_amount: UcAmount, duration_days: int) -> PromoEntity:
         """Создание нового промокода"""
@@ -30,8 +49,42 @@ class PromoService:
         )
 
         await self.promo_repository.save(promo_entity)
+        self.unit_of_work.collect(promo_entity)
+        await self.unit_of_work.commit()
         return promo_entity
 
+    async def create_promo_batch(
+        self, uc_amount: UcAmount, count: int, duration_days: int, prefix: str = ""
+    ) -> PromoBatch:
+        """Пакетная генерация промокодов одного номинала"""
+        # Валидация номинала и срока действия один раз на всю пачку
+        template = PromoEntity.create(
+            code=prefix + "X" * self.code_generator.length,
+            uc_amount=uc_amount,
+            duration_days=duration_days,
+        )
+
+        created: List[str] = []
+        for _ in range(MAX_BATCH_ATTEMPTS):
+            missing = count - len(created)
+            if not missing:
+                break
+            # Повторно генерируются только коды, попавшие в конфликт
+            codes = self.code_generator.generate(missing, prefix)
+            created.extend(
+                await self.promo_repository.bulk_create(
+                    codes, uc_amount=template.uc_amount, expires_at=template.expires_at
+                )
+            )
+        else:
+            if len(created) < count:
+                raise RuntimeError(f"Не удалось сгенерировать {count} уникальных промокодов")
+
+        await self.unit_of_work.commit()
+        return PromoBatch(
+            uc_amount=template.uc_amount, expires_at=template.expires_at, codes=tuple(created)
+        )
+
     async def get_promo(self, promo_id: UUID) -> Optional[PromoEntity]:
         """Получение промокода по ID"""
         return await self.promo_repository.get_by_id(promo_id)
@@ -40,68 +93,93 @@ class PromoService:
         """Получение промокода по коду"""
         return await self.promo_repository.get_by_code(code)
 
-    async def get_all_promos(
+    async def get_user_promos(
+        self, user_id: str, limit: int = 50, cursor: Optional[PageCursor] = None
+    ) -> Page[UserPromoRecord]:
+        """Страница промокодов, полученных пользователем"""
+        records = await self.promo_repository.get_user_history(user_id, limit + 1, cursor=cursor)
+        if len(records) <= limit:
+            return Page(items=records)
+
+        items = records[:limit]
+        last = items[-1]
+        return Page(items=items, next_cursor=PageCursor(sort_key=last.used_at, oid=last.oid))
+
+    def export_promos(
         self,
+        export_format: ExportFormat,
+        compress: bool = False,
         uc_amount: Optional[str] = None,
         status: Optional[str] = None,
-        limit: Optional[int] = None,
-        offset: Optional[int] = None,
-    ) -> List[PromoEntity]:
-        """Получение всех промокодов с фильтрацией"""
-        return await self.promo_repository.get_all(
-            uc_amount=uc_amount, status=status, limit=limit, offset=offset
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        """Потоковая выгрузка промокодов в байтах выбранного формата"""
+        partitions = self.promo_repository.iter_export(
+            uc_amount=uc_amount, status=status, created_from=created_from, created_to=created_to
         )
+        return encode_export(partitions, export_format, compress)
 
     async def use_promo(self, promo_id: UUID, user_id: str) -> PromoEntity:
         """Использование промокода"""
-        promo_entity = await self.promo_repository.get_by_id(promo_id)
-        if not promo_entity:
-            raise PromoCodeNotFoundException(code=str(promo_id))
-
-        try:
-            promo_entity.use(user_id, self.promo_validator)
-            await self.promo_repository.save(promo_entity)
-            return promo_entity
-        except ValueError as e:
-            # Преобразуем стандартные ValueError в кастомные исключения
-            error_msg = str(e).lower()
-            if "expired" in error_msg:
-                raise PromoCodeExpiredException(code=promo_entity.code)
-            elif "used" in error_msg or "уже использован" in error_msg:
-                raise PromoCodeAlreadyUsedException(code=promo_entity.code)
-            else:
-                raise ValueError(e)
+        promo_entity = await self.promo_repository.redeem(user_id, promo_id=promo_id)
+        await self._credit_wallet(promo_entity)
+        self.unit_of_work.collect(promo_entity)
+        await self.unit_of_work.commit()
+        return promo_entity
 
     async def use_promo_by_code(self, code: str, user_id: str) -> PromoEntity:
         """Использование промокода по коду"""
-        promo_entity = await self.promo_repository.get_by_code(code)
-        if not promo_entity:
-            raise PromoCodeNotFoundException(code=code)
+        promo_entity = await self.promo_repository.redeem(user_id, code=code)
+        await self._credit_wallet(promo_entity)
+        self.unit_of_work.collect(promo_entity)
+        await self.unit_of_work.commit()
+        return promo_entity
 
-        return await self.use_promo(UUID(promo_entity.oid), user_id)
+    async def purchase_promo(self, uc_amount: UcAmount, user_id: str) -> PromoEntity:
+        """Выдача покупателю свободного промокода с начислением UC"""
+        promo_entity = await self.promo_repository.allocate(uc_amount, user_id)
+        await self._credit_wallet(promo_entity)
+        self.unit_of_work.collect(promo_entity)
+        await self.unit_of_work.commit()
+        return promo_entity
 
-    async def delete_promo(self, promo_id: UUID) -> bool:
-        """Удаление промокода"""
-        promo_entity = await self.promo_repository.get_by_id(promo_id)
-        if not promo_entity:
-            raise PromoCodeNotFoundException(code=str(promo_id))
+    async def _credit_wallet(self, promo_entity: PromoEntity) -> None:
+        """Начисление UC в той же транзакции, что и использование промокода"""
+        # У кода ALL нет числового номинала: он гасится как раньше, без записи в кошелек
+        if promo_entity.uc_amount is UcAmount.ALL:
+            return
+        await self.wallet_repository.credit(
+            user_id=promo_entity.usage.used_by,
+            amount=promo_entity.uc_amount.units,
+            promo_id=UUID(promo_entity.oid),
+        )
 
-        if not promo_entity.can_be_deleted():
-            raise PromoCodeAlreadyUsedException(code=promo_entity.code)
+    async def delete_promo(self, promo_id: UUID) -> bool:
+        """Удаление промокода
 
+        Статус проверяет сам DELETE: промокод, прочитанный из кэша, мог быть
+        использован после попадания туда.
+        """
+        promo_entity = await self.promo_repository.delete(promo_id)
         promo_entity.delete()
-        return await self.promo_repository.delete(promo_id)
-
-    async def expire_old_promos(self) -> List[PromoEntity]:
-        """Помечаем просроченные промокоды"""
-        all_promos = await self.promo_repository.get_all()
-        expired_promos = []
-
-        for promo in all_promos:
-            if promo.status == PromoStatus.ACTIVE:
-                promo.mark_expired()
-                if promo.status == PromoStatus.EXPIRED:
-                    await self.promo_repository.save(promo)
-                    expired_promos.append(promo)
-
-        return expired_promos
+        self.unit_of_work.collect(promo_entity)
+        await self.unit_of_work.commit()
+        return True
+
+    async def expire_old_promos(self, batch_size: int, max_batches: int) -> ExpirySweepResult:
+        """Помечаем просроченные промокоды пачками по batch_size строк"""
+        started = time.perf_counter()
+        expired = batches = 0
+
+        while batches < max_batches:
+            expired_ids = await self.promo_repository.expire_batch(batch_size)
+            await self.unit_of_work.commit()
+            batches += 1
+            expired += len(expired_ids)
+            if len(expired_ids) < batch_size:
+                break
+
+        return ExpirySweepResult(
+            expired=expired, batches=batches, duration_seconds=time.perf_counter() - started
+        )
@@ -0,0 +1,30 @@
+from typing import Optional
+
+from domain.repositories import PromoQueries
+from domain.values import Page, PageCursor, PromoListRow
+
+
+class PromoQueryService:
+    """Чтение промокодов для списков: строки чтения вместо сущностей"""
+
+    def __init__(self, promo_queries: PromoQueries) -> None:
+        self.promo_queries = promo_queries
+
+    async def list_promos(
+        self,
+        uc_amount: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[PageCursor] = None,
+    ) -> Page[PromoListRow]:
+        """Получение страницы промокодов с фильтрацией"""
+        # Лишняя строка показывает, есть ли следующая страница
+        rows = await self.promo_queries.list_promos(
+            uc_amount=uc_amount, status=status, limit=limit + 1, cursor=cursor
+        )
+        if len(rows) <= limit:
+            return Page(items=rows)
+
+        items = rows[:limit]
+        last = items[-1]
+        return Page(items=items, next_cursor=PageCursor(sort_key=last.created_at, oid=last.oid))
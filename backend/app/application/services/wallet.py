@@ -0,0 +1,12 @@
+from domain.repositories import WalletRepository
+from domain.values import WalletBalance
+
+
+class WalletService:
+    def __init__(self, wallet_repository: WalletRepository) -> None:
+        self.wallet_repository = wallet_repository
+
+    async def get_balance(self, user_id: str) -> WalletBalance:
+        """Баланс пользователя; без начислений он нулевой"""
+        balance = await self.wallet_repository.get_balance(user_id)
+        return balance or WalletBalance(user_id=user_id)
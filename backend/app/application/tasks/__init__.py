@@ -0,0 +1,12 @@
+from application.di import setup_worker_di
+from application.di.providers import OutboxProvider
+from infra.broker.taskiq_rabbitmq import rabbitmq_broker
+from infra.cache.taskiq_redis import redis_broker
+
+from .outbox import relay_outbox
+from .promo import expire_promos
+
+setup_worker_di(redis_broker)
+setup_worker_di(rabbitmq_broker, OutboxProvider())
+
+__all__ = ("expire_promos", "relay_outbox")
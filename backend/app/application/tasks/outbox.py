@@ -0,0 +1,24 @@
+import logging
+
+from dishka.integrations.taskiq import FromDishka, inject
+from infra.broker.outbox import OutboxRelay
+from infra.broker.taskiq_rabbitmq import rabbitmq_broker
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@rabbitmq_broker.task(task_name="relay_outbox", schedule=[{"cron": settings.outbox.cron}])
+@inject(patch_module=True)
+async def relay_outbox(relay: FromDishka[OutboxRelay]) -> dict:
+    """Периодическая пересылка событий outbox в RabbitMQ"""
+    result = await relay.drain(
+        run_seconds=settings.outbox.run_seconds, poll_interval=settings.outbox.poll_interval
+    )
+    metrics = {
+        "published": result.published,
+        "batches": result.batches,
+        "duration_ms": round(result.duration_seconds * 1000, 3),
+    }
+    logger.info("Outbox relay finished: %s", metrics)
+    return metrics
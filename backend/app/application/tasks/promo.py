@@ -0,0 +1,28 @@
+import logging
+
+from application.services import CatalogService, PromoService
+from dishka.integrations.taskiq import FromDishka, inject
+from infra.cache.taskiq_redis import redis_broker
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@redis_broker.task(task_name="expire_promos", schedule=[{"cron": settings.expiry.cron}])
+@inject(patch_module=True)
+async def expire_promos(
+    promo_service: FromDishka[PromoService], catalog_service: FromDishka[CatalogService]
+) -> dict:
+    """Периодическая пометка просроченных промокодов и сверка счетчиков витрины"""
+    sweep = await promo_service.expire_old_promos(
+        batch_size=settings.expiry.batch_size, max_batches=settings.expiry.max_batches
+    )
+    stock = await catalog_service.reconcile_stock()
+    metrics = {
+        "expired": sweep.expired,
+        "batches": sweep.batches,
+        "duration_ms": round(sweep.duration_seconds * 1000, 3),
+        "stock": {uc_amount.name: count for uc_amount, count in stock.items()},
+    }
+    logger.info("Expiry sweep finished: %s", metrics)
+    return metrics
@@ -1,7 +1,8 @@
-from domain.enums.promo import PromoField, PromoStatus, UcAmount
+from domain.enums.promo import ExportFormat, PromoField, PromoStatus, UcAmount
 
 __all__ = (
     "UcAmount",
     "PromoField",
     "PromoStatus",
+    "ExportFormat",
 )
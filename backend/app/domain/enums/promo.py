@@ -13,6 +13,13 @@ class UcAmount(str, Enum):
     UC3850 = "3850UC"
     ALL = "ALL"
 
+    @property
+    def units(self) -> int:
+        """Числовой номинал UC: 325 для значения 325UC"""
+        if self is UcAmount.ALL:
+            raise ValueError("ALL не является номиналом UC")
+        return int(self.value.removesuffix("UC"))
+
 
 class PromoField(str, Enum):
     """Поля промокода для фильтрации"""
@@ -29,3 +36,10 @@ class PromoStatus(str, Enum):
     ACTIVE = "active"
     USED = "used"
     EXPIRED = "expired"
+
+
+class ExportFormat(str, Enum):
+    """Форматы выгрузки промокодов"""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
@@ -1,13 +1,19 @@
+from .pagination import InvalidCursorException
 from .promo import (
     PromoCodeAlreadyExistsException,
     PromoCodeAlreadyUsedException,
     PromoCodeExpiredException,
     PromoCodeNotFoundException,
 )
+from .storefront import CardNotFoundException, CardPriceMismatchException, PromoOutOfStockException
 
 __all__ = (
     "PromoCodeAlreadyExistsException",
     "PromoCodeNotFoundException",
     "PromoCodeExpiredException",
     "PromoCodeAlreadyUsedException",
+    "InvalidCursorException",
+    "CardNotFoundException",
+    "CardPriceMismatchException",
+    "PromoOutOfStockException",
 )
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass(eq=False)
+class InvalidCursorException(Exception):
+    cursor: str
+
+    @property
+    def message(self) -> str:
+        return f"Некорректный курсор {self.cursor}"
@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+
+
+@dataclass(eq=False)
+class CardNotFoundException(Exception):
+    card_title: str
+
+    @property
+    def message(self) -> str:
+        return f"Товар {self.card_title} не найден"
+
+
+@dataclass(eq=False)
+class CardPriceMismatchException(Exception):
+    card_title: str
+    price: int
+
+    @property
+    def message(self) -> str:
+        return f"Цена товара {self.card_title} изменилась и больше не равна {self.price}"
+
+
+@dataclass(eq=False)
+class PromoOutOfStockException(Exception):
+    card_title: str
+
+    @property
+    def message(self) -> str:
+        return f"Промокоды {self.card_title} закончились"
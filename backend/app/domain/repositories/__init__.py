@@ -1,3 +1,14 @@
-from .promo import PromoRepository
+from .promo import PROMO_EXPORT_FIELDS, PromoRepository
+from .promo_queries import PromoQueries
+from .stock import StockCounter
+from .unit_of_work import UnitOfWork
+from .wallet import WalletRepository
 
-__all__ = ("PromoRepository",)
+__all__ = (
+    "PromoRepository",
+    "PROMO_EXPORT_FIELDS",
+    "PromoQueries",
+    "StockCounter",
+    "WalletRepository",
+    "UnitOfWork",
+)
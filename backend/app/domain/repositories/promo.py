@@ -1,8 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
 from domain.entities.promo import PromoEntity
+from domain.enums import UcAmount
+from domain.values import PageCursor, UserPromoRecord
+
+# Порядок колонок в строках, которые отдает PromoRepository.iter_export
+PROMO_EXPORT_FIELDS = (
+    "id",
+    "code",
+    "uc_amount",
+    "status",
+    "expires_at",
+    "used_by",
+    "used_at",
+    "created_at",
+)
 
 
 class PromoRepository(ABC):
@@ -10,6 +25,12 @@ class PromoRepository(ABC):
     async def save(self, promo_entity: PromoEntity) -> None:
         """Сохранение промокода"""
 
+    @abstractmethod
+    async def bulk_create(
+        self, codes: Sequence[str], uc_amount: UcAmount, expires_at: datetime
+    ) -> List[str]:
+        """Пакетная вставка промокодов, возвращает коды, которых еще не было в базе"""
+
     @abstractmethod
     async def get_by_id(self, pid: UUID) -> Optional[PromoEntity]:
         """Получение промокода по ID"""
@@ -24,10 +45,60 @@ class PromoRepository(ABC):
         uc_amount: Optional[str] = None,
         status: Optional[str] = None,
         limit: Optional[int] = None,
-        offset: Optional[int] = None,
+        cursor: Optional[PageCursor] = None,
     ) -> List[PromoEntity]:
-        """Получение списка промокодов с фильтрацией"""
+        """Получение списка промокодов с фильтрацией, от новых к старым, после cursor"""
+
+    @abstractmethod
+    async def get_user_history(
+        self, user_id: str, limit: int, cursor: Optional[PageCursor] = None
+    ) -> List[UserPromoRecord]:
+        """Промокоды, полученные пользователем, от новых к старым, после cursor"""
+
+    @abstractmethod
+    def iter_export(
+        self,
+        uc_amount: Optional[str] = None,
+        status: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[Sequence[Tuple]]:
+        """Потоковое чтение промокодов пачками кортежей в порядке PROMO_EXPORT_FIELDS"""
+
+    @abstractmethod
+    async def redeem(
+        self,
+        user_id: str,
+        *,
+        promo_id: Optional[UUID] = None,
+        code: Optional[str] = None,
+    ) -> PromoEntity:
+        """Атомарное использование промокода по ID или по коду.
+
+        Поднимает PromoCodeNotFoundException, PromoCodeAlreadyUsedException
+        или PromoCodeExpiredException, если промокод нельзя использовать.
+        """
+
+    @abstractmethod
+    async def allocate(self, uc_amount: UcAmount, user_id: str) -> PromoEntity:
+        """Выдача пользователю любого доступного промокода номинала uc_amount.
+
+        Конкурентные покупатели получают разные промокоды, не дожидаясь друг
+        друга. Поднимает PromoOutOfStockException, если свободных промокодов нет.
+        """
 
     @abstractmethod
-    async def delete(self, pid: UUID) -> bool:
-        """Удаление промокода"""
+    async def expire_batch(self, limit: int) -> List[UUID]:
+        """Пометка не более limit просроченных промокодов в отдельной транзакции"""
+
+    @abstractmethod
+    async def count_available(self) -> Dict[UcAmount, int]:
+        """Число активных непросроченных промокодов по номиналам"""
+
+    @abstractmethod
+    async def delete(self, pid: UUID) -> PromoEntity:
+        """Удаление промокода, возвращает его последнее состояние.
+
+        Поднимает PromoCodeNotFoundException или PromoCodeAlreadyUsedException,
+        если промокода нет или он уже использован.
+        """
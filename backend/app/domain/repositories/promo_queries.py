@@ -0,0 +1,23 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from domain.values import PageCursor, PromoListRow
+
+
+class PromoQueries(ABC):
+    """Чтение промокодов для ответов API без сборки сущностей
+
+    В отличие от PromoRepository выбирает только колонки, нужные ответу,
+    и отдает строки чтения. Для изменений и доменных проверок -
+    PromoRepository.
+    """
+
+    @abstractmethod
+    async def list_promos(
+        self,
+        uc_amount: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[PageCursor] = None,
+    ) -> List[PromoListRow]:
+        """Промокоды с фильтрацией, от новых к старым, после cursor"""
@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Mapping, Optional
+
+from domain.enums import UcAmount
+
+
+class StockCounter(ABC):
+    """Счетчики доступных промокодов по номиналам, которые витрина читает вместо базы"""
+
+    @abstractmethod
+    async def snapshot(self) -> Optional[Dict[UcAmount, int]]:
+        """Остатки по номиналам; None, если счетчики еще не сверены с базой"""
+
+    @abstractmethod
+    async def add(self, uc_amount: UcAmount, delta: int) -> None:
+        """Изменение остатка номинала на delta"""
+
+    @abstractmethod
+    async def reset(self, counts: Mapping[UcAmount, int]) -> None:
+        """Перезапись всех счетчиков точными значениями из базы"""
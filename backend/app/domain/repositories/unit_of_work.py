@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+
+from domain.entities.base import BaseEntity
+
+
+class UnitOfWork(ABC):
+    """Одна транзакция на прикладную операцию
+
+    Репозитории только отправляют изменения в базу, не фиксируя их.
+    Сервис отмечает сущности с событиями через collect и в конце операции
+    вызывает commit: события записываются в outbox и фиксируются вместе
+    с изменениями одним коммитом.
+    """
+
+    @abstractmethod
+    def collect(self, *entities: BaseEntity) -> None:
+        """Сущности, чьи события нужно записать при коммите"""
+
+    @abstractmethod
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Действие после следующего успешного коммита; при откате забывается"""
+
+    @abstractmethod
+    async def commit(self) -> None:
+        """Запись собранных событий и фиксация транзакции"""
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        """Откат транзакции; собранные сущности и действия после коммита забываются"""
@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from uuid import UUID
+
+from domain.values import WalletBalance
+
+
+class WalletRepository(ABC):
+    @abstractmethod
+    async def credit(self, user_id: str, amount: int, promo_id: UUID) -> int:
+        """Запись начисления в журнал и обновление баланса, возвращает новый баланс"""
+
+    @abstractmethod
+    async def get_balance(self, user_id: str) -> Optional[WalletBalance]:
+        """Текущий баланс пользователя"""
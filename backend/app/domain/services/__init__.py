@@ -1,3 +1,3 @@
-from .promo import PromoValidator
+from .promo import PromoCodeGenerator, PromoValidator
 
-__all__ = ("PromoValidator",)
+__all__ = ("PromoValidator", "PromoCodeGenerator")
@@ -1,5 +1,7 @@
+import secrets
+from base64 import b32encode
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List
 
 from domain.enums import PromoStatus
 from domain.exceptions.promo import PromoCodeAlreadyUsedException, PromoCodeExpiredException
@@ -18,3 +20,21 @@ class PromoValidator:
         if promo_entity.expiration.is_expired:
             promo_entity.status = PromoStatus.EXPIRED
             raise PromoCodeExpiredException(promo_entity.code)
+
+
+@dataclass
+class PromoCodeGenerator:
+    """Генератор случайных кодов в алфавите base32 (A-Z, 2-7)"""
+
+    length: int = 12
+
+    def generate(self, count: int, prefix: str = "") -> List[str]:
+        """Генерация count уникальных в пределах пачки кодов"""
+        codes: set[str] = set()
+        while len(codes) < count:
+            missing = count - len(codes)
+            # 5 случайных байт дают 8 символов base32
+            raw = b32encode(secrets.token_bytes(missing * self.length * 5 // 8 + 5)).decode()
+            for i in range(missing):
+                codes.add(prefix + raw[i * self.length : (i + 1) * self.length])
+        return list(codes)
@@ -1,7 +1,22 @@
-from .promo import PromoCodeExpiration, PromoCodeUsage, PromoValue
+from .pagination import Page, PageCursor
+from .promo import (
+    PromoBatch,
+    PromoCodeExpiration,
+    PromoCodeUsage,
+    PromoListRow,
+    PromoValue,
+    UserPromoRecord,
+)
+from .wallet import WalletBalance
 
 __all__ = (
     "PromoValue",
     "PromoCodeExpiration",
     "PromoCodeUsage",
+    "PromoBatch",
+    "Page",
+    "PageCursor",
+    "WalletBalance",
+    "UserPromoRecord",
+    "PromoListRow",
 )
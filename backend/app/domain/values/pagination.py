@@ -0,0 +1,38 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Generic, List, Optional, TypeVar
+from uuid import UUID
+
+from domain.exceptions.pagination import InvalidCursorException
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PageCursor:
+    """Позиция keyset-пагинации: ключ сортировки и ID последней строки страницы"""
+
+    sort_key: datetime
+    oid: UUID
+
+    def encode(self) -> str:
+        raw = json.dumps([self.sort_key.isoformat(), str(self.oid)], separators=(",", ":"))
+        return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "PageCursor":
+        try:
+            raw = urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            sort_key, oid = json.loads(raw)
+            return cls(sort_key=datetime.fromisoformat(sort_key), oid=UUID(oid))
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            raise InvalidCursorException(cursor=token)
+
+
+@dataclass(frozen=True)
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[PageCursor] = None
@@ -1,9 +1,9 @@
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import NamedTuple, Optional, Tuple
 from uuid import UUID
 
-from domain.enums import UcAmount
+from domain.enums import PromoStatus, UcAmount
 
 
 @dataclass(frozen=True)
@@ -37,8 +37,40 @@ class PromoCodeExpiration:
 @dataclass(frozen=True)
 class PromoCodeUsage:
     used_at: Optional[datetime] = None
-    used_by: Optional[UUID] = None
+    used_by: Optional[str] = None
 
     @staticmethod
-    def mark_used(user_id: UUID) -> "PromoCodeUsage":
+    def mark_used(user_id: str) -> "PromoCodeUsage":
         return PromoCodeUsage(used_at=datetime.now(timezone.utc), used_by=user_id)
+
+
+@dataclass(frozen=True)
+class PromoBatch:
+    uc_amount: UcAmount
+    expires_at: datetime
+    codes: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class UserPromoRecord:
+    """Строка истории пользователя: только поля из покрывающего индекса"""
+
+    oid: UUID
+    code: str
+    uc_amount: UcAmount
+    used_at: datetime
+
+
+class PromoListRow(NamedTuple):
+    """Строка списка промокодов: колонки ответа и ключ сортировки, без сущности
+
+    Кортеж, а не dataclass: строится из строки результата без __init__ с
+    проверками и без словаря атрибутов на каждый экземпляр.
+    """
+
+    oid: UUID
+    code: str
+    uc_amount: UcAmount
+    status: PromoStatus
+    expires_at: datetime
+    created_at: datetime
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class WalletBalance:
+    user_id: str
+    balance: int = 0
+    updated_at: Optional[datetime] = None
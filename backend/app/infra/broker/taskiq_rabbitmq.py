@@ -1,7 +1,8 @@
 from settings.config import settings
 from taskiq import TaskiqScheduler
+from taskiq.schedule_sources import LabelScheduleSource
 from taskiq_aio_pika import AioPikaBroker
 
 rabbitmq_broker = AioPikaBroker(url=settings.rabbit.url.encoded_string())
 
-scheduler = TaskiqScheduler(broker=rabbitmq_broker, sources=[])
+scheduler = TaskiqScheduler(broker=rabbitmq_broker, sources=[LabelScheduleSource(rabbitmq_broker)])
@@ -0,0 +1,397 @@
+import asyncio
+import fcntl
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from domain.entities import PromoEntity
+from domain.enums import UcAmount
+from domain.exceptions.promo import PromoCodeNotFoundException
+from domain.repositories import PromoRepository, UnitOfWork
+from infra.cache.delegating import DelegatingPromoRepository
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+# magic, версия, число бит m, число хэш-функций k и позиция в потоке кодов
+# (ID записи Redis Stream: миллисекунды и номер), до которой фильтр полон
+HEADER = struct.Struct("<4sIQIQQ")
+FEED_ID = struct.Struct("<QQ")
+FEED_ID_OFFSET = HEADER.size - FEED_ID.size
+MAGIC = b"PBLM"
+VERSION = 1
+
+# ID записи Redis Stream как (миллисекунды, номер)
+FeedId = Tuple[int, int]
+NO_FEED_ID: FeedId = (0, 0)
+FEED_CHUNK_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class BloomFilterStats:
+    capacity: int
+    bits: int
+    hash_count: int
+    size_bytes: int
+    fill_ratio: float
+    estimated_false_positive_rate: float
+    bytes_per_million: int
+    synced: bool
+
+
+class BloomFilter:
+    """Фильтр Блума в memory-mapped файле, общий для всех воркеров gunicorn
+
+    Запись в файл идет под fcntl-блокировкой, чтение - без блокировок.
+    Удалить элемент из фильтра нельзя: бит удаленного кода остается
+    выставленным и лишь немного повышает долю ложных срабатываний.
+
+    Коды, созданные на других хостах, приходят через BloomFilterFeed.
+    Пока воркер не догнал поток (synced), фильтр ничего не отвергает:
+    ложный отказ для существующего кода хуже лишнего запроса в базу.
+    """
+
+    def __init__(self, path: str, capacity: int) -> None:
+        self.path = path
+        self.capacity = capacity
+        self.synced = False
+        self._open()
+
+    def _open(self) -> None:
+        self._file = open(self.path, "r+b")
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        magic, version, self.bits, self.hash_count, *_ = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path} не является файлом фильтра Блума")
+
+    @staticmethod
+    def optimal_parameters(capacity: int, error_rate: float) -> Tuple[int, int]:
+        """Число бит и хэш-функций для capacity элементов и заданной доли ошибок"""
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hash_count = max(1, round(bits / capacity * math.log(2)))
+        return bits, hash_count
+
+    @classmethod
+    def create(
+        cls, path: str, capacity: int, error_rate: float, feed_id: FeedId = NO_FEED_ID
+    ) -> "BloomFilter":
+        bits, hash_count = cls.optimal_parameters(capacity, error_rate)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, bits, hash_count, *feed_id))
+            f.truncate(HEADER.size + (bits + 7) // 8)
+        return cls(path, capacity)
+
+    @property
+    def feed_id(self) -> FeedId:
+        """Позиция в потоке кодов; читается из файла, ее двигают все воркеры хоста"""
+        return FEED_ID.unpack_from(self._mmap, FEED_ID_OFFSET)
+
+    def advance(self, feed_id: FeedId) -> None:
+        with self._locked():
+            if feed_id > self.feed_id:
+                FEED_ID.pack_into(self._mmap, FEED_ID_OFFSET, *feed_id)
+
+    def reopen(self) -> None:
+        """Переоткрытие файла после того, как его заменило перестроение"""
+        self.close()
+        self._open()
+
+    def _positions(self, code: str) -> List[int]:
+        digest = hashlib.blake2b(code.encode(), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        return [(h1 + i * h2) % self.bits for i in range(self.hash_count)]
+
+    def __contains__(self, code: str) -> bool:
+        data = self._mmap
+        for position in self._positions(code):
+            if not data[HEADER.size + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def rejects(self, code: str) -> bool:
+        """Кода заведомо нет в базе"""
+        return self.synced and code not in self
+
+    def add_many(self, codes: Iterable[str]) -> None:
+        data = self._mmap
+        with self._locked():
+            for code in codes:
+                for position in self._positions(code):
+                    data[HEADER.size + (position >> 3)] |= 1 << (position & 7)
+
+    def add(self, code: str) -> None:
+        self.add_many((code,))
+
+    def stats(self) -> BloomFilterStats:
+        set_bits = int.from_bytes(self._mmap[HEADER.size :], "little").bit_count()
+        fill_ratio = set_bits / self.bits
+        return BloomFilterStats(
+            capacity=self.capacity,
+            bits=self.bits,
+            hash_count=self.hash_count,
+            size_bytes=len(self._mmap),
+            fill_ratio=fill_ratio,
+            estimated_false_positive_rate=fill_ratio**self.hash_count,
+            bytes_per_million=round(self.bits / 8 / self.capacity * 1_000_000),
+            synced=self.synced,
+        )
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def _locked(self) -> "_FileLock":
+        return _FileLock(self._file.fileno())
+
+
+class _FileLock:
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+
+    def __enter__(self) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc: object) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+def parse_feed_id(raw: bytes) -> FeedId:
+    ms, seq = raw.split(b"-")
+    return int(ms), int(seq)
+
+
+def format_feed_id(feed_id: FeedId) -> str:
+    return f"{feed_id[0]}-{feed_id[1]}"
+
+
+class BloomFilterFeed:
+    """Поток новых кодов в Redis Stream, общий для всех хостов API
+
+    Коды публикуются после коммита: запись потока с ID не больше позиции,
+    с которой строится фильтр, гарантированно видна в снимке базы. Коды,
+    которые не удалось опубликовать, повторяются следующим шагом
+    BloomFilterFollower этого воркера.
+    """
+
+    def __init__(self, redis: Redis, stream: str, maxlen: int) -> None:
+        self.redis = redis
+        self.stream = stream
+        self.maxlen = maxlen
+        self.pending: List[str] = []
+
+    async def mark(self) -> FeedId:
+        """Пустая запись-метка: позиция, с которой продолжает новый фильтр"""
+        return parse_feed_id(await self._add(""))
+
+    async def publish(self, codes: Sequence[str]) -> None:
+        self.pending.extend(codes)
+        try:
+            await self.flush_pending()
+        except RedisError as e:
+            logger.warning("Bloom filter feed publish failed: %s", e)
+
+    async def flush_pending(self) -> None:
+        while self.pending:
+            chunk = self.pending[:FEED_CHUNK_SIZE]
+            del self.pending[:FEED_CHUNK_SIZE]
+            try:
+                await self._add("\n".join(chunk))
+            except RedisError:
+                self.pending[:0] = chunk
+                raise
+
+    async def covers(self, feed_id: FeedId) -> bool:
+        """В потоке остались все записи после feed_id: старые обрезаются по maxlen"""
+        first = await self.redis.xrange(self.stream, count=1)
+        return bool(first) and parse_feed_id(first[0][0]) <= feed_id
+
+    async def read(
+        self, after: FeedId, count: int, block_ms: int
+    ) -> Tuple[FeedId, List[str], bool]:
+        """Коды из записей после after, позиция последней записи и признак конца потока"""
+        response = await self.redis.xread(
+            {self.stream: format_feed_id(after)}, count=count, block=block_ms
+        )
+        entries = response[0][1] if response else []
+        codes = [
+            code for _, fields in entries for code in fields[b"codes"].decode().split("\n") if code
+        ]
+        last = parse_feed_id(entries[-1][0]) if entries else after
+        return last, codes, len(entries) < count
+
+    async def _add(self, codes: str) -> bytes:
+        return await self.redis.xadd(
+            self.stream, {"codes": codes}, maxlen=self.maxlen, approximate=True
+        )
+
+
+class BloomFilterFollower:
+    """Переносит в фильтр коды, созданные на других хостах
+
+    Работает в каждом воркере; повторное добавление кода ничего не меняет.
+    Записи читаются из source, блокирующим XREAD на отдельном соединении:
+    простаивающий воркер делает один запрос за block_ms. Полнота потока
+    проверяется при старте, после сбоя Redis и после отставания на целую
+    пачку. Если поток потерял записи после позиции фильтра (Redis
+    перезапущен или хост отстал дольше, чем хранит maxlen), фильтр
+    перестраивается, а до конца перестроения ничего не отвергает.
+    """
+
+    def __init__(
+        self,
+        bloom_filter: BloomFilter,
+        feed: BloomFilterFeed,
+        source: BloomFilterFeed,
+        rebuild: Callable[[], Awaitable[None]],
+        batch_size: int,
+        block_ms: int,
+        retry_seconds: float,
+    ) -> None:
+        self.bloom_filter = bloom_filter
+        self.feed = feed
+        self.source = source
+        self.rebuild = rebuild
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.retry_seconds = retry_seconds
+        self._check_coverage = True
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.step()
+            except RedisError as e:
+                logger.warning("Bloom filter feed read failed: %s", e)
+                await asyncio.sleep(self.retry_seconds)
+
+    async def step(self) -> None:
+        try:
+            await self.feed.flush_pending()
+            if self._check_coverage:
+                if not await self.source.covers(self.bloom_filter.feed_id):
+                    self.bloom_filter.synced = False
+                    await self.rebuild()
+                self._check_coverage = False
+
+            feed_id, codes, caught_up = await self.source.read(
+                self.bloom_filter.feed_id, self.batch_size, self.block_ms
+            )
+        except RedisError:
+            # Пока соединения нет, записи могут вытесняться из потока
+            self.bloom_filter.synced = False
+            self._check_coverage = True
+            raise
+
+        if codes:
+            self.bloom_filter.add_many(codes)
+        self.bloom_filter.advance(feed_id)
+        self.bloom_filter.synced = caught_up
+        self._check_coverage = not caught_up
+
+
+class BloomFilteredPromoRepository(DelegatingPromoRepository):
+    """Отсекает заведомо несуществующие коды до обращения к сессии"""
+
+    def __init__(
+        self,
+        inner: PromoRepository,
+        bloom_filter: BloomFilter,
+        feed: BloomFilterFeed,
+        unit_of_work: UnitOfWork,
+    ) -> None:
+        super().__init__(inner)
+        self.bloom_filter = bloom_filter
+        self.feed = feed
+        self.unit_of_work = unit_of_work
+
+    async def save(self, promo_entity: PromoEntity) -> None:
+        # Код попадает в фильтр до вставки, чтобы другие воркеры хоста не отвергли
+        # его в промежутке между фиксацией транзакции и обновлением фильтра;
+        # остальным хостам он уходит через поток после коммита
+        self.bloom_filter.add(promo_entity.code)
+        await self.inner.save(promo_entity)
+        self.unit_of_work.after_commit(partial(self.feed.publish, [promo_entity.code]))
+
+    async def bulk_create(
+        self, codes: Sequence[str], uc_amount: UcAmount, expires_at: datetime
+    ) -> List[str]:
+        self.bloom_filter.add_many(codes)
+        inserted = await self.inner.bulk_create(codes, uc_amount, expires_at)
+        if inserted:
+            self.unit_of_work.after_commit(partial(self.feed.publish, inserted))
+        return inserted
+
+    async def get_by_code(self, code: str) -> Optional[PromoEntity]:
+        if self.bloom_filter.rejects(code):
+            return None
+        return await self.inner.get_by_code(code)
+
+    async def redeem(
+        self,
+        user_id: str,
+        *,
+        promo_id: Optional[UUID] = None,
+        code: Optional[str] = None,
+    ) -> PromoEntity:
+        if code is not None and self.bloom_filter.rejects(code):
+            raise PromoCodeNotFoundException(code=code)
+        return await self.inner.redeem(user_id, promo_id=promo_id, code=code)
+
+
+async def open_or_build(
+    path: str,
+    capacity: int,
+    error_rate: float,
+    codes: AsyncIterator[Sequence[str]],
+    feed: BloomFilterFeed,
+) -> BloomFilter:
+    """Открывает фильтр, который поток кодов может дополнить, или строит новый
+
+    Файл переиспользуется, только если в потоке остались все записи после
+    его позиции, иначе фильтр строится из базы. Построение идет во временный
+    файл под блокировкой и заканчивается атомарной заменой, поэтому воркеры
+    не видят недостроенный фильтр. Позиция - метка, добавленная в поток до
+    чтения базы: коды, опубликованные до нее, уже закоммичены и попадут в
+    снимок, остальные догонит BloomFilterFollower.
+    """
+    with open(path + ".lock", "a+b") as lock_file, _FileLock(lock_file.fileno()):
+        if os.path.exists(path):
+            try:
+                existing = BloomFilter(path, capacity)
+            except ValueError:
+                pass
+            else:
+                try:
+                    if await feed.covers(existing.feed_id):
+                        return existing
+                except RedisError as e:
+                    logger.warning("Bloom filter feed check failed: %s", e)
+                existing.close()
+
+        try:
+            feed_id = await feed.mark()
+        except RedisError as e:
+            # Без метки позиция нулевая: при первом доступе к Redis
+            # BloomFilterFollower перестроит фильтр
+            logger.warning("Bloom filter feed mark failed: %s", e)
+            feed_id = NO_FEED_ID
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        bloom_filter = BloomFilter.create(tmp_path, capacity, error_rate, feed_id)
+        async for chunk in codes:
+            bloom_filter.add_many(chunk)
+        bloom_filter.close()
+        os.replace(tmp_path, path)
+
+    return BloomFilter(path, capacity)
@@ -0,0 +1,82 @@
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from domain.entities import PromoEntity
+from domain.enums import UcAmount
+from domain.repositories import PromoRepository
+from domain.values import PageCursor, UserPromoRecord
+
+
+class DelegatingPromoRepository(PromoRepository):
+    """Репозиторий-обертка, передающий все вызовы во внутренний репозиторий
+
+    Кэш, фильтр Блума, single-flight и счетчики остатков наследуются от него
+    и переопределяют только те методы, которые перехватывают. Новый метод
+    PromoRepository добавляется сюда, и все обертки пропускают его насквозь.
+    """
+
+    def __init__(self, inner: PromoRepository) -> None:
+        self.inner = inner
+
+    async def save(self, promo_entity: PromoEntity) -> None:
+        await self.inner.save(promo_entity)
+
+    async def bulk_create(
+        self, codes: Sequence[str], uc_amount: UcAmount, expires_at: datetime
+    ) -> List[str]:
+        return await self.inner.bulk_create(codes, uc_amount, expires_at)
+
+    async def get_by_id(self, pid: UUID) -> Optional[PromoEntity]:
+        return await self.inner.get_by_id(pid)
+
+    async def get_by_code(self, code: str) -> Optional[PromoEntity]:
+        return await self.inner.get_by_code(code)
+
+    async def get_all(
+        self,
+        uc_amount: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[PageCursor] = None,
+    ) -> List[PromoEntity]:
+        return await self.inner.get_all(
+            uc_amount=uc_amount, status=status, limit=limit, cursor=cursor
+        )
+
+    async def get_user_history(
+        self, user_id: str, limit: int, cursor: Optional[PageCursor] = None
+    ) -> List[UserPromoRecord]:
+        return await self.inner.get_user_history(user_id, limit, cursor=cursor)
+
+    def iter_export(
+        self,
+        uc_amount: Optional[str] = None,
+        status: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[Sequence[Tuple]]:
+        return self.inner.iter_export(
+            uc_amount=uc_amount, status=status, created_from=created_from, created_to=created_to
+        )
+
+    async def redeem(
+        self,
+        user_id: str,
+        *,
+        promo_id: Optional[UUID] = None,
+        code: Optional[str] = None,
+    ) -> PromoEntity:
+        return await self.inner.redeem(user_id, promo_id=promo_id, code=code)
+
+    async def allocate(self, uc_amount: UcAmount, user_id: str) -> PromoEntity:
+        return await self.inner.allocate(uc_amount, user_id)
+
+    async def expire_batch(self, limit: int) -> List[UUID]:
+        return await self.inner.expire_batch(limit)
+
+    async def count_available(self) -> Dict[UcAmount, int]:
+        return await self.inner.count_available()
+
+    async def delete(self, pid: UUID) -> PromoEntity:
+        return await self.inner.delete(pid)
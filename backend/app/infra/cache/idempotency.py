@@ -0,0 +1,120 @@
+import asyncio
+import base64
+import logging
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+IDEMPOTENCY_KEY_PREFIX = "idempotency:"
+# Значение ключа, пока первый запрос еще выполняется
+IN_FLIGHT_MARKER = b"in-flight"
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """Ответ на первый запрос с ключом идемпотентности"""
+
+    fingerprint: str
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+    def dumps(self) -> bytes:
+        return orjson.dumps(
+            {
+                "fingerprint": self.fingerprint,
+                "status": self.status,
+                "headers": [
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in self.headers
+                ],
+                "body": base64.b64encode(self.body).decode(),
+            }
+        )
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "StoredResponse":
+        data = orjson.loads(raw)
+        return cls(
+            fingerprint=data["fingerprint"],
+            status=data["status"],
+            headers=[
+                (name.encode("latin-1"), value.encode("latin-1")) for name, value in data["headers"]
+            ],
+            body=base64.b64decode(data["body"]),
+        )
+
+
+class IdempotencyKeyInFlight(Exception):
+    """Первый запрос с этим ключом не завершился за отведенное время ожидания"""
+
+
+class IdempotencyStore:
+    """Хранение ответов по ключам идемпотентности в Redis
+
+    Первый запрос ставит маркер SET NX и выполняется, остальные с тем же
+    ключом опрашивают Redis, пока не появится сохраненный ответ. Маркер живет
+    lock_seconds, поэтому упавший воркер не блокирует ключ навсегда.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        ttl_seconds: int,
+        lock_seconds: int,
+        wait_seconds: float,
+        poll_interval: float,
+    ) -> None:
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_interval = poll_interval
+
+    async def begin(self, key: str) -> Optional[StoredResponse]:
+        """Захват ключа или ответ первого запроса
+
+        None означает, что ключ захвачен и запрос нужно выполнить. Если Redis
+        недоступен, также возвращается None: запрос выполняется без защиты.
+        """
+        redis_key = IDEMPOTENCY_KEY_PREFIX + key
+        deadline = time.monotonic() + self.wait_seconds
+        try:
+            while True:
+                if await self.redis.set(redis_key, IN_FLIGHT_MARKER, nx=True, ex=self.lock_seconds):
+                    return None
+
+                raw = await self.redis.get(redis_key)
+                # raw is None: первый запрос завершился ошибкой и снял маркер
+                if raw is not None and raw != IN_FLIGHT_MARKER:
+                    return StoredResponse.loads(raw)
+
+                if time.monotonic() >= deadline:
+                    raise IdempotencyKeyInFlight(key)
+                if raw is not None:
+                    await asyncio.sleep(self.poll_interval)
+        except RedisError as e:
+            logger.warning("Idempotency key check failed: %s", e)
+            return None
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        try:
+            await self.redis.set(
+                IDEMPOTENCY_KEY_PREFIX + key, response.dumps(), ex=self.ttl_seconds
+            )
+        except RedisError as e:
+            logger.warning("Idempotent response save failed: %s", e)
+
+    async def abort(self, key: str) -> None:
+        """Снятие маркера, чтобы повтор запроса выполнился заново"""
+        try:
+            await self.redis.delete(IDEMPOTENCY_KEY_PREFIX + key)
+        except RedisError as e:
+            logger.warning("Idempotency key release failed: %s", e)
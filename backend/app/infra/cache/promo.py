@@ -0,0 +1,199 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import partial
+from typing import Optional
+from uuid import UUID
+
+import orjson
+from domain.entities import PromoEntity
+from domain.enums import PromoStatus, UcAmount
+from domain.repositories import PromoRepository, UnitOfWork
+from domain.values import PromoCodeExpiration, PromoCodeUsage, PromoValue
+from infra.cache.delegating import DelegatingPromoRepository
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+REDIS_RETRY_DELAY_SECONDS = 5.0
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    errors: int = 0
+    # После ошибки Redis не опрашивается до этого момента (time.monotonic)
+    suspended_until: float = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.suspended_until
+
+    def record_error(self) -> None:
+        self.errors += 1
+        self.suspended_until = time.monotonic() + REDIS_RETRY_DELAY_SECONDS
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CachedPromoRepository(DelegatingPromoRepository):
+    """Read-through кэш в Redis для поиска промокодов по ID и по коду
+
+    При недоступности Redis все операции уходят во внутренний репозиторий.
+    Измененные промокоды удаляются из кэша после коммита единицы работы:
+    поиск между удалением и коммитом иначе вернул бы в кэш старую строку
+    на ttl_seconds.
+    expire_batch ключи не сбрасывает: TTL записей не превышает expires_at,
+    поэтому к моменту пометки просроченные промокоды уже вытеснены из кэша.
+    """
+
+    def __init__(
+        self,
+        inner: PromoRepository,
+        redis: Redis,
+        stats: CacheStats,
+        ttl_seconds: int,
+        unit_of_work: UnitOfWork,
+    ) -> None:
+        super().__init__(inner)
+        self.redis = redis
+        self.stats = stats
+        self.ttl_seconds = ttl_seconds
+        self.unit_of_work = unit_of_work
+
+    async def save(self, promo_entity: PromoEntity) -> None:
+        await self.inner.save(promo_entity)
+        self._invalidate_after_commit(promo_entity.oid, promo_entity.code)
+
+    async def get_by_id(self, pid: UUID) -> Optional[PromoEntity]:
+        cached = await self._get(self._id_key(str(pid)))
+        if cached is not None:
+            return cached
+
+        promo_entity = await self.inner.get_by_id(pid)
+        if promo_entity is not None:
+            await self._set(promo_entity)
+        return promo_entity
+
+    async def get_by_code(self, code: str) -> Optional[PromoEntity]:
+        cached = await self._get(self._code_key(code))
+        if cached is not None:
+            return cached
+
+        promo_entity = await self.inner.get_by_code(code)
+        if promo_entity is not None:
+            await self._set(promo_entity)
+        return promo_entity
+
+    async def redeem(
+        self,
+        user_id: str,
+        *,
+        promo_id: Optional[UUID] = None,
+        code: Optional[str] = None,
+    ) -> PromoEntity:
+        promo_entity = await self.inner.redeem(user_id, promo_id=promo_id, code=code)
+        self._invalidate_after_commit(promo_entity.oid, promo_entity.code)
+        return promo_entity
+
+    async def allocate(self, uc_amount: UcAmount, user_id: str) -> PromoEntity:
+        promo_entity = await self.inner.allocate(uc_amount, user_id)
+        self._invalidate_after_commit(promo_entity.oid, promo_entity.code)
+        return promo_entity
+
+    async def delete(self, pid: UUID) -> PromoEntity:
+        promo_entity = await self.inner.delete(pid)
+        self._invalidate_after_commit(promo_entity.oid, promo_entity.code)
+        return promo_entity
+
+    @staticmethod
+    def _id_key(oid: str) -> str:
+        return f"promo:id:{oid}"
+
+    @staticmethod
+    def _code_key(code: str) -> str:
+        return f"promo:code:{code}"
+
+    async def _get(self, key: str, count: bool = True) -> Optional[PromoEntity]:
+        if not self.stats.available:
+            return None
+        try:
+            raw = await self.redis.get(key)
+        except RedisError as e:
+            self.stats.record_error()
+            logger.warning("Promo cache read failed: %s", e)
+            return None
+
+        if count:
+            if raw is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return self._decode(raw) if raw is not None else None
+
+    async def _set(self, promo_entity: PromoEntity) -> None:
+        ttl = min(
+            self.ttl_seconds,
+            int((promo_entity.expires_at - datetime.now(timezone.utc)).total_seconds()),
+        )
+        if ttl <= 0 or not self.stats.available:
+            return
+
+        raw = self._encode(promo_entity)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(self._id_key(promo_entity.oid), raw, ex=ttl)
+                pipe.set(self._code_key(promo_entity.code), raw, ex=ttl)
+                await pipe.execute()
+        except RedisError as e:
+            self.stats.record_error()
+            logger.warning("Promo cache write failed: %s", e)
+
+    def _invalidate_after_commit(self, oid: str, code: str) -> None:
+        self.unit_of_work.after_commit(partial(self._invalidate, oid, code))
+
+    async def _invalidate(self, oid: str, code: str) -> None:
+        try:
+            await self.redis.delete(self._id_key(oid), self._code_key(code))
+        except RedisError as e:
+            self.stats.record_error()
+            logger.warning("Promo cache invalidation failed: %s", e)
+
+    @staticmethod
+    def _encode(promo_entity: PromoEntity) -> bytes:
+        return orjson.dumps(
+            {
+                "id": promo_entity.oid,
+                "code": promo_entity.code,
+                "uc_amount": promo_entity.uc_amount,
+                "status": promo_entity.status,
+                "expires_at": promo_entity.expires_at,
+                "used_by": promo_entity.usage.used_by,
+                "used_at": promo_entity.usage.used_at,
+                "created_at": promo_entity.created_at,
+            },
+            default=str,
+        )
+
+    @staticmethod
+    def _decode(raw: bytes) -> PromoEntity:
+        data = orjson.loads(raw)
+        used_at = data["used_at"]
+        return PromoEntity(
+            oid=data["id"],
+            promo_code=PromoValue(code=data["code"], uc_amount=UcAmount(data["uc_amount"])),
+            expiration=PromoCodeExpiration(expires_at=datetime.fromisoformat(data["expires_at"])),
+            usage=PromoCodeUsage(
+                used_at=datetime.fromisoformat(used_at) if used_at else None,
+                used_by=data["used_by"],
+            ),
+            status=PromoStatus(data["status"]),
+            created_at=datetime.fromisoformat(data["created_at"]),
+        )
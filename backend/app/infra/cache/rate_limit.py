@@ -0,0 +1,101 @@
+import logging
+from dataclasses import dataclass
+from typing import Sequence
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+RATE_LIMIT_KEY_PREFIX = "ratelimit:"
+
+# Проверка и списание по всем корзинам KEYS атомарно: жетон списывается
+# только если он есть в каждой корзине. ARGV попарно задают скорость
+# пополнения (жетонов в секунду) и емкость для соответствующего ключа.
+# Время берется из Redis, поэтому часы воркеров не влияют на результат.
+# Возвращает {1, 0} при успехе или {0, мс до появления жетона}.
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local tokens = {}
+local wait_ms = 0
+
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2 - 1])
+    local capacity = tonumber(ARGV[i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = tonumber(state[1])
+    local ts = tonumber(state[2])
+    if available == nil then
+        available = capacity
+    else
+        available = math.min(capacity, available + (now - ts) * rate / 1000)
+    end
+    tokens[i] = available
+    if available < 1 then
+        wait_ms = math.max(wait_ms, math.ceil((1 - available) * 1000 / rate))
+    end
+end
+
+local allowed = wait_ms == 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2 - 1])
+    local capacity = tonumber(ARGV[i * 2])
+    local left = tokens[i]
+    if allowed then
+        left = left - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(left), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity * 1000 / rate))
+end
+
+if allowed then
+    return {1, 0}
+end
+return {0, wait_ms}
+"""
+
+
+@dataclass(frozen=True)
+class TokenBucket:
+    """Корзина жетонов: rate жетонов в секунду, не больше capacity подряд"""
+
+    rate: float
+    capacity: int
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    retry_after_seconds: float = 0.0
+
+
+class TokenBucketRateLimiter:
+    """Ограничение частоты запросов корзинами жетонов в Redis
+
+    Все корзины одного запроса проверяются одним вызовом EVALSHA (скрипт
+    загружается в Redis при первом вызове). При недоступности Redis запрос
+    пропускается: ограничитель защищает пул соединений, а не заменяет его.
+    """
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+        self._script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def acquire(self, buckets: Sequence[tuple[str, TokenBucket]]) -> RateLimitDecision:
+        """Списание жетона из каждой корзины; buckets - пары (ключ, корзина)"""
+        if not buckets:
+            return RateLimitDecision(allowed=True)
+
+        keys = [RATE_LIMIT_KEY_PREFIX + key for key, _ in buckets]
+        args = [value for _, bucket in buckets for value in (bucket.rate, bucket.capacity)]
+        try:
+            allowed, wait_ms = await self._script(keys=keys, args=args)
+        except RedisError as e:
+            logger.warning("Rate limit check failed: %s", e)
+            return RateLimitDecision(allowed=True)
+
+        if allowed:
+            return RateLimitDecision(allowed=True)
+        return RateLimitDecision(allowed=False, retry_after_seconds=int(wait_ms) / 1000)
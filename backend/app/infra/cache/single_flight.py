@@ -0,0 +1,169 @@
+import asyncio
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from domain.entities import PromoEntity
+from domain.enums import UcAmount
+from domain.repositories import PromoRepository, UnitOfWork
+from infra.cache.delegating import DelegatingPromoRepository
+
+
+@dataclass
+class SingleFlightStats:
+    # Запросы, выполнившие поиск сами
+    leaders: int = 0
+    # Запросы, дождавшиеся чужого поиска
+    coalesced: int = 0
+    # Запросы, получившие недавний результат из окна
+    window_hits: int = 0
+
+    @property
+    def coalesced_ratio(self) -> float:
+        total = self.leaders + self.coalesced + self.window_hits
+        return (self.coalesced + self.window_hits) / total if total else 0.0
+
+
+class PromoLookupFlights:
+    """Объединение одинаковых одновременных поисков промокода в одном воркере
+
+    Первый запрос по ключу выполняет поиск, остальные ждут его future.
+    Результат еще window_seconds отдается без обращения к базе. Коммит
+    изменений промокодов в этом воркере сбрасывает окно и отвязывает
+    выполняющиеся поиски, чтобы новые запросы не получили старое состояние.
+    """
+
+    def __init__(self, stats: SingleFlightStats, window_seconds: float) -> None:
+        self.stats = stats
+        self.window_seconds = window_seconds
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._recent: Dict[str, Tuple[float, Optional[PromoEntity]]] = {}
+        self._generation = 0
+
+    async def do(
+        self, key: str, lookup: Callable[[], Awaitable[Optional[PromoEntity]]]
+    ) -> Optional[PromoEntity]:
+        recent = self._recent.get(key)
+        if recent is not None:
+            if time.monotonic() < recent[0]:
+                self.stats.window_hits += 1
+                return self._copy(recent[1])
+            del self._recent[key]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Отменен ведущий запрос, а не этот: ищем сами
+                if not future.cancelled():
+                    raise
+            else:
+                self.stats.coalesced += 1
+                return self._copy(result)
+
+        return await self._lead(key, lookup)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._in_flight.clear()
+        self._recent.clear()
+
+    async def _lead(
+        self, key: str, lookup: Callable[[], Awaitable[Optional[PromoEntity]]]
+    ) -> Optional[PromoEntity]:
+        self.stats.leaders += 1
+        generation = self._generation
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await lookup()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Ожидающих может не быть, исключение уже выброшено этому запросу
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if generation == self._generation and self.window_seconds > 0:
+                self._recent[key] = (time.monotonic() + self.window_seconds, result)
+            return self._copy(result)
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    @staticmethod
+    def _copy(promo_entity: Optional[PromoEntity]) -> Optional[PromoEntity]:
+        # Каждый запрос получает свою сущность: ее события и статус меняются
+        if promo_entity is None:
+            return None
+        return replace(promo_entity, _events=[])
+
+
+class SingleFlightPromoRepository(DelegatingPromoRepository):
+    """Поиск промокода по ID и коду через PromoLookupFlights
+
+    Записи сбрасывают поиски после коммита единицы работы: поиск, начатый
+    до коммита, иначе снова запомнил бы старое состояние на окно.
+    """
+
+    def __init__(
+        self, inner: PromoRepository, flights: PromoLookupFlights, unit_of_work: UnitOfWork
+    ) -> None:
+        super().__init__(inner)
+        self.flights = flights
+        self.unit_of_work = unit_of_work
+
+    async def save(self, promo_entity: PromoEntity) -> None:
+        await self.inner.save(promo_entity)
+        self._invalidate_after_commit()
+
+    async def bulk_create(
+        self, codes: Sequence[str], uc_amount: UcAmount, expires_at: datetime
+    ) -> List[str]:
+        inserted = await self.inner.bulk_create(codes, uc_amount, expires_at)
+        self._invalidate_after_commit()
+        return inserted
+
+    async def get_by_id(self, pid: UUID) -> Optional[PromoEntity]:
+        return await self.flights.do(f"id:{pid}", lambda: self.inner.get_by_id(pid))
+
+    async def get_by_code(self, code: str) -> Optional[PromoEntity]:
+        return await self.flights.do(f"code:{code}", lambda: self.inner.get_by_code(code))
+
+    async def redeem(
+        self,
+        user_id: str,
+        *,
+        promo_id: Optional[UUID] = None,
+        code: Optional[str] = None,
+    ) -> PromoEntity:
+        promo_entity = await self.inner.redeem(user_id, promo_id=promo_id, code=code)
+        self._invalidate_after_commit()
+        return promo_entity
+
+    async def allocate(self, uc_amount: UcAmount, user_id: str) -> PromoEntity:
+        promo_entity = await self.inner.allocate(uc_amount, user_id)
+        self._invalidate_after_commit()
+        return promo_entity
+
+    async def expire_batch(self, limit: int) -> List[UUID]:
+        expired = await self.inner.expire_batch(limit)
+        self._invalidate_after_commit()
+        return expired
+
+    async def delete(self, pid: UUID) -> PromoEntity:
+        promo_entity = await self.inner.delete(pid)
+        self._invalidate_after_commit()
+        return promo_entity
+
+    def _invalidate_after_commit(self) -> None:
+        self.unit_of_work.after_commit(self._invalidate)
+
+    async def _invalidate(self) -> None:
+        self.flights.invalidate()
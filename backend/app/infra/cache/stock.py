@@ -0,0 +1,142 @@
+import logging
+import time
+from datetime import datetime, timezone
+from functools import partial
+from typing import Dict, List, Mapping, Optional, Sequence
+from uuid import UUID
+
+from domain.entities import PromoEntity
+from domain.enums import PromoStatus, UcAmount
+from domain.events import CreatedPromoCodeEvent
+from domain.repositories import PromoRepository, StockCounter, UnitOfWork
+from infra.cache.delegating import DelegatingPromoRepository
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+STOCK_KEY = "promo:stock"
+# Поле появляется после первой сверки: до нее HINCRBY дает лишь частичные суммы
+SYNCED_FIELD = b"synced"
+
+
+class PromoStockCounter(StockCounter):
+    """Счетчики доступных промокодов по номиналам в хэше Redis
+
+    Счетчики меняются через HINCRBY без блокировок в базе и периодически
+    сверяются с promo_codes (reconcile), что исправляет расхождения после
+    сбоев Redis и остановки воркера между коммитом и обновлением счетчиков.
+    Снимок хэша кэшируется в процессе на ttl_seconds, поэтому витрина ходит
+    в Redis не чаще раза в ttl_seconds.
+    """
+
+    def __init__(self, redis: Redis, ttl_seconds: float) -> None:
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[Dict[UcAmount, int]] = None
+        self._snapshot_expires_at = 0.0
+
+    async def snapshot(self) -> Optional[Dict[UcAmount, int]]:
+        """Остатки по номиналам; None, если счетчики еще не заполнены или Redis недоступен"""
+        if self._snapshot is not None and time.monotonic() < self._snapshot_expires_at:
+            return self._snapshot
+
+        try:
+            raw = await self.redis.hgetall(STOCK_KEY)
+        except RedisError as e:
+            logger.warning("Stock counters read failed: %s", e)
+            return None
+
+        if SYNCED_FIELD not in raw:
+            return None
+
+        raw.pop(SYNCED_FIELD)
+        self._remember({UcAmount[name.decode()]: int(value) for name, value in raw.items()})
+        return self._snapshot
+
+    async def add(self, uc_amount: UcAmount, delta: int) -> None:
+        if not delta:
+            return
+        try:
+            await self.redis.hincrby(STOCK_KEY, uc_amount.name, delta)
+        except RedisError as e:
+            logger.warning("Stock counter update failed: %s", e)
+
+    async def reset(self, counts: Mapping[UcAmount, int]) -> None:
+        """Перезапись всех счетчиков точными значениями из базы"""
+        values = {uc_amount: counts.get(uc_amount, 0) for uc_amount in UcAmount}
+        values.pop(UcAmount.ALL)
+        try:
+            await self.redis.hset(
+                STOCK_KEY,
+                mapping={
+                    SYNCED_FIELD: 1,
+                    **{uc_amount.name: count for uc_amount, count in values.items()},
+                },
+            )
+        except RedisError as e:
+            logger.warning("Stock counters reset failed: %s", e)
+            return
+        self._remember(values)
+
+    def _remember(self, counts: Dict[UcAmount, int]) -> None:
+        self._snapshot = counts
+        self._snapshot_expires_at = time.monotonic() + self.ttl_seconds
+
+
+class StockCountingPromoRepository(DelegatingPromoRepository):
+    """Поддерживает счетчики остатков при изменении промокодов
+
+    Изменения счетчиков применяются после коммита единицы работы: откат
+    транзакции их не затрагивает. expire_batch счетчики не меняет: промокод
+    перестает быть доступным по времени, а не в момент пометки, поэтому
+    после очистки счетчики пересчитываются целиком (reconcile).
+    """
+
+    def __init__(
+        self, inner: PromoRepository, counter: StockCounter, unit_of_work: UnitOfWork
+    ) -> None:
+        super().__init__(inner)
+        self.counter = counter
+        self.unit_of_work = unit_of_work
+
+    async def save(self, promo_entity: PromoEntity) -> None:
+        created = any(isinstance(event, CreatedPromoCodeEvent) for event in promo_entity.events)
+        await self.inner.save(promo_entity)
+        if created:
+            self._add_after_commit(promo_entity.uc_amount, 1)
+
+    async def bulk_create(
+        self, codes: Sequence[str], uc_amount: UcAmount, expires_at: datetime
+    ) -> List[str]:
+        inserted = await self.inner.bulk_create(codes, uc_amount, expires_at)
+        self._add_after_commit(uc_amount, len(inserted))
+        return inserted
+
+    async def redeem(
+        self,
+        user_id: str,
+        *,
+        promo_id: Optional[UUID] = None,
+        code: Optional[str] = None,
+    ) -> PromoEntity:
+        promo_entity = await self.inner.redeem(user_id, promo_id=promo_id, code=code)
+        self._add_after_commit(promo_entity.uc_amount, -1)
+        return promo_entity
+
+    async def allocate(self, uc_amount: UcAmount, user_id: str) -> PromoEntity:
+        promo_entity = await self.inner.allocate(uc_amount, user_id)
+        self._add_after_commit(uc_amount, -1)
+        return promo_entity
+
+    async def delete(self, pid: UUID) -> PromoEntity:
+        promo_entity = await self.inner.delete(pid)
+        if promo_entity.status == PromoStatus.ACTIVE and promo_entity.expires_at > datetime.now(
+            timezone.utc
+        ):
+            self._add_after_commit(promo_entity.uc_amount, -1)
+        return promo_entity
+
+    def _add_after_commit(self, uc_amount: UcAmount, delta: int) -> None:
+        self.unit_of_work.after_commit(partial(self.counter.add, uc_amount, delta))
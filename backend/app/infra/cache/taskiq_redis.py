@@ -1,5 +1,6 @@
 from settings.config import settings
 from taskiq import TaskiqScheduler
+from taskiq.schedule_sources import LabelScheduleSource
 from taskiq_redis import RedisAsyncResultBackend, RedisScheduleSource, RedisStreamBroker
 
 redis_backend = RedisAsyncResultBackend(redis_url=settings.redis.url.encoded_string())
@@ -14,5 +15,5 @@ redis_source = RedisScheduleSource(
 
 scheduler = TaskiqScheduler(
     broker=redis_broker,
-    sources=[redis_source],
+    sources=[redis_source, LabelScheduleSource(redis_broker)],
 )
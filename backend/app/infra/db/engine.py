@@ -0,0 +1,84 @@
+import logging
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Доступные клиентам соединения: без резерва суперпользователя (и reserved_connections с PG16)
+AVAILABLE_CONNECTIONS_SQL = text(
+    """
+    SELECT current_setting('max_connections')::int
+        - current_setting('superuser_reserved_connections')::int
+        - coalesce(current_setting('reserved_connections', true)::int, 0)
+    """
+)
+
+
+class ConnectionBudgetExceeded(RuntimeError):
+    def __init__(self, required: int, available: int) -> None:
+        super().__init__(
+            f"Пулы воркеров могут открыть {required} соединений, а сервер принимает {available}"
+        )
+        self.required = required
+        self.available = available
+
+
+def _prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def engine_options(
+    pool_size: int,
+    max_overflow: int,
+    pool_timeout: float,
+    pool_recycle: int,
+    pool_pre_ping: bool,
+    prepared_statement_cache_size: int,
+    statement_timeout_ms: Optional[int],
+    pgbouncer: bool,
+) -> Dict[str, Any]:
+    """Аргументы create_async_engine для пула и драйвера asyncpg
+
+    В режиме pgbouncer кэш подготовленных запросов выключен, а имена
+    подготовленных запросов уникальны: в transaction pooling соседние
+    транзакции попадают на разные серверные соединения.
+    """
+    connect_args: Dict[str, Any] = {
+        "prepared_statement_cache_size": 0 if pgbouncer else prepared_statement_cache_size
+    }
+    if pgbouncer:
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = _prepared_statement_name
+    if statement_timeout_ms:
+        connect_args["server_settings"] = {"statement_timeout": str(statement_timeout_ms)}
+
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+
+async def check_connection_budget(engine: AsyncEngine, required: int) -> None:
+    """Проверка, что required соединений пулов всех воркеров помещаются в сервер
+
+    Недоступная база не мешает старту, как и без проверки: приложение
+    подключается лениво. Превышение бюджета - ошибка конфигурации, под
+    нагрузкой она превращается в отказы "too many clients".
+    """
+    try:
+        async with engine.connect() as conn:
+            available = (await conn.execute(AVAILABLE_CONNECTIONS_SQL)).scalar_one()
+    except Exception as e:
+        logger.warning("Connection budget check skipped: %r", e)
+        return
+
+    if required > available:
+        raise ConnectionBudgetExceeded(required, available)
+    logger.info("Connection budget: %s of %s connections", required, available)
@@ -1,3 +1,5 @@
+from .outbox import OutboxEvent
 from .promo import Promocode
+from .wallet import UcBalance, UcLedgerEntry
 
-__all__ = ("Promocode",)
+__all__ = ("Promocode", "OutboxEvent", "UcLedgerEntry", "UcBalance")
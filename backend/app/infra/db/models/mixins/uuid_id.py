@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import UUID
+from sqlalchemy import UUID, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 
@@ -8,8 +8,7 @@ class UUIDIDMixin:
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        unique=True,
         nullable=False,
         default=uuid.uuid4,
-        server_default=str(uuid.uuid4()),
+        server_default=func.gen_random_uuid(),
     )
@@ -0,0 +1,20 @@
+from typing import Any, Dict
+
+from infra.db.models.mixins import BaseMixin
+from sqlalchemy import Index, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class OutboxEvent(BaseMixin):
+    """Доменное событие, ожидающее публикации в брокер"""
+
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # Relay забирает самые старые события: ORDER BY created_at LIMIT n
+        Index("ix_outbox_events_created_at", "created_at"),
+    )
+
+    event_type: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    payload: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)
@@ -3,12 +3,47 @@ from typing import Optional
 
 from domain.enums import PromoStatus, UcAmount
 from infra.db.models.mixins import BaseMixin
-from sqlalchemy import DateTime, Enum, String
+from sqlalchemy import DateTime, Enum, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 
 class Promocode(BaseMixin):
     __tablename__ = "promo_codes"
+    __table_args__ = (
+        # Индексы под keyset-пагинацию по (created_at, id) с фильтрами списка
+        Index("ix_promo_codes_created_at_id", "created_at", "id"),
+        Index("ix_promo_codes_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_promo_codes_uc_amount_created_at_id", "uc_amount", "created_at", "id"),
+        Index(
+            "ix_promo_codes_uc_amount_status_created_at_id",
+            "uc_amount",
+            "status",
+            "created_at",
+            "id",
+        ),
+        # Частичный индекс под очистку просроченных: status='ACTIVE' AND expires_at < now()
+        Index(
+            "ix_promo_codes_active_expires_at",
+            "expires_at",
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+        # Выдача при покупке: uc_amount = ? ORDER BY expires_at LIMIT 1 среди активных
+        Index(
+            "ix_promo_codes_active_uc_amount_expires_at",
+            "uc_amount",
+            "expires_at",
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+        # История пользователя: index-only scan по used_by с keyset по (used_at, id)
+        Index(
+            "ix_promo_codes_used_by_used_at_id",
+            "used_by",
+            text("used_at DESC"),
+            text("id DESC"),
+            postgresql_include=["code", "uc_amount"],
+            postgresql_where=text("used_by IS NOT NULL"),
+        ),
+    )
 
     code: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
 
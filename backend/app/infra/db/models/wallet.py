@@ -0,0 +1,36 @@
+from datetime import datetime
+from uuid import UUID
+
+from infra.db.models.mixins import Base, BaseMixin
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class UcLedgerEntry(BaseMixin):
+    """Запись журнала начислений UC (только вставка)"""
+
+    __tablename__ = "uc_ledger"
+    __table_args__ = (Index("ix_uc_ledger_user_id_created_at", "user_id", "created_at"),)
+
+    user_id: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    # Один промокод начисляется не больше одного раза
+    promo_id: Mapped[UUID] = mapped_column(
+        ForeignKey("promo_codes.id"), unique=True, nullable=False
+    )
+
+    amount: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class UcBalance(Base):
+    """Материализованный баланс: сумма amount из uc_ledger по пользователю"""
+
+    __tablename__ = "uc_balances"
+
+    user_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+
+    balance: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
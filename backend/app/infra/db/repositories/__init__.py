@@ -1,3 +1,13 @@
+from .outbox import OutboxRepository
 from .promo import PromoRepositoryImpl
+from .promo_queries import PromoQueriesImpl
+from .unit_of_work import SqlAlchemyUnitOfWork
+from .wallet import WalletRepositoryImpl
 
-__all__ = "PromoRepositoryImpl"
+__all__ = (
+    "PromoRepositoryImpl",
+    "PromoQueriesImpl",
+    "OutboxRepository",
+    "WalletRepositoryImpl",
+    "SqlAlchemyUnitOfWork",
+)
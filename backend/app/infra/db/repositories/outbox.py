@@ -0,0 +1,68 @@
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+from uuid import UUID
+
+from domain.events.base import BaseEvent
+from infra.db.models import OutboxEvent
+from sqlalchemy import ARRAY, Row, String, cast, delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def to_outbox_row(event: BaseEvent) -> Dict[str, Any]:
+    """Строка outbox: идентификатор события, его тип и поля без event_id"""
+    payload = asdict(event)
+    event_id = payload.pop("event_id")
+    return {"id": event_id, "event_type": type(event).__name__, "payload": payload}
+
+
+class OutboxRepository:
+    """Запись и выборка событий outbox в транзакции переданной сессии"""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def add(self, events: Iterable[BaseEvent]) -> int:
+        """Вставка событий одним executemany, без коммита"""
+        rows = [to_outbox_row(event) for event in events]
+        if rows:
+            await self.session.execute(insert(OutboxEvent), rows)
+        return len(rows)
+
+    async def add_for_codes(
+        self, event_factory: Callable[[str], BaseEvent], codes: Sequence[str]
+    ) -> int:
+        """Однотипные события для пачки кодов одним INSERT ... SELECT unnest
+
+        Остальные поля payload берутся из шаблонного события, а event_id и
+        created_at проставляет сама база, без сборки объектов на каждый код.
+        """
+        if not codes:
+            return 0
+
+        template = to_outbox_row(event_factory(""))
+        code = func.unnest(cast(codes, ARRAY(String))).column_valued("code")
+        stmt = insert(OutboxEvent).from_select(
+            ["event_type", "payload"],
+            select(
+                literal(template["event_type"]),
+                cast(template["payload"], JSONB).op("||")(func.jsonb_build_object("code", code)),
+            ),
+            include_defaults=False,
+        )
+        await self.session.execute(stmt)
+        return len(codes)
+
+    async def claim_batch(self, limit: int) -> Sequence[Row]:
+        """Блокировка самых старых событий; занятые другими relay строки пропускаются"""
+        stmt = (
+            select(OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.payload)
+            .order_by(OutboxEvent.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def delete(self, event_ids: List[UUID]) -> None:
+        await self.session.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(event_ids)))
@@ -1,54 +1,122 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
 from domain.entities import PromoEntity
-from domain.enums import PromoStatus
-from domain.repositories import PromoRepository
-from domain.values import PromoCodeExpiration, PromoCodeUsage, PromoValue
+from domain.enums import PromoStatus, UcAmount
+from domain.events import CreatedPromoCodeEvent, UsedPromoCodeEvent
+from domain.exceptions.promo import (
+    PromoCodeAlreadyUsedException,
+    PromoCodeExpiredException,
+    PromoCodeNotFoundException,
+)
+from domain.exceptions.storefront import PromoOutOfStockException
+from domain.repositories import PROMO_EXPORT_FIELDS, PromoRepository
+from domain.values import (
+    PageCursor,
+    PromoCodeExpiration,
+    PromoCodeUsage,
+    PromoValue,
+    UserPromoRecord,
+)
 from infra.db.models import Promocode
-from sqlalchemy import and_, select
+from infra.db.repositories.outbox import OutboxRepository
+from sqlalchemy import ColumnElement, and_, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+BULK_INSERT_CHUNK_SIZE = 5000
+EXPORT_BATCH_SIZE = 2000
+
+
+def list_conditions(
+    uc_amount: Optional[str], status: Optional[str], cursor: Optional[PageCursor]
+) -> List[ColumnElement[bool]]:
+    """Фильтры списка промокодов и keyset-условие по (created_at, id)"""
+    conditions = []
+    if uc_amount:
+        conditions.append(Promocode.uc_amount == uc_amount)
+    if status:
+        conditions.append(Promocode.status == status)
+    if cursor:
+        conditions.append(
+            tuple_(Promocode.created_at, Promocode.id) < tuple_(cursor.sort_key, cursor.oid)
+        )
+    return conditions
+
 
 class PromoRepositoryImpl(PromoRepository):
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
+        # События сущностей пишет в outbox UnitOfWork при коммите; здесь -
+        # только события пакетной вставки, для кодов которой сущности не строятся
+        self.outbox = OutboxRepository(session)
 
     async def save(self, promo_entity: PromoEntity) -> None:
-        """Сохранение промокода (создание или обновление)"""
-        try:
-            stmt = select(Promocode).where(Promocode.id == promo_entity.oid)
-            result = await self.session.execute(stmt)
-            existing_promo = result.scalar_one_or_none()
-
-            if existing_promo:
-                existing_promo.code = promo_entity.code
-                existing_promo.uc_amount = promo_entity.uc_amount
-                existing_promo.expires_at = promo_entity.expires_at
-                existing_promo.status = promo_entity.status
-                existing_promo.updated_at = datetime.now()
-
-                if promo_entity.usage.used_at and promo_entity.usage.used_by:
-                    existing_promo.used_at = promo_entity.usage.used_at
-                    existing_promo.used_by = promo_entity.usage.used_by
-            else:
-                promo_model = Promocode(
-                    code=promo_entity.code,
-                    uc_amount=promo_entity.uc_amount,
-                    expires_at=promo_entity.expires_at,
-                    status=promo_entity.status,
-                    created_at=promo_entity.created_at,
-                )
-                self.session.add(promo_model)
-
-            await self.session.commit()
-        except Exception as e:
-            await self.session.rollback()
-            raise e
+        """Сохранение промокода (создание или обновление) без коммита"""
+        stmt = select(Promocode).where(Promocode.id == promo_entity.oid)
+        result = await self.session.execute(stmt)
+        existing_promo = result.scalar_one_or_none()
+
+        if existing_promo:
+            existing_promo.code = promo_entity.code
+            existing_promo.uc_amount = promo_entity.uc_amount
+            existing_promo.expires_at = promo_entity.expires_at
+            existing_promo.status = promo_entity.status
+            existing_promo.updated_at = datetime.now()
+
+            if promo_entity.usage.used_at and promo_entity.usage.used_by:
+                existing_promo.used_at = promo_entity.usage.used_at
+                existing_promo.used_by = promo_entity.usage.used_by
+        else:
+            promo_model = Promocode(
+                id=UUID(promo_entity.oid),
+                code=promo_entity.code,
+                uc_amount=promo_entity.uc_amount,
+                expires_at=promo_entity.expires_at,
+                status=promo_entity.status,
+                created_at=promo_entity.created_at,
+            )
+            self.session.add(promo_model)
+
+        # Нарушение уникальности всплывает здесь, а не при коммите
+        await self.session.flush()
+
+    async def bulk_create(
+        self, codes: Sequence[str], uc_amount: UcAmount, expires_at: datetime
+    ) -> List[str]:
+        """Пакетная вставка промокодов многострочными INSERT ... ON CONFLICT DO NOTHING"""
+        stmt = (
+            insert(Promocode.__table__)
+            .on_conflict_do_nothing(index_elements=[Promocode.code])
+            .returning(Promocode.code)
+        )
+
+        inserted: List[str] = []
+        for start in range(0, len(codes), BULK_INSERT_CHUNK_SIZE):
+            chunk = codes[start : start + BULK_INSERT_CHUNK_SIZE]
+            result = await self.session.execute(
+                stmt,
+                [
+                    {
+                        "code": code,
+                        "uc_amount": uc_amount,
+                        "expires_at": expires_at,
+                        "status": PromoStatus.ACTIVE,
+                    }
+                    for code in chunk
+                ],
+            )
+            chunk_inserted = result.scalars().all()
+            await self.outbox.add_for_codes(CreatedPromoCodeEvent, chunk_inserted)
+            inserted.extend(chunk_inserted)
+
+        return inserted
 
     async def get_by_id(self, promo_id: UUID) -> Optional[PromoEntity]:
         """Получение промокода по UUID"""
+        # Точечные чтения остаются на primary: их результат кэшируется в Redis,
+        # и устаревшая строка с реплики прожила бы в кэше весь TTL
         stmt = select(Promocode).where(Promocode.id == promo_id)
         result = await self.session.execute(stmt)
         promo_model = result.scalar_one_or_none()
@@ -74,46 +142,278 @@ class PromoRepositoryImpl(PromoRepository):
         uc_amount: Optional[str] = None,
         status: Optional[str] = None,
         limit: Optional[int] = None,
-        offset: Optional[int] = None,
+        cursor: Optional[PageCursor] = None,
     ) -> List[PromoEntity]:
-        """Получение списка промокодов с фильтрацией"""
-        stmt = select(Promocode)
+        """Получение списка промокодов с фильтрацией (keyset по created_at, id)"""
+        stmt = select(Promocode).order_by(Promocode.created_at.desc(), Promocode.id.desc())
+
+        conditions = list_conditions(uc_amount, status, cursor)
+        if conditions:
+            stmt = stmt.where(and_(*conditions))
+
+        if limit:
+            stmt = stmt.limit(limit)
+
+        result = await self.session.execute(stmt.execution_options(replica=True))
+        promo_models = result.scalars().all()
+
+        return [self._to_entity(model) for model in promo_models]
+
+    async def get_user_history(
+        self, user_id: str, limit: int, cursor: Optional[PageCursor] = None
+    ) -> List[UserPromoRecord]:
+        """Keyset по (used_at, id) из покрывающего индекса, без обращения к таблице"""
+        stmt = (
+            select(Promocode.id, Promocode.code, Promocode.uc_amount, Promocode.used_at)
+            .where(Promocode.used_by == user_id)
+            .order_by(Promocode.used_at.desc(), Promocode.id.desc())
+            .limit(limit)
+        )
+        if cursor:
+            stmt = stmt.where(
+                tuple_(Promocode.used_at, Promocode.id) < tuple_(cursor.sort_key, cursor.oid)
+            )
+
+        result = await self.session.execute(stmt.execution_options(replica=True))
+        return [
+            UserPromoRecord(oid=oid, code=code, uc_amount=uc_amount, used_at=used_at)
+            for oid, code, uc_amount, used_at in result.tuples()
+        ]
+
+    async def iter_export(
+        self,
+        uc_amount: Optional[str] = None,
+        status: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[Sequence[Tuple]]:
+        """Потоковое чтение через серверный курсор, без сборки сущностей"""
+        stmt = select(*(getattr(Promocode, name) for name in PROMO_EXPORT_FIELDS)).order_by(
+            Promocode.created_at, Promocode.id
+        )
 
         conditions = []
         if uc_amount:
             conditions.append(Promocode.uc_amount == uc_amount)
         if status:
             conditions.append(Promocode.status == status)
+        if created_from:
+            conditions.append(Promocode.created_at >= created_from)
+        if created_to:
+            conditions.append(Promocode.created_at < created_to)
 
         if conditions:
             stmt = stmt.where(and_(*conditions))
 
-        if limit:
-            stmt = stmt.limit(limit)
-        if offset:
-            stmt = stmt.offset(offset)
+        result = await self.session.stream(
+            stmt.execution_options(yield_per=EXPORT_BATCH_SIZE, replica=True)
+        )
+        async for partition in result.tuples().partitions():
+            yield partition
+
+    async def iter_codes(self) -> AsyncIterator[Sequence[str]]:
+        """Потоковое чтение всех кодов пачками (для построения фильтра Блума)"""
+        # С primary: код, которого еще нет на реплике, фильтр считал бы несуществующим
+        result = await self.session.stream_scalars(
+            select(Promocode.code).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for partition in result.partitions():
+            yield partition
+
+    async def redeem(
+        self,
+        user_id: str,
+        *,
+        promo_id: Optional[UUID] = None,
+        code: Optional[str] = None,
+    ) -> PromoEntity:
+        """Атомарное использование промокода одним запросом.
+
+        Условный UPDATE выполняется в CTE, поэтому из двух конкурентных запросов
+        промокод получит только один. Причина отказа определяется по той же
+        строке результата, без дополнительных SELECT.
+        """
+        if (promo_id is None) == (code is None):
+            raise ValueError("Нужно передать либо promo_id, либо code")
+
+        lookup = Promocode.id == promo_id if promo_id is not None else Promocode.code == code
+
+        target = (
+            select(
+                Promocode.id,
+                Promocode.code,
+                Promocode.uc_amount,
+                Promocode.status,
+                Promocode.expires_at,
+                Promocode.created_at,
+                (Promocode.expires_at > func.now()).label("is_live"),
+            )
+            .where(lookup)
+            .cte("target")
+        )
+        redeemed = (
+            update(Promocode)
+            .where(
+                Promocode.id == target.c.id,
+                Promocode.status == PromoStatus.ACTIVE,
+                Promocode.expires_at > func.now(),
+            )
+            .values(status=PromoStatus.USED, used_by=user_id, used_at=func.now())
+            .returning(Promocode.id, Promocode.status, Promocode.used_by, Promocode.used_at)
+            .cte("redeemed")
+        )
+        stmt = select(
+            target.c.id,
+            target.c.code,
+            target.c.uc_amount,
+            target.c.expires_at,
+            target.c.created_at,
+            target.c.is_live,
+            func.coalesce(redeemed.c.status, target.c.status).label("status"),
+            redeemed.c.id.label("redeemed_id"),
+            redeemed.c.used_by,
+            redeemed.c.used_at,
+        ).select_from(target.outerjoin(redeemed, redeemed.c.id == target.c.id))
 
         result = await self.session.execute(stmt)
-        promo_models = result.scalars().all()
+        row = result.one_or_none()
 
-        return [self._to_entity(model) for model in promo_models]
+        if row is None:
+            raise PromoCodeNotFoundException(code=code if code is not None else str(promo_id))
+
+        if row.redeemed_id is None:
+            # Использованный промокод остается использованным и после истечения
+            # срока; активный и непросроченный, который не удалось обновить,
+            # был использован конкурентным запросом
+            if row.status == PromoStatus.USED:
+                raise PromoCodeAlreadyUsedException(code=row.code)
+            if row.status == PromoStatus.EXPIRED or not row.is_live:
+                raise PromoCodeExpiredException(code=row.code)
+            raise PromoCodeAlreadyUsedException(code=row.code)
+
+        promo_entity = self._to_entity(row)
+        promo_entity.register_event(UsedPromoCodeEvent(code=row.code, user_id=user_id))
+        return promo_entity
+
+    async def allocate(self, uc_amount: UcAmount, user_id: str) -> PromoEntity:
+        """Выдача промокода одним UPDATE над CTE с FOR UPDATE SKIP LOCKED
 
-    async def delete(self, promo_id: UUID) -> bool:
-        """Удаление промокода"""
-        try:
-            stmt = select(Promocode).where(Promocode.id == promo_id)
-            result = await self.session.execute(stmt)
-            promo_model = result.scalar_one_or_none()
+        Каждый конкурентный покупатель блокирует первую свободную строку и
+        пропускает занятые, поэтому покупки одного номинала не ждут друг друга.
+        Коммит не выполняется.
+        """
+        candidate = (
+            select(Promocode.id)
+            .where(
+                Promocode.uc_amount == uc_amount,
+                Promocode.status == PromoStatus.ACTIVE,
+                Promocode.expires_at > func.now(),
+            )
+            .order_by(Promocode.expires_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .cte("candidate")
+        )
+        stmt = (
+            update(Promocode)
+            .where(Promocode.id == candidate.c.id)
+            .values(status=PromoStatus.USED, used_by=user_id, used_at=func.now())
+            .returning(
+                Promocode.id,
+                Promocode.code,
+                Promocode.uc_amount,
+                Promocode.status,
+                Promocode.expires_at,
+                Promocode.used_by,
+                Promocode.used_at,
+                Promocode.created_at,
+            )
+        )
+
+        # Сущность строится из RETURNING, синхронизация identity map не нужна;
+        # стратегия fetch для UPDATE с CTE путала порядок колонок в строке результата
+        result = await self.session.execute(stmt.execution_options(synchronize_session=False))
+        row = result.one_or_none()
+
+        if row is None:
+            raise PromoOutOfStockException(card_title=uc_amount.value)
+
+        promo_entity = self._to_entity(row)
+        promo_entity.register_event(UsedPromoCodeEvent(code=row.code, user_id=user_id))
+        return promo_entity
+
+    async def expire_batch(self, limit: int) -> List[UUID]:
+        """Пометка пачки просроченных промокодов одним UPDATE
+
+        Строки, заблокированные другими транзакциями, пропускаются. Вызывающий
+        код фиксирует каждую пачку сразу, поэтому блокировки держатся недолго.
+        """
+        expired = (
+            select(Promocode.id)
+            .where(Promocode.status == PromoStatus.ACTIVE, Promocode.expires_at < func.now())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("expired")
+        )
+        stmt = (
+            update(Promocode)
+            .where(Promocode.id == expired.c.id)
+            .values(status=PromoStatus.EXPIRED)
+            .returning(Promocode.id)
+        )
+
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
 
-            if promo_model is None:
-                return False
+    async def count_available(self) -> Dict[UcAmount, int]:
+        """Группировка по частичному индексу активных промокодов"""
+        stmt = (
+            select(Promocode.uc_amount, func.count())
+            .where(Promocode.status == PromoStatus.ACTIVE, Promocode.expires_at > func.now())
+            .group_by(Promocode.uc_amount)
+        )
+        result = await self.session.execute(stmt.execution_options(replica=True))
+        return {uc_amount: count for uc_amount, count in result.tuples()}
+
+    async def delete(self, promo_id: UUID) -> PromoEntity:
+        """Удаление неиспользованного промокода без коммита
+
+        DELETE ... RETURNING с условием на статус выполняется в CTE, поэтому
+        код, использованный после чтения промокода сервисом, не удаляется.
+        Причина отказа определяется по той же строке результата.
+        """
+        target = select(Promocode.id, Promocode.code).where(Promocode.id == promo_id).cte("target")
+        deleted = (
+            delete(Promocode)
+            .where(Promocode.id == target.c.id, Promocode.status != PromoStatus.USED)
+            .returning(
+                Promocode.id,
+                Promocode.uc_amount,
+                Promocode.status,
+                Promocode.expires_at,
+                Promocode.created_at,
+                Promocode.used_by,
+                Promocode.used_at,
+            )
+            .cte("deleted")
+        )
+        stmt = select(
+            target.c.code,
+            deleted.c.id,
+            deleted.c.uc_amount,
+            deleted.c.status,
+            deleted.c.expires_at,
+            deleted.c.created_at,
+            deleted.c.used_by,
+            deleted.c.used_at,
+        ).select_from(target.outerjoin(deleted, deleted.c.id == target.c.id))
 
-            await self.session.delete(promo_model)
-            await self.session.commit()
-            return True
-        except Exception as e:
-            await self.session.rollback()
-            raise e
+        row = (await self.session.execute(stmt)).one_or_none()
+        if row is None:
+            raise PromoCodeNotFoundException(code=str(promo_id))
+        if row.id is None:
+            raise PromoCodeAlreadyUsedException(code=row.code)
+        return self._to_entity(row)
 
     @staticmethod
     def _to_entity(promo_model: Promocode) -> PromoEntity:
@@ -128,6 +428,7 @@ class PromoRepositoryImpl(PromoRepository):
         )
 
         promo_entity = PromoEntity(
+            oid=str(promo_model.id),
             promo_code=promo_code,
             expiration=expiration,
             usage=usage,
@@ -0,0 +1,41 @@
+from typing import List, Optional
+
+from domain.repositories import PromoQueries
+from domain.values import PageCursor, PromoListRow
+from infra.db.models import Promocode
+from infra.db.repositories.promo import list_conditions
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class PromoQueriesImpl(PromoQueries):
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def list_promos(
+        self,
+        uc_amount: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[PageCursor] = None,
+    ) -> List[PromoListRow]:
+        """Колонки PromoListRow в его порядке: без ORM-объектов и identity map"""
+        stmt = (
+            select(
+                Promocode.id,
+                Promocode.code,
+                Promocode.uc_amount,
+                Promocode.status,
+                Promocode.expires_at,
+                Promocode.created_at,
+            )
+            .order_by(Promocode.created_at.desc(), Promocode.id.desc())
+            .limit(limit)
+        )
+
+        conditions = list_conditions(uc_amount, status, cursor)
+        if conditions:
+            stmt = stmt.where(and_(*conditions))
+
+        result = await self.session.execute(stmt.execution_options(replica=True))
+        return list(map(PromoListRow._make, result.tuples()))
@@ -0,0 +1,56 @@
+import logging
+from typing import Awaitable, Callable, Dict, List
+
+from domain.entities.base import BaseEntity
+from domain.repositories import UnitOfWork
+from infra.db.repositories.outbox import OutboxRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+class SqlAlchemyUnitOfWork(UnitOfWork):
+    """Транзакция сессии запроса; события сущностей пишутся в outbox перед коммитом"""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self.outbox = OutboxRepository(session)
+        # По oid: сущность, отмеченная дважды, не продублирует события
+        self._entities: Dict[str, BaseEntity] = {}
+        self._after_commit: List[Callable[[], Awaitable[None]]] = []
+
+    def collect(self, *entities: BaseEntity) -> None:
+        for entity in entities:
+            self._entities[entity.oid] = entity
+
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self._after_commit.append(callback)
+
+    async def commit(self) -> None:
+        entities = list(self._entities.values())
+        try:
+            await self.outbox.add(event for entity in entities for event in entity.events)
+            await self.session.commit()
+        except Exception:
+            await self.rollback()
+            raise
+
+        # События очищаются только после коммита: при откате они остаются
+        # у сущностей и будут записаны повторной попыткой
+        for entity in entities:
+            entity.clear_events()
+        self._entities.clear()
+
+        # Транзакция уже зафиксирована: сбой одного действия не отменяет
+        # остальные и не превращает успешный запрос в ошибку
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception:
+                logger.exception("After-commit callback failed")
+
+    async def rollback(self) -> None:
+        self._entities.clear()
+        self._after_commit.clear()
+        await self.session.rollback()
@@ -0,0 +1,48 @@
+from typing import Optional
+from uuid import UUID
+
+from domain.repositories import WalletRepository
+from domain.values import WalletBalance
+from infra.db.models import UcBalance, UcLedgerEntry
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class WalletRepositoryImpl(WalletRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def credit(self, user_id: str, amount: int, promo_id: UUID) -> int:
+        """Начисление одним запросом: запись в журнал и upsert баланса в CTE
+
+        Коммит не выполняется: начисление фиксируется вместе с использованием
+        промокода в транзакции вызывающего кода.
+        """
+        entry = (
+            insert(UcLedgerEntry)
+            .values(user_id=user_id, promo_id=promo_id, amount=amount)
+            .returning(UcLedgerEntry.user_id, UcLedgerEntry.amount)
+            .cte("entry")
+        )
+        upsert = insert(UcBalance).from_select(
+            ["user_id", "balance"], select(entry.c.user_id, entry.c.amount)
+        )
+        stmt = upsert.on_conflict_do_update(
+            index_elements=[UcBalance.user_id],
+            set_={"balance": UcBalance.balance + upsert.excluded.balance, "updated_at": func.now()},
+        ).returning(UcBalance.balance)
+
+        result = await self.session.execute(stmt)
+        return result.scalar_one()
+
+    async def get_balance(self, user_id: str) -> Optional[WalletBalance]:
+        """Чтение одной строки по первичному ключу"""
+        stmt = select(UcBalance.balance, UcBalance.updated_at).where(UcBalance.user_id == user_id)
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+
+        if row is None:
+            return None
+
+        return WalletBalance(user_id=user_id, balance=row.balance, updated_at=row.updated_at)
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import Engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Опция выполнения, которой репозитории помечают запросы, допустимые на реплике:
+# stmt.execution_options(replica=True). Остальные запросы идут на primary.
+REPLICA = "replica"
+
+# Отставание реплики: 0, если она проиграла все полученное из WAL, иначе время
+# с последней проигранной транзакции. NULL - реплика еще ничего не проигрывала.
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+@dataclass
+class Replica:
+    engine: AsyncEngine
+    # None - отставание неизвестно (реплика недоступна или еще не проверялась)
+    lag_seconds: Optional[float] = None
+
+
+class ReplicaSet:
+    """Реплики для чтения и фоновая проверка их отставания
+
+    Реплика получает запросы, только если последняя проверка показала
+    отставание не больше max_lag_seconds. Проверка идет раз в
+    check_interval секунд, а не на каждом запросе: get_bind сессии
+    синхронный и не может сходить в базу сам.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[AsyncEngine],
+        max_lag_seconds: float,
+        check_interval: float,
+        check_timeout: float,
+    ) -> None:
+        self.replicas = [Replica(engine) for engine in engines]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._task: Optional[asyncio.Task] = None
+
+    def pick(self) -> Optional[Engine]:
+        """Случайная реплика из достаточно свежих или None"""
+        healthy = [
+            replica.engine.sync_engine
+            for replica in self.replicas
+            if self._is_fresh(replica.lag_seconds)
+        ]
+        return random.choice(healthy) if healthy else None
+
+    async def check(self) -> None:
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def _check(self, replica: Replica) -> None:
+        try:
+            async with asyncio.timeout(self.check_timeout):
+                async with replica.engine.connect() as conn:
+                    lag = (await conn.execute(REPLICA_LAG_SQL)).scalar_one()
+        except Exception as e:
+            if replica.lag_seconds is not None:
+                logger.warning("Replica %s is unavailable: %r", replica.engine.url, e)
+            replica.lag_seconds = None
+            return
+
+        lag_seconds = None if lag is None else float(lag)
+        fresh = self._is_fresh(lag_seconds)
+        if fresh != self._is_fresh(replica.lag_seconds):
+            logger.log(
+                logging.INFO if fresh else logging.WARNING,
+                "Replica %s lag is %s s",
+                replica.engine.url,
+                lag_seconds,
+            )
+        replica.lag_seconds = lag_seconds
+
+    def _is_fresh(self, lag_seconds: Optional[float]) -> bool:
+        return lag_seconds is not None and lag_seconds <= self.max_lag_seconds
+
+    async def start(self) -> None:
+        """Первая проверка до начала работы, дальше - в фоне"""
+        await self.check()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+class RoutingSession(Session):
+    """Сессия, читающая с реплик то, что репозиторий пометил опцией REPLICA
+
+    После первого обращения к primary сессия до конца закреплена за ним:
+    запрос видит свои записи, а чтение после проверки на primary не
+    оказывается на отставшей реплике. Реплика выбирается одна на сессию.
+    """
+
+    def __init__(self, *args: Any, replicas: ReplicaSet, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self._replica: Optional[Engine] = None
+        self._pinned_to_primary = False
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs: Any) -> Engine:
+        if (
+            not self._pinned_to_primary
+            and not self._flushing
+            and clause is not None
+            and clause.get_execution_options().get(REPLICA, False)
+        ):
+            if self._replica is None:
+                self._replica = self.replicas.pick()
+            if self._replica is not None:
+                return self._replica
+
+        self._pinned_to_primary = True
+        return super().get_bind(mapper, clause=clause, **kwargs)
@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import logging
+import random
+import re
+import time
+from collections.abc import Mapping, Sequence
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Set
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# ASGI scope текущего запроса: маршрут в нем появляется после роутинга,
+# поэтому читается в момент медленного запроса, а не при входе
+request_scope: ContextVar[Optional[Mapping[str, Any]]] = ContextVar(
+    "slow_query_request_scope", default=None
+)
+
+# EXPLAIN без ANALYZE не выполняет запрос, поэтому безопасен и для DML
+EXPLAINABLE_KINDS = frozenset({"SELECT", "WITH", "INSERT", "UPDATE", "DELETE"})
+MAX_LOGGED_PARAMETERS = 50
+MAX_REMEMBERED_FINGERPRINTS = 1024
+
+_STARTED_KEY = "slow_query_started"
+# EXPLAIN подставляет значения параметров в условия плана
+_PLAN_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+def _statement_kind(statement: str) -> str:
+    words = statement.split(None, 1)
+    return words[0].upper() if words else ""
+
+
+def _fingerprint(statement: str) -> str:
+    # Значения передаются параметрами, поэтому текст одинаков у всех вызовов запроса
+    return hashlib.sha1(statement.encode()).hexdigest()[:16]
+
+
+def _current_route() -> Optional[str]:
+    scope = request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path_format', scope['path'])}"
+
+
+def _redact(parameters: Any, executemany: bool) -> Dict[str, Any]:
+    """Только типы параметров: значения (коды, id пользователей) в лог не попадают"""
+    rows = None
+    if executemany:
+        rows = len(parameters)
+        parameters = parameters[0] if parameters else ()
+    if isinstance(parameters, Mapping):
+        types: Any = {
+            key: type(value).__name__
+            for key, value in list(parameters.items())[:MAX_LOGGED_PARAMETERS]
+        }
+    else:
+        types = [type(value).__name__ for value in list(parameters or ())[:MAX_LOGGED_PARAMETERS]]
+    redacted: Dict[str, Any] = {"count": len(parameters or ()), "types": types}
+    if rows is not None:
+        redacted["rows"] = rows
+    return redacted
+
+
+def _iter_plan_nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _iter_plan_nodes(child)
+
+
+def _redact_plan(value: Any) -> Any:
+    if isinstance(value, str):
+        return _PLAN_LITERAL.sub("'?'", value)
+    if isinstance(value, list):
+        return [_redact_plan(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _redact_plan(item) for key, item in value.items()}
+    return value
+
+
+def _summarize_plan(plan: dict) -> Dict[str, Any]:
+    return {
+        "node": plan.get("Node Type"),
+        "total_cost": plan.get("Total Cost"),
+        "plan_rows": plan.get("Plan Rows"),
+        "seq_scans": sorted(
+            {
+                node["Relation Name"]
+                for node in _iter_plan_nodes(plan)
+                if node.get("Node Type") == "Seq Scan" and "Relation Name" in node
+            }
+        ),
+        "indexes": sorted(
+            {node["Index Name"] for node in _iter_plan_nodes(plan) if "Index Name" in node}
+        ),
+    }
+
+
+class SlowQueryLog:
+    """Журнал медленных SQL-запросов движка
+
+    Запрос дольше threshold_ms пишется в лог одной JSON-строкой: текст,
+    типы параметров, длительность и маршрут, в котором он выполнялся.
+    С вероятностью explain_sample_rate для него в фоне снимается
+    EXPLAIN (ANALYZE off, FORMAT JSON) на отдельном соединении пула -
+    не чаще раза в explain_interval_seconds на запрос и не больше одного
+    EXPLAIN одновременно, чтобы под нагрузкой не отнимать соединения.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        threshold_ms: float,
+        explain_sample_rate: float,
+        explain_interval_seconds: float,
+        explain_timeout_seconds: float,
+    ) -> None:
+        self.engine = engine
+        self.threshold = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_interval_seconds = explain_interval_seconds
+        self.explain_timeout_seconds = explain_timeout_seconds
+        self._explained_at: Dict[str, float] = {}
+        self._explaining = False
+        self._tasks: Set[asyncio.Task] = set()
+
+    def attach(self) -> None:
+        sync_engine = self.engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+
+    async def wait_explains(self) -> None:
+        """Дожидается фоновых EXPLAIN (для тестов и остановки)"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info[_STARTED_KEY].pop()
+        if elapsed >= self.threshold and _statement_kind(statement) != "EXPLAIN":
+            self._report(statement, parameters, executemany, elapsed)
+
+    @staticmethod
+    def _handle_error(exception_context) -> None:
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(_STARTED_KEY):
+            conn.info[_STARTED_KEY].pop()
+
+    def _report(self, statement: str, parameters: Any, executemany: bool, elapsed: float) -> None:
+        record = {
+            "event": "slow_query",
+            "fingerprint": _fingerprint(statement),
+            "duration_ms": round(elapsed * 1000, 2),
+            "route": _current_route(),
+            "statement": statement,
+            "parameters": _redact(parameters, executemany),
+        }
+        logger.warning(orjson.dumps(record).decode())
+
+        if not executemany and self._should_explain(statement, record["fingerprint"]):
+            self._schedule_explain(record, statement, parameters)
+
+    def _should_explain(self, statement: str, fingerprint: str) -> bool:
+        if self._explaining or _statement_kind(statement) not in EXPLAINABLE_KINDS:
+            return False
+        if random.random() >= self.explain_sample_rate:
+            return False
+        now = time.monotonic()
+        if now - self._explained_at.get(fingerprint, -self.explain_interval_seconds) < (
+            self.explain_interval_seconds
+        ):
+            return False
+        if len(self._explained_at) >= MAX_REMEMBERED_FINGERPRINTS:
+            self._explained_at.clear()
+        self._explained_at[fingerprint] = now
+        return True
+
+    def _schedule_explain(
+        self, record: Dict[str, Any], statement: str, parameters: Sequence[Any]
+    ) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Синхронное использование движка вне цикла событий
+            return
+        self._explaining = True
+        task = loop.create_task(self._explain(record, statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(
+        self, record: Dict[str, Any], statement: str, parameters: Sequence[Any]
+    ) -> None:
+        try:
+            async with asyncio.timeout(self.explain_timeout_seconds):
+                async with self.engine.connect() as conn:
+                    result = await conn.exec_driver_sql(
+                        f"EXPLAIN (ANALYZE off, FORMAT JSON) {statement}", parameters
+                    )
+                    output = result.scalar_one()
+        except Exception as e:
+            logger.info("EXPLAIN for slow query %s failed: %r", record["fingerprint"], e)
+            return
+        finally:
+            self._explaining = False
+
+        if isinstance(output, (str, bytes)):
+            output = orjson.loads(output)
+        plan: Dict[str, Any] = _redact_plan(output[0]["Plan"])
+        plan_record: Dict[str, Any] = {
+            "event": "slow_query_plan",
+            "fingerprint": record["fingerprint"],
+            "duration_ms": record["duration_ms"],
+            "route": record["route"],
+            "summary": _summarize_plan(plan),
+            "plan": plan,
+        }
+        logger.warning(orjson.dumps(plan_record).decode())
+
+
+def instrument_slow_queries(
+    engine: AsyncEngine,
+    threshold_ms: float,
+    explain_sample_rate: float,
+    explain_interval_seconds: float,
+    explain_timeout_seconds: float,
+) -> SlowQueryLog:
+    """Подписка журнала медленных запросов на события движка"""
+    slow_query_log = SlowQueryLog(
+        engine,
+        threshold_ms=threshold_ms,
+        explain_sample_rate=explain_sample_rate,
+        explain_interval_seconds=explain_interval_seconds,
+        explain_timeout_seconds=explain_timeout_seconds,
+    )
+    slow_query_log.attach()
+    return slow_query_log
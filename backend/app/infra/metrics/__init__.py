@@ -0,0 +1,15 @@
+from .registry import clear_multiprocess_dir, mark_process_dead, render_metrics  # isort: skip
+from .db import InstrumentedAsyncAdaptedQueuePool, instrument_engine
+from .http import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_PROGRESS
+from .tasks import TaskMetricsMiddleware
+
+__all__ = (
+    "render_metrics",
+    "clear_multiprocess_dir",
+    "mark_process_dead",
+    "instrument_engine",
+    "InstrumentedAsyncAdaptedQueuePool",
+    "TaskMetricsMiddleware",
+    "HTTP_REQUEST_DURATION",
+    "HTTP_REQUESTS_IN_PROGRESS",
+)
@@ -0,0 +1,93 @@
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+STATEMENT_KINDS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"})
+
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Время выполнения SQL-запроса",
+    ["statement"],
+    buckets=DB_BUCKETS,
+)
+DB_STATEMENT_ERRORS = Counter(
+    "db_statement_errors_total",
+    "SQL-запросы, завершившиеся ошибкой",
+    ["statement"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Соединения, выданные из пула",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Соединения сверх pool_size",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Ожидание соединения из пула, включая открытие нового",
+    buckets=DB_BUCKETS,
+)
+
+_STARTED_KEY = "metrics_statement_started"
+
+
+def _statement_kind(statement: str) -> str:
+    words = statement.split(None, 1)
+    kind = words[0].upper() if words else ""
+    return kind if kind in STATEMENT_KINDS else "OTHER"
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Пул, замеряющий ожидание свободного соединения и свою заполненность
+
+    События checkout/checkin не подходят: checkin срабатывает до возврата
+    соединения в очередь, и счетчики пула в этот момент еще старые.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+        self._update_gauges()
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        DB_POOL_CHECKED_OUT.set(self.checkedout())
+        DB_POOL_OVERFLOW.set(max(self.overflow(), 0))
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Подписка метрик на события выполнения запросов движка"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info[_STARTED_KEY].pop()
+        DB_STATEMENT_DURATION.labels(_statement_kind(statement)).observe(
+            time.perf_counter() - started
+        )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(_STARTED_KEY):
+            conn.info[_STARTED_KEY].pop()
+        if exception_context.statement is not None:
+            DB_STATEMENT_ERRORS.labels(_statement_kind(exception_context.statement)).inc()
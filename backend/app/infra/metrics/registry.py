@@ -0,0 +1,52 @@
+import os
+from pathlib import Path
+
+from settings.config import settings
+
+# Каталог должен быть задан до импорта prometheus_client: от него зависит,
+# будут ли значения метрик храниться в общих для воркеров файлах. Поэтому
+# prometheus_client импортируется только внутри пакета infra.metrics.
+if settings.metrics.enabled:
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.metrics.multiproc_dir)
+    Path(os.environ["PROMETHEUS_MULTIPROC_DIR"]).mkdir(parents=True, exist_ok=True)
+
+from prometheus_client import multiprocess  # noqa: E402
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+)
+
+
+def multiprocess_dir() -> Path | None:
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    return Path(path) if path else None
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Реестр для выдачи метрик: в multiprocess-режиме сумма по всем процессам"""
+    if multiprocess_dir() is None:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def clear_multiprocess_dir() -> None:
+    """Удаление файлов метрик прошлого запуска; вызывается до старта воркеров"""
+    path = multiprocess_dir()
+    if path is None:
+        return
+    for metrics_file in path.glob("*.db"):
+        metrics_file.unlink(missing_ok=True)
+
+
+def mark_process_dead(pid: int) -> None:
+    """Исключение gauge-метрик завершившегося воркера из суммы"""
+    if multiprocess_dir() is not None:
+        multiprocess.mark_process_dead(pid)
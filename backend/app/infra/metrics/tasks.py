@@ -0,0 +1,71 @@
+import logging
+import time
+from typing import Any
+
+from infra.metrics.registry import metrics_registry
+from prometheus_client import Counter, Histogram, start_http_server
+from taskiq import TaskiqMessage, TaskiqMiddleware, TaskiqResult
+
+logger = logging.getLogger(__name__)
+
+# Метка с временем постановки в очередь (time.time() отправителя)
+ENQUEUED_AT_LABEL = "enqueued_at"
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+TASK_QUEUE_WAIT = Histogram(
+    "taskiq_task_queue_wait_seconds",
+    "Время от постановки задачи в очередь до начала выполнения",
+    ["task_name"],
+    buckets=TASK_BUCKETS,
+)
+TASK_DURATION = Histogram(
+    "taskiq_task_duration_seconds",
+    "Время выполнения задачи",
+    ["task_name", "status"],
+    buckets=TASK_BUCKETS,
+)
+TASKS_SENT = Counter(
+    "taskiq_tasks_sent_total",
+    "Задачи, отправленные в брокер",
+    ["task_name"],
+)
+
+
+class TaskMetricsMiddleware(TaskiqMiddleware):
+    """Метрики очереди и выполнения задач taskiq
+
+    В процессе воркера поднимает HTTP-сервер с метриками всех процессов
+    воркера; занять порт удается только одному из них, остальные пишут
+    значения в общий каталог multiprocess.
+    """
+
+    def __init__(self, port: int) -> None:
+        super().__init__()
+        self.port = port
+
+    def startup(self) -> None:
+        if not self.broker.is_worker_process:
+            return
+        try:
+            start_http_server(self.port, registry=metrics_registry())
+        except OSError as e:
+            logger.debug("Metrics server is already running: %s", e)
+
+    def pre_send(self, message: TaskiqMessage) -> TaskiqMessage:
+        message.labels[ENQUEUED_AT_LABEL] = time.time()
+        TASKS_SENT.labels(message.task_name).inc()
+        return message
+
+    def pre_execute(self, message: TaskiqMessage) -> TaskiqMessage:
+        enqueued_at = message.labels.get(ENQUEUED_AT_LABEL)
+        if enqueued_at is not None:
+            try:
+                wait = time.time() - float(enqueued_at)
+            except (TypeError, ValueError):
+                return message
+            TASK_QUEUE_WAIT.labels(message.task_name).observe(max(wait, 0.0))
+        return message
+
+    def post_execute(self, message: TaskiqMessage, result: TaskiqResult[Any]) -> None:
+        status = "error" if result.is_err else "success"
+        TASK_DURATION.labels(message.task_name, status).observe(result.execution_time)
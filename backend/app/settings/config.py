@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Dict, List, Literal, Optional
 
 from pydantic import AmqpDsn, Field, PostgresDsn, RedisDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -36,6 +36,25 @@ class DatabaseSettings(BaseSettings):
     password: str
     name: str
     port: int = Field(default=5432, alias="PORT")
+    # Пул на воркер: gunicorn.workers * (pool_size + max_overflow) <= max_connections
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    # Соединения старше стольких секунд пересоздаются; -1 - без ограничения
+    pool_recycle: int = -1
+    pool_pre_ping: bool = True
+    prepared_statement_cache_size: int = 100
+    # statement_timeout сервера для соединений приложения; None - настройка сервера
+    statement_timeout_ms: Optional[int] = None
+    # Работа через PgBouncer в transaction pooling: без кэша подготовленных запросов
+    pgbouncer: bool = False
+    check_connection_budget: bool = True
+    # Реплики для чтения, JSON-список URL; пустой список - все запросы на primary
+    replica_urls: List[str] = []
+    # Реплика, отставшая сильнее, не получает запросов до следующей проверки
+    replica_max_lag_seconds: float = 5.0
+    replica_check_interval: float = 1.0
+    replica_check_timeout: float = 1.0
 
     model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="DB_")
 
@@ -79,6 +98,147 @@ class RedisSettings(BaseSettings):
         )
 
 
+class PaginationSettings(BaseSettings):
+    default_limit: int = 50
+    max_limit: int = 100
+
+    model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="PAGINATION_")
+
+
+class ExpirySettings(BaseSettings):
+    cron: str = "*/5 * * * *"
+    batch_size: int = 1000
+    max_batches: int = 1000
+
+    model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="EXPIRY_")
+
+
+class CacheSettings(BaseSettings):
+    enabled: bool = True
+    ttl_seconds: int = 300
+    socket_timeout: float = 0.1
+
+    model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="CACHE_")
+
+
+class BloomSettings(BaseSettings):
+    # Выключен по умолчанию: mmap-файл на capacity кодов и чтение потока Redis в каждом воркере
+    enabled: bool = False
+    path: str = "/tmp/promo_codes.bloom"
+    capacity: int = 10_000_000
+    error_rate: float = 0.001
+    # Redis Stream, через который новые коды доходят до фильтров всех хостов
+    feed_stream: str = "promo:bloom:codes"
+    feed_maxlen: int = 100_000
+    feed_batch_size: int = 100
+    # Простаивающий воркер делает один XREAD за feed_block_ms; новая запись
+    # возвращается сразу, не дожидаясь конца ожидания
+    feed_block_ms: int = 5000
+    feed_retry_seconds: float = 5.0
+
+    model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="BLOOM_")
+
+
+class OutboxSettings(BaseSettings):
+    cron: str = "* * * * *"
+    exchange: str = "promo.events"
+    batch_size: int = 500
+    # Relay работает почти всю минуту между запусками по cron и опрашивает outbox
+    run_seconds: float = 55.0
+    poll_interval: float = 0.2
+
+    model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="OUTBOX_")
+
+
+class StorefrontSettings(BaseSettings):
+    # Цены в рублях по имени номинала UcAmount
+    prices: Dict[str, int] = {
+        "UC60": 89,
+        "UC300": 449,
+        "UC600": 899,
+        "UC985": 1349,
+        "UC1800": 2249,
+        "UC2460": 3149,
+        "UC3850": 4499,
+    }
+    image_url_template: str = "/images/uc/{units}.png"
+    stock_cache_seconds: float = 1.0
+
+    model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="STOREFRONT_")
+
+
+class RateLimitSettings(BaseSettings):
+    enabled: bool = True
+    # Жетонов в секунду и емкость корзины на пользователя и на IP клиента
+    user_rate: float = 1.0
+    user_burst: int = 5
+    ip_rate: float = 10.0
+    ip_burst: int = 50
+
+    model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="RATE_LIMIT_")
+
+
+class IdempotencySettings(BaseSettings):
+    enabled: bool = True
+    ttl_seconds: int = 86400
+    # Маркер выполняющегося запроса и ожидание его результата повторами
+    lock_seconds: int = 30
+    wait_seconds: float = 10.0
+    poll_interval: float = 0.05
+
+    model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="IDEMPOTENCY_")
+
+
+class SingleFlightSettings(BaseSettings):
+    enabled: bool = True
+    # Сколько секунд результат поиска отдается повторным запросам без базы
+    window_seconds: float = 0.2
+
+    model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="SINGLE_FLIGHT_")
+
+
+class MetricsSettings(BaseSettings):
+    enabled: bool = True
+    # Общий каталог значений метрик для воркеров gunicorn и taskiq
+    multiproc_dir: str = "/tmp/prometheus_multiproc"
+    worker_port: int = 9000
+
+    model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="METRICS_")
+
+
+class ProfilingSettings(BaseSettings):
+    enabled: bool = False
+    # Запрос с этим заголовком профилируется: 1 - в файл, html или speedscope - в ответ
+    header: str = "X-Profile"
+    # Доля запросов, профилируемых без заголовка
+    sample_rate: float = 0.0
+    interval: float = 0.001
+    output_dir: str = "/tmp/profiles"
+    trace_allocations: bool = False
+
+    model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="PROFILING_")
+
+
+class SlowQuerySettings(BaseSettings):
+    enabled: bool = True
+    threshold_ms: float = 100.0
+    # Доля медленных запросов, для которых в фоне снимается EXPLAIN
+    explain_sample_rate: float = 0.1
+    # Один и тот же запрос объясняется не чаще раза в этот интервал
+    explain_interval_seconds: float = 300.0
+    explain_timeout_seconds: float = 5.0
+
+    model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="SLOW_QUERY_")
+
+
+class SerializationSettings(BaseSettings):
+    # Списки и поиск промокодов сериализуются из строк базы прямо в orjson,
+    # без моделей ответа и их проверки; схема OpenAPI не меняется
+    fast_path: bool = False
+
+    model_config = SettingsConfigDict(env_file_encoding="utf-8", env_prefix="SERIALIZATION_")
+
+
 class Settings(BaseSettings):
     db: DatabaseSettings = Field(default_factory=DatabaseSettings)
     redis: RedisSettings = Field(default_factory=RedisSettings)
@@ -86,6 +246,19 @@ class Settings(BaseSettings):
     run: RunConfig = Field(default_factory=RunConfig)
     gunicorn: GunicornConfig = Field(default_factory=GunicornConfig)
     logging: LoggingSettings = Field(default_factory=LoggingSettings)
+    pagination: PaginationSettings = Field(default_factory=PaginationSettings)
+    expiry: ExpirySettings = Field(default_factory=ExpirySettings)
+    cache: CacheSettings = Field(default_factory=CacheSettings)
+    bloom: BloomSettings = Field(default_factory=BloomSettings)
+    single_flight: SingleFlightSettings = Field(default_factory=SingleFlightSettings)
+    outbox: OutboxSettings = Field(default_factory=OutboxSettings)
+    storefront: StorefrontSettings = Field(default_factory=StorefrontSettings)
+    rate_limit: RateLimitSettings = Field(default_factory=RateLimitSettings)
+    idempotency: IdempotencySettings = Field(default_factory=IdempotencySettings)
+    metrics: MetricsSettings = Field(default_factory=MetricsSettings)
+    profiling: ProfilingSettings = Field(default_factory=ProfilingSettings)
+    slow_query: SlowQuerySettings = Field(default_factory=SlowQuerySettings)
+    serialization: SerializationSettings = Field(default_factory=SerializationSettings)
 
     model_config = SettingsConfigDict(
         env_file_encoding="utf-8",
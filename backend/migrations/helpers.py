@@ -0,0 +1,25 @@
+from typing import Any, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+INVALID_INDEX_SQL = sa.text(
+    "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+)
+
+
+def create_index_concurrently(
+    name: str, table_name: str, columns: Sequence[Union[str, sa.TextClause]], **kwargs: Any
+) -> None:
+    """CREATE INDEX CONCURRENTLY для миграций, повторяемый после сбоя
+
+    Вызывается внутри autocommit_block: построение без блокировки записи не
+    может идти в транзакции. Прерванное построение оставляет невалидный
+    индекс, которым планировщик не пользуется, а IF NOT EXISTS при повторном
+    запуске пропустил бы его. Поэтому невалидный индекс сначала удаляется.
+    """
+    if op.get_bind().scalar(INVALID_INDEX_SQL, {"name": name}):
+        op.drop_index(name, table_name=table_name, postgresql_concurrently=True)
+    op.create_index(
+        name, table_name, columns, postgresql_concurrently=True, if_not_exists=True, **kwargs
+    )
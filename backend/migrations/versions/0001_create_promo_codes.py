@@ -0,0 +1,46 @@
+"""Create promo_codes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+uc_amount_enum = sa.Enum(
+    "UC60", "UC300", "UC600", "UC985", "UC1800", "UC2460", "UC3850", "ALL", name="ucamount"
+)
+promo_status_enum = sa.Enum("ACTIVE", "USED", "EXPIRED", name="promostatus")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "promo_codes",
+        sa.Column("code", sa.String(length=50), nullable=False),
+        sa.Column("uc_amount", uc_amount_enum, nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status", promo_status_enum, nullable=False),
+        sa.Column("used_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("used_by", sa.String(length=100), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.Column("id", sa.UUID(), server_default=sa.text("gen_random_uuid()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("code"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("promo_codes")
+    promo_status_enum.drop(op.get_bind(), checkfirst=True)
+    uc_amount_enum.drop(op.get_bind(), checkfirst=True)
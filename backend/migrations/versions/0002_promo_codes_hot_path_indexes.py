@@ -0,0 +1,59 @@
+"""Promo codes hot path indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from migrations.helpers import create_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# CREATE INDEX CONCURRENTLY не блокирует запись в таблицу, но не может выполняться
+# внутри транзакции, поэтому индексы создаются в autocommit-блоке. Если построение
+# прервалось, ревизия не отмечена примененной: повторный upgrade удалит невалидный
+# индекс и построит его заново.
+INDEXES = (
+    ("ix_promo_codes_created_at_id", ["created_at", "id"], {}),
+    ("ix_promo_codes_status_created_at_id", ["status", "created_at", "id"], {}),
+    ("ix_promo_codes_uc_amount_created_at_id", ["uc_amount", "created_at", "id"], {}),
+    (
+        "ix_promo_codes_uc_amount_status_created_at_id",
+        ["uc_amount", "status", "created_at", "id"],
+        {},
+    ),
+    (
+        "ix_promo_codes_active_expires_at",
+        ["expires_at"],
+        {"postgresql_where": sa.text("status = 'ACTIVE'")},
+    ),
+    ("ix_promo_codes_used_by", ["used_by"], {}),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, columns, kwargs in INDEXES:
+            create_index_concurrently(name, "promo_codes", columns, **kwargs)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name="promo_codes",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
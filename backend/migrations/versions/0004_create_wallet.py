@@ -0,0 +1,83 @@
+"""Create uc_ledger and uc_balances
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UC_UNITS = {
+    "UC60": 60,
+    "UC300": 325,
+    "UC600": 660,
+    "UC985": 985,
+    "UC1800": 1800,
+    "UC2460": 2460,
+    "UC3850": 3850,
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "uc_ledger",
+        sa.Column("user_id", sa.String(length=100), nullable=False),
+        sa.Column("promo_id", sa.UUID(), nullable=False),
+        sa.Column("amount", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.Column("id", sa.UUID(), server_default=sa.text("gen_random_uuid()"), nullable=False),
+        sa.ForeignKeyConstraint(["promo_id"], ["promo_codes.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("promo_id"),
+    )
+    op.create_index("ix_uc_ledger_user_id_created_at", "uc_ledger", ["user_id", "created_at"])
+    op.create_table(
+        "uc_balances",
+        sa.Column("user_id", sa.String(length=100), nullable=False),
+        sa.Column("balance", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    # Уже использованные промокоды переносятся в журнал, чтобы баланс сошёлся с историей.
+    # В базе хранится имя номинала (UC300), а число UC задано значением enum ("325UC")
+    units = " ".join(f"WHEN '{name}' THEN {amount}" for name, amount in UC_UNITS.items())
+    op.execute(
+        f"""
+        INSERT INTO uc_ledger (id, user_id, promo_id, amount, created_at)
+        SELECT gen_random_uuid(), used_by, id, CASE uc_amount::text {units} END,
+               coalesce(used_at, now())
+        FROM promo_codes
+        WHERE status = 'USED' AND used_by IS NOT NULL AND uc_amount <> 'ALL'
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO uc_balances (user_id, balance, updated_at)
+        SELECT user_id, sum(amount), max(created_at)
+        FROM uc_ledger
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("uc_balances")
+    op.drop_index("ix_uc_ledger_user_id_created_at", table_name="uc_ledger")
+    op.drop_table("uc_ledger")
@@ -0,0 +1,41 @@
+"""Promo codes allocation index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from migrations.helpers import create_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        create_index_concurrently(
+            "ix_promo_codes_active_uc_amount_expires_at",
+            "promo_codes",
+            ["uc_amount", "expires_at"],
+            postgresql_where=sa.text("status = 'ACTIVE'"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_promo_codes_active_uc_amount_expires_at",
+            table_name="promo_codes",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
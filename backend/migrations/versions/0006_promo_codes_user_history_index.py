@@ -0,0 +1,50 @@
+"""Promo codes user history covering index
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from migrations.helpers import create_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Покрывающий индекс заменяет ix_promo_codes_used_by: ведущая колонка та же
+    with op.get_context().autocommit_block():
+        create_index_concurrently(
+            "ix_promo_codes_used_by_used_at_id",
+            "promo_codes",
+            ["used_by", sa.text("used_at DESC"), sa.text("id DESC")],
+            postgresql_include=["code", "uc_amount"],
+            postgresql_where=sa.text("used_by IS NOT NULL"),
+        )
+        op.drop_index(
+            "ix_promo_codes_used_by",
+            table_name="promo_codes",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        create_index_concurrently("ix_promo_codes_used_by", "promo_codes", ["used_by"])
+        op.drop_index(
+            "ix_promo_codes_used_by_used_at_id",
+            table_name="promo_codes",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,310 @@
+import asyncio
+import importlib
+import os
+import random
+import string
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+from dishka import Provider, Scope, provide
+from domain.enums import PromoStatus, UcAmount
+from faker import Faker
+from infra.db.models import Promocode
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from settings.config import settings
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp
+
+from tests.benchmarks.utils import latency_summary
+
+# Параметры прогона задаются окружением, чтобы один и тот же тест
+# запускался и в обычном наборе, и на 1M/10M кодов для сравнения коммитов
+ROWS = int(os.getenv("BENCH_API_ROWS", "20000"))
+REQUESTS_PER_MIX = int(os.getenv("BENCH_API_REQUESTS", "500"))
+CONCURRENCY = int(os.getenv("BENCH_API_CONCURRENCY", "32"))
+SEED = int(os.getenv("BENCH_API_SEED", "1"))
+REDIS_URL = os.getenv("BENCH_REDIS_URL", "redis://localhost:6379/0")
+
+COPY_BATCH = 50_000
+# Сколько кодов датасета держать в памяти как цели для запросов
+TARGET_SAMPLE = 30_000
+COPY_COLUMNS = (
+    "id",
+    "code",
+    "uc_amount",
+    "status",
+    "expires_at",
+    "used_at",
+    "used_by",
+    "created_at",
+)
+DENOMINATIONS = [uc_amount for uc_amount in UcAmount if uc_amount is not UcAmount.ALL]
+STATUS_WEIGHTS = {PromoStatus.ACTIVE: 70, PromoStatus.USED: 20, PromoStatus.EXPIRED: 10}
+
+CREATE = "POST /promocode/"
+LOOKUP = "GET /promocode/code/{promo_code}"
+LIST = "GET /promocode/"
+REDEEM = "POST /promocode/code/{promo_code}/use"
+DELETE = "DELETE /promocode/{promo_id}"
+
+# Доли операций в смесях; порядок смесей фиксирован, т.к. они меняют данные
+MIXES: Dict[str, Dict[str, int]] = {
+    "read_heavy": {LOOKUP: 70, LIST: 20, CREATE: 5, REDEEM: 5},
+    "balanced": {CREATE: 20, LOOKUP: 20, LIST: 20, REDEEM: 20, DELETE: 20},
+    "write_heavy": {CREATE: 40, REDEEM: 40, DELETE: 10, LOOKUP: 10},
+}
+
+
+@dataclass
+class SeededDataset:
+    """Засеянные коды: выборка целей для поиска, использования и удаления"""
+
+    rows: int
+    lookup_codes: List[str] = field(default_factory=list)
+    active_codes: List[str] = field(default_factory=list)
+    ids: List[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class Operation:
+    endpoint: str
+    method: str
+    path: str
+    query: Dict[str, str] = field(default_factory=dict)
+    # JSON-тело запроса; пустое тело уходит без content-type
+    body: bytes = b""
+
+
+def _generate_rows(
+    fake: Faker, rng: random.Random, start: int, count: int, now: datetime
+) -> Iterator[tuple]:
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    for n in range(start, start + count):
+        status = rng.choices(statuses, weights)[0]
+        used_at = used_by = None
+        if status is PromoStatus.EXPIRED:
+            expires_at = now - timedelta(days=rng.randint(1, 30))
+        else:
+            expires_at = now + timedelta(days=rng.randint(1, 60))
+        if status is PromoStatus.USED:
+            used_at = now - timedelta(minutes=rng.randint(1, 50_000))
+            used_by = fake.user_name()
+        yield (
+            uuid.UUID(int=rng.getrandbits(128), version=4),
+            f"{fake.bothify('??##-??##', letters=string.ascii_uppercase)}-{n:08d}",
+            rng.choice(DENOMINATIONS).name,
+            status.name,
+            expires_at,
+            used_at,
+            used_by,
+            (now - timedelta(seconds=n)).replace(tzinfo=None),
+        )
+
+
+async def seed_promo_dataset(engine: AsyncEngine, rows: int, seed: int) -> SeededDataset:
+    """Заливка синтетических промокодов через COPY
+
+    Faker и random засеяны, поэтому при одинаковых rows и seed датасет
+    совпадает от прогона к прогону, включая id и коды.
+    """
+    fake = Faker()
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    # Сроки отсчитываются от начала суток: коды и id от даты не зависят
+    now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    dataset = SeededDataset(rows=rows)
+    step = max(1, rows // TARGET_SAMPLE)
+
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        for start in range(0, rows, COPY_BATCH):
+            batch = list(_generate_rows(fake, rng, start, min(COPY_BATCH, rows - start), now))
+            await raw.driver_connection.copy_records_to_table(
+                Promocode.__tablename__, records=batch, columns=COPY_COLUMNS
+            )
+            for offset in range(0, len(batch), step):
+                oid, code, _, status, *_ = batch[offset]
+                bucket = (start + offset) // step % 3
+                if bucket == 0:
+                    dataset.lookup_codes.append(code)
+                elif bucket == 1 and status == PromoStatus.ACTIVE.name:
+                    dataset.active_codes.append(code)
+                elif bucket == 2:
+                    dataset.ids.append(str(oid))
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(f"VACUUM ANALYZE {Promocode.__tablename__}"))
+    return dataset
+
+
+def plan_operations(
+    mix: str, dataset: SeededDataset, requests: int, rng: random.Random
+) -> List[Operation]:
+    """Детерминированный список запросов смеси
+
+    Коды для использования и id для удаления расходуются из датасета,
+    поэтому каждый из них затрагивается не больше одного раза за прогон.
+    """
+    endpoints = list(MIXES[mix])
+    weights = list(MIXES[mix].values())
+    operations = []
+    for idx in range(requests):
+        endpoint = rng.choices(endpoints, weights)[0]
+        if endpoint == CREATE:
+            query = {
+                "code": f"BENCH-{mix}-{idx}".upper(),
+                "uc_amount": rng.choice(DENOMINATIONS).value,
+                "duration_days": "30",
+            }
+            operations.append(Operation(endpoint, "POST", "/promocode/", query))
+        elif endpoint == LOOKUP:
+            # Каждый десятый поиск - несуществующий код
+            code = rng.choice(dataset.lookup_codes) if idx % 10 else f"MISSING-{mix}-{idx}"
+            operations.append(Operation(endpoint, "GET", f"/promocode/code/{code}"))
+        elif endpoint == LIST:
+            query = {"limit": "50"}
+            if rng.random() < 0.5:
+                query["uc_amount"] = rng.choice(DENOMINATIONS).value
+            if rng.random() < 0.5:
+                query["status"] = rng.choice(list(PromoStatus)).value
+            operations.append(Operation(endpoint, "GET", "/promocode/", query))
+        elif endpoint == REDEEM and dataset.active_codes:
+            code = dataset.active_codes.pop()
+            operations.append(
+                Operation(endpoint, "POST", f"/promocode/code/{code}/use", {"user_id": f"u{idx}"})
+            )
+        elif endpoint == DELETE and dataset.ids:
+            operations.append(Operation(endpoint, "DELETE", f"/promocode/{dataset.ids.pop()}"))
+    return operations
+
+
+async def call_asgi(app: ASGIApp, operation: Operation, client: Tuple[str, int]) -> int:
+    """Один HTTP-запрос напрямую в ASGI-приложение, без сети и HTTP-клиента"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": operation.method,
+        "scheme": "http",
+        "path": operation.path,
+        "raw_path": operation.path.encode(),
+        "query_string": urlencode(operation.query).encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench")]
+        + ([(b"content-type", b"application/json")] if operation.body else []),
+        "client": client,
+        "server": ("bench", 80),
+    }
+    status = 0
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            # Ответ уже отдан, клиент "отключается"
+            await asyncio.Future()
+        request_sent = True
+        return {"type": "http.request", "body": operation.body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run_mix(
+    app: ASGIApp, mix: str, operations: Sequence[Operation], concurrency: int
+) -> dict:
+    """Гоняет операции конкурентными клиентами и сводит задержки по эндпоинтам
+
+    Клиенты работают в том же цикле событий, что и приложение, поэтому
+    пропускная способность - это предел одного воркера gunicorn.
+    """
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Counter] = defaultdict(Counter)
+    queue = iter(operations)
+
+    async def worker(idx: int) -> None:
+        client = (f"10.0.{idx // 250}.{idx % 250 + 1}", 50_000 + idx)
+        for operation in queue:
+            began = time.perf_counter()
+            status = await call_asgi(app, operation, client)
+            latencies[operation.endpoint].append(time.perf_counter() - began)
+            statuses[operation.endpoint][str(status)] += 1
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker(idx) for idx in range(concurrency)))
+    elapsed = time.perf_counter() - began
+
+    return {
+        "mix": mix,
+        "requests": len(operations),
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(operations) / elapsed, 1),
+        "endpoints": {
+            endpoint: {
+                "throughput_rps": round(len(values) / elapsed, 1),
+                **latency_summary(values),
+                "statuses": dict(sorted(statuses[endpoint].items())),
+            }
+            for endpoint, values in sorted(latencies.items())
+        },
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        head = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{head}-dirty" if dirty.stdout.strip() else head
+
+
+class BenchRedisProvider(Provider):
+    """Redis бенчмарка вместо хоста redis из настроек"""
+
+    @provide(scope=Scope.APP)
+    async def get_redis(self) -> AsyncGenerator[Redis, None]:
+        redis = Redis.from_url(
+            REDIS_URL,
+            socket_timeout=settings.cache.socket_timeout,
+            socket_connect_timeout=settings.cache.socket_timeout,
+        )
+        yield redis
+        await redis.aclose()
+
+
+async def redis_available() -> bool:
+    redis = Redis.from_url(REDIS_URL, socket_connect_timeout=0.5)
+    try:
+        return await redis.ping()
+    except (RedisError, OSError):
+        return False
+    finally:
+        await redis.aclose()
+
+
+def load_main_app():
+    """Настоящее приложение, собранное с текущими (подмененными) настройками"""
+    if "application.main" in sys.modules:
+        return importlib.reload(sys.modules["application.main"]).main_app
+    return importlib.import_module("application.main").main_app
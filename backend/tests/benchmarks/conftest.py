@@ -0,0 +1,35 @@
+from typing import AsyncGenerator
+
+import infra.db.models  # noqa
+import pytest_asyncio
+from infra.db.models.mixins import Base
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from tests.benchmarks.utils import BENCH_POOL_SIZE
+
+
+@pytest_asyncio.fixture
+async def bench_engine(postgresql) -> AsyncGenerator[AsyncEngine, None]:
+    """Движок с настоящим пулом соединений для конкурентных замеров"""
+    db_uri = (
+        f"postgresql+asyncpg://{postgresql.info.user}:{postgresql.info.password}"
+        f"@{postgresql.info.host}:{postgresql.info.port}/"
+        f"{postgresql.info.dbname}"
+    )
+    engine = create_async_engine(url=db_uri, pool_size=BENCH_POOL_SIZE, max_overflow=0)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+def bench_session_factory(bench_engine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bench_engine, class_=AsyncSession, expire_on_commit=False)
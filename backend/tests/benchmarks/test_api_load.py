@@ -0,0 +1,84 @@
+import os
+import platform
+import random
+from pathlib import Path
+
+import orjson
+import pytest
+from application.di.container import create_container
+from application.di.providers import DatabaseProvider
+from dishka.integrations.fastapi import FastapiProvider
+from settings.config import settings
+from sqlalchemy import text
+
+from tests.benchmarks.api_load import (
+    CONCURRENCY,
+    MIXES,
+    REQUESTS_PER_MIX,
+    ROWS,
+    SEED,
+    BenchRedisProvider,
+    git_revision,
+    load_main_app,
+    plan_operations,
+    redis_available,
+    run_mix,
+    seed_promo_dataset,
+)
+from tests.benchmarks.utils import report
+
+OUTPUT_DIR = os.getenv("BENCH_OUTPUT_DIR")
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_api_load_mixes(bench_engine, monkeypatch):
+    """Смеси create/lookup/list/redeem/delete через ASGI-приложение на засеянном датасете
+
+    Ограничитель частоты выключен: весь поток идет от одного генератора
+    нагрузки и упирался бы в лимиты, а не в приложение. Без Redis
+    кэш промокодов выключается, чтобы не мерить отказы соединения.
+    """
+    with_redis = await redis_available()
+    monkeypatch.setattr(settings.rate_limit, "enabled", False)
+    monkeypatch.setattr(settings.cache, "enabled", settings.cache.enabled and with_redis)
+
+    dataset = await seed_promo_dataset(bench_engine, ROWS, SEED)
+
+    app = load_main_app()
+    db_url = bench_engine.url.render_as_string(hide_password=False)
+    app.state.dishka_container = create_container(
+        FastapiProvider(), DatabaseProvider(url=db_url), BenchRedisProvider()
+    )
+
+    rng = random.Random(SEED)
+    results = []
+    async with app.router.lifespan_context(app):
+        for mix in os.getenv("BENCH_API_MIXES", ",".join(MIXES)).split(","):
+            operations = plan_operations(mix, dataset, REQUESTS_PER_MIX, rng)
+            results.append(await run_mix(app, mix, operations, CONCURRENCY))
+
+    async with bench_engine.connect() as conn:
+        server_version = (await conn.execute(text("SHOW server_version"))).scalar_one()
+
+    payload = {
+        "revision": git_revision(),
+        "rows": ROWS,
+        "seed": SEED,
+        "requests_per_mix": REQUESTS_PER_MIX,
+        "concurrency": CONCURRENCY,
+        "redis": with_redis,
+        "postgres": server_version,
+        "python": platform.python_version(),
+        "mixes": results,
+    }
+    report("api_load", payload)
+    if OUTPUT_DIR:
+        path = Path(OUTPUT_DIR) / f"api_load-{payload['revision']}-{ROWS}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+
+    for result in results:
+        for endpoint, summary in result["endpoints"].items():
+            server_errors = {s: n for s, n in summary["statuses"].items() if s.startswith("5")}
+            assert not server_errors, f"{result['mix']} {endpoint}: {server_errors}"
@@ -0,0 +1,47 @@
+import time
+
+import pytest
+from application.services import PromoService
+from domain.enums import UcAmount
+from domain.services import PromoCodeGenerator, PromoValidator
+from infra.db.models import Promocode
+from infra.db.repositories import PromoRepositoryImpl, SqlAlchemyUnitOfWork, WalletRepositoryImpl
+from sqlalchemy import func, select
+
+from tests.benchmarks.utils import report
+
+BATCH_SIZE = 100_000
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_bulk_create_100k(bench_session_factory):
+    """Пакетная генерация 100 000 промокодов в одной транзакции"""
+    async with bench_session_factory() as session:
+        service = PromoService(
+            PromoRepositoryImpl(session),
+            PromoValidator(),
+            PromoCodeGenerator(),
+            WalletRepositoryImpl(session),
+            SqlAlchemyUnitOfWork(session),
+        )
+
+        began = time.perf_counter()
+        batch = await service.create_promo_batch(
+            uc_amount=UcAmount.UC60, count=BATCH_SIZE, duration_days=30, prefix="BENCH-"
+        )
+        elapsed = time.perf_counter() - began
+
+        total = await session.scalar(select(func.count()).select_from(Promocode))
+
+    report(
+        "bulk_create",
+        {
+            "codes": BATCH_SIZE,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": int(BATCH_SIZE / elapsed),
+        },
+    )
+
+    assert len(batch.codes) == BATCH_SIZE
+    assert total == BATCH_SIZE
@@ -0,0 +1,157 @@
+"""Число COMMIT и ROLLBACK на один запрос API по эндпоинтам
+
+Запросы идут по одному, поэтому разница счетчиков событий движка до и
+после вызова относится ровно к этому запросу. Читающие эндпоинты не
+должны ничего фиксировать, пишущие - фиксировать ровно одну транзакцию,
+включая пакетную генерацию с повторами на конфликтах кодов.
+
+Запуск: pytest -s -m benchmark tests/benchmarks/test_commits_per_request.py,
+сводка печатается строкой [benchmark] commits_per_request.
+"""
+
+import random
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+import orjson
+import pytest
+from application.di.container import create_container
+from application.di.providers import DatabaseProvider
+from dishka.integrations.fastapi import FastapiProvider
+from domain.enums import UcAmount
+from settings.config import settings
+from sqlalchemy import Engine, event
+
+from tests.benchmarks.api_load import (
+    SEED,
+    BenchRedisProvider,
+    Operation,
+    call_asgi,
+    load_main_app,
+    redis_available,
+    seed_promo_dataset,
+)
+from tests.benchmarks.utils import report
+
+ROWS = 2000
+REQUESTS_PER_ENDPOINT = 20
+
+READS = (
+    "GET /promocode/{promo_id}",
+    "GET /promocode/code/{promo_code}",
+    "GET /promocode/",
+    "GET /promocode/export",
+    "GET /api/v1/get_card",
+    "GET /users/{user_id}/balance",
+    "GET /users/{user_id}/promos",
+)
+
+
+def plan_requests(dataset, rng: random.Random) -> List[Operation]:
+    uc_amount = UcAmount.UC60
+    price = settings.storefront.prices[uc_amount.name]
+    operations: List[Operation] = []
+    for idx in range(REQUESTS_PER_ENDPOINT):
+        code = rng.choice(dataset.lookup_codes)
+        user_id = f"commits-{idx}"
+        purchase = {"tg_id": idx, "card_title": uc_amount.value, "price": price}
+        operations += [
+            Operation(
+                "POST /promocode/",
+                "POST",
+                "/promocode/",
+                {"code": f"COMMITS-{idx}", "uc_amount": uc_amount.value, "duration_days": "30"},
+            ),
+            Operation(
+                "POST /promocode/batch",
+                "POST",
+                "/promocode/batch",
+                {"uc_amount": uc_amount.value, "count": "50", "duration_days": "30"},
+            ),
+            Operation("GET /promocode/{promo_id}", "GET", f"/promocode/{rng.choice(dataset.ids)}"),
+            Operation("GET /promocode/code/{promo_code}", "GET", f"/promocode/code/{code}"),
+            Operation("GET /promocode/", "GET", "/promocode/", {"limit": "50"}),
+            Operation(
+                "GET /promocode/export",
+                "GET",
+                "/promocode/export",
+                {"uc_amount": uc_amount.value, "status": "active"},
+            ),
+            Operation(
+                "POST /promocode/code/{promo_code}/use",
+                "POST",
+                f"/promocode/code/{dataset.active_codes.pop()}/use",
+                {"user_id": user_id},
+            ),
+            Operation(
+                "POST /api/v1/set_by_user_card",
+                "POST",
+                "/api/v1/set_by_user_card",
+                body=orjson.dumps(purchase),
+            ),
+            Operation("DELETE /promocode/{promo_id}", "DELETE", f"/promocode/{dataset.ids.pop()}"),
+            Operation("GET /api/v1/get_card", "GET", "/api/v1/get_card"),
+            Operation("GET /users/{user_id}/balance", "GET", f"/users/{user_id}/balance"),
+            Operation("GET /users/{user_id}/promos", "GET", f"/users/{user_id}/promos"),
+        ]
+    return operations
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_commits_per_request(bench_engine, monkeypatch):
+    with_redis = await redis_available()
+    monkeypatch.setattr(settings.rate_limit, "enabled", False)
+    monkeypatch.setattr(settings.cache, "enabled", settings.cache.enabled and with_redis)
+
+    dataset = await seed_promo_dataset(bench_engine, ROWS, SEED)
+    operations = plan_requests(dataset, random.Random(SEED))
+
+    app = load_main_app()
+    db_url = bench_engine.url.render_as_string(hide_password=False)
+    app.state.dishka_container = create_container(
+        FastapiProvider(), DatabaseProvider(url=db_url), BenchRedisProvider()
+    )
+
+    events: Counter = Counter()
+
+    def on_commit(conn) -> None:
+        events["commit"] += 1
+
+    def on_rollback(conn) -> None:
+        events["rollback"] += 1
+
+    totals: Dict[str, Counter] = defaultdict(Counter)
+    event.listen(Engine, "commit", on_commit)
+    event.listen(Engine, "rollback", on_rollback)
+    try:
+        async with app.router.lifespan_context(app):
+            for operation in operations:
+                before = events.copy()
+                status = await call_asgi(app, operation, ("10.0.0.1", 50_000))
+                totals[operation.endpoint].update(events - before)
+                totals[operation.endpoint]["requests"] += 1
+                totals[operation.endpoint][f"status_{status}"] += 1
+    finally:
+        event.remove(Engine, "commit", on_commit)
+        event.remove(Engine, "rollback", on_rollback)
+
+    results = {
+        endpoint: {
+            "commits_per_request": counts["commit"] / counts["requests"],
+            "rollbacks_per_request": counts["rollback"] / counts["requests"],
+            "statuses": {
+                name.removeprefix("status_"): n
+                for name, n in sorted(counts.items())
+                if name.startswith("status_")
+            },
+        }
+        for endpoint, counts in sorted(totals.items())
+    }
+    report("commits_per_request", {"redis": with_redis, "endpoints": results})
+
+    for endpoint, summary in results.items():
+        assert summary["commits_per_request"] <= 1, endpoint
+        assert all(not status.startswith("5") for status in summary["statuses"]), endpoint
+        if endpoint in READS:
+            assert summary["commits_per_request"] == 0, endpoint
@@ -0,0 +1,110 @@
+"""Сравнение настроек движка на путях поиска и использования промокода
+
+Каждая операция открывает свою сессию и коммитит ее, как запрос API:
+pre-ping выполняется на каждой выдаче соединения из пула, а кэш
+подготовленных запросов живет в соединении между сессиями. Профили:
+
+- default: pre-ping и кэш подготовленных запросов (настройки по умолчанию);
+- no_pre_ping: DB_POOL_PRE_PING=false, минус один round-trip на выдачу;
+- no_statement_cache: DB_PREPARED_STATEMENT_CACHE_SIZE=0, prepare на каждый запрос;
+- pgbouncer: DB_PGBOUNCER=true, без кэша и с уникальными именами запросов.
+
+Запуск: pytest -s -m benchmark tests/benchmarks/test_engine_tuning.py,
+сводка печатается строкой [benchmark] engine_tuning.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List
+
+import pytest
+from domain.enums import UcAmount
+from infra.db.engine import engine_options
+from infra.db.repositories import PromoRepositoryImpl
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from tests.benchmarks.utils import latency_summary, report
+
+POOL_SIZE = 10
+CONCURRENCY = 20
+LOOKUPS = 1500
+REDEEMS = 500
+
+PROFILES: Dict[str, dict] = {
+    "default": {},
+    "no_pre_ping": {"pool_pre_ping": False},
+    "no_statement_cache": {"prepared_statement_cache_size": 0},
+    "pgbouncer": {"pgbouncer": True},
+}
+
+
+def profile_options(**overrides) -> dict:
+    options = {
+        "pool_size": POOL_SIZE,
+        "max_overflow": 0,
+        "pool_timeout": 30.0,
+        "pool_recycle": -1,
+        "pool_pre_ping": True,
+        "prepared_statement_cache_size": 100,
+        "statement_timeout_ms": None,
+        "pgbouncer": False,
+    }
+    return engine_options(**{**options, **overrides})
+
+
+async def measure(operations: int, operation: Callable[[int], Awaitable[None]]) -> dict:
+    latencies: List[float] = []
+    counter = iter(range(operations))
+
+    async def worker() -> None:
+        for idx in counter:
+            began = time.perf_counter()
+            await operation(idx)
+            latencies.append(time.perf_counter() - began)
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - began
+    return {"throughput_ops": round(operations / elapsed, 1), **latency_summary(latencies)}
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_engine_tuning_profiles(bench_engine):
+    expires_at = datetime.now(timezone.utc) + timedelta(days=7)
+    async with async_sessionmaker(bench_engine, class_=AsyncSession)() as session:
+        for name in PROFILES:
+            await PromoRepositoryImpl(session).bulk_create(
+                [f"{name.upper()}-{idx:05d}" for idx in range(REDEEMS)], UcAmount.UC60, expires_at
+            )
+        await session.commit()
+
+    results = {}
+    for name, overrides in PROFILES.items():
+        engine = create_async_engine(bench_engine.url, **profile_options(**overrides))
+        session_factory = async_sessionmaker(engine, class_=AsyncSession)
+        codes = [f"{name.upper()}-{idx:05d}" for idx in range(REDEEMS)]
+
+        async def lookup(idx: int) -> None:
+            async with session_factory() as session:
+                assert await PromoRepositoryImpl(session).get_by_code(codes[idx % REDEEMS])
+                await session.commit()
+
+        async def redeem(idx: int) -> None:
+            async with session_factory() as session:
+                await PromoRepositoryImpl(session).redeem(f"user-{idx}", code=codes[idx])
+                await session.commit()
+
+        # Прогрев: соединения пула открыты, типы asyncpg интроспектированы
+        await measure(CONCURRENCY * 5, lookup)
+        results[name] = {
+            "lookup": await measure(LOOKUPS, lookup),
+            "redeem": await measure(REDEEMS, redeem),
+        }
+        await engine.dispose()
+
+    report(
+        "engine_tuning",
+        {"pool_size": POOL_SIZE, "concurrency": CONCURRENCY, "profiles": results},
+    )
@@ -0,0 +1,136 @@
+"""Стоимость строки страницы списка: сущности против проекции колонок
+
+Оба пути читают страницу из 100 промокодов (плюс строка-признак следующей
+страницы) в новой сессии, как запрос API, и строят PromoShortResponse:
+
+- entity: PromoRepositoryImpl.get_all - ORM-объект Promocode, три
+  value object и PromoEntity на строку;
+- projection: PromoQueriesImpl.list_promos - шесть колонок в PromoListRow.
+
+CPU считается по time.process_time, память - tracemalloc в отдельном
+проходе, чтобы трассировка не искажала время.
+
+Запуск: pytest -s -m benchmark tests/benchmarks/test_list_read_model.py,
+сводка печатается строкой [benchmark] list_read_model.
+"""
+
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from statistics import median
+from typing import Awaitable, Callable, Dict, List
+from uuid import UUID
+
+import pytest
+from api.schemas import PromoShortResponse
+from domain.entities import PromoEntity
+from domain.enums import UcAmount
+from domain.values import PromoListRow
+from infra.db.repositories import PromoQueriesImpl, PromoRepositoryImpl
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from tests.benchmarks.utils import report
+
+PAGE_SIZE = 100
+PAGES = 300
+WARMUP_PAGES = 20
+SEED_ROWS = 2000
+
+
+async def fetch_entities(session: AsyncSession) -> List[PromoEntity]:
+    return await PromoRepositoryImpl(session).get_all(limit=PAGE_SIZE + 1)
+
+
+async def fetch_rows(session: AsyncSession) -> List[PromoListRow]:
+    return await PromoQueriesImpl(session).list_promos(limit=PAGE_SIZE + 1)
+
+
+def entity_responses(promos: List[PromoEntity]) -> List[PromoShortResponse]:
+    return [
+        PromoShortResponse(
+            id=UUID(promo.oid),
+            code=promo.code,
+            uc_amount=promo.uc_amount,
+            expires_at=promo.expires_at,
+            status=promo.status,
+        )
+        for promo in promos[:PAGE_SIZE]
+    ]
+
+
+def row_responses(rows: List[PromoListRow]) -> List[PromoShortResponse]:
+    return [
+        PromoShortResponse(
+            id=row.oid,
+            code=row.code,
+            uc_amount=row.uc_amount,
+            expires_at=row.expires_at,
+            status=row.status,
+        )
+        for row in rows[:PAGE_SIZE]
+    ]
+
+
+async def measure(
+    session_factory: async_sessionmaker[AsyncSession],
+    fetch: Callable[[AsyncSession], Awaitable[list]],
+    respond: Callable[[list], List[PromoShortResponse]],
+) -> Dict[str, float]:
+    async def page() -> List[PromoShortResponse]:
+        async with session_factory() as session:
+            return respond(await fetch(session))
+
+    for _ in range(WARMUP_PAGES):
+        assert len(await page()) == PAGE_SIZE
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(PAGES):
+        await page()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+    # Удержано - память под результат выборки, пока сессия открыта (вместе с
+    # identity map); пик - максимум за выборку и построение ответа
+    retained, peaks = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(PAGES // 10):
+            async with session_factory() as session:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                items = await fetch(session)
+                retained.append(tracemalloc.get_traced_memory()[0] - baseline)
+                respond(items)
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+            del items
+    finally:
+        tracemalloc.stop()
+
+    rows = PAGES * PAGE_SIZE
+    return {
+        "wall_us_per_row": round(wall / rows * 1e6, 2),
+        "cpu_us_per_row": round(cpu / rows * 1e6, 2),
+        "retained_bytes_per_row": round(median(retained) / PAGE_SIZE),
+        "peak_bytes_per_row": round(median(peaks) / PAGE_SIZE),
+    }
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_list_page_row_cost(bench_session_factory):
+    expires_at = datetime.now(timezone.utc) + timedelta(days=7)
+    async with bench_session_factory() as session:
+        await PromoRepositoryImpl(session).bulk_create(
+            [f"READ-{idx:05d}" for idx in range(SEED_ROWS)], UcAmount.UC60, expires_at
+        )
+        await session.commit()
+
+    results = {
+        "entity": await measure(bench_session_factory, fetch_entities, entity_responses),
+        "projection": await measure(bench_session_factory, fetch_rows, row_responses),
+    }
+    results["cpu_speedup"] = round(
+        results["entity"]["cpu_us_per_row"] / results["projection"]["cpu_us_per_row"], 2
+    )
+    report("list_read_model", {"page_size": PAGE_SIZE, "pages": PAGES, **results})
+
+    assert results["projection"]["cpu_us_per_row"] < results["entity"]["cpu_us_per_row"]
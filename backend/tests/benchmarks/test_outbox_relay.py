@@ -0,0 +1,67 @@
+import time
+
+import pytest
+from domain.events import CreatedPromoCodeEvent
+from infra.broker.outbox import OutboxRelay
+from infra.db.models import OutboxEvent
+from infra.db.repositories import OutboxRepository
+from sqlalchemy import func, select
+
+from tests.benchmarks.utils import report
+
+EVENTS = 20_000
+BATCH_SIZE = 500
+
+
+class NullExchange:
+    """Брокер, мгновенно подтверждающий публикацию: замеряется сторона БД"""
+
+    def __init__(self) -> None:
+        self.published = 0
+
+    async def publish(self, message, routing_key: str) -> None:
+        self.published += 1
+
+
+class NullChannel:
+    def __init__(self) -> None:
+        self.exchange = NullExchange()
+
+    async def declare_exchange(self, *args, **kwargs) -> NullExchange:
+        return self.exchange
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_outbox_relay_throughput(bench_session_factory):
+    """Выгрузка 20 000 событий outbox пачками по 500"""
+    async with bench_session_factory() as session:
+        await OutboxRepository(session).add(
+            CreatedPromoCodeEvent(code=f"BENCH-{i}") for i in range(EVENTS)
+        )
+        await session.commit()
+
+    channel = NullChannel()
+    relay = OutboxRelay(bench_session_factory, channel, "promo.events", BATCH_SIZE)
+
+    began = time.perf_counter()
+    batches = 0
+    while await relay.relay_batch():
+        batches += 1
+    elapsed = time.perf_counter() - began
+
+    async with bench_session_factory() as session:
+        left = await session.scalar(select(func.count()).select_from(OutboxEvent))
+
+    report(
+        "outbox_relay",
+        {
+            "events": EVENTS,
+            "batches": batches,
+            "seconds": round(elapsed, 3),
+            "events_per_second": int(EVENTS / elapsed),
+        },
+    )
+
+    assert channel.exchange.published == EVENTS
+    assert left == 0
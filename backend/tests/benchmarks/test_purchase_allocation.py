@@ -0,0 +1,70 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from domain.enums import UcAmount
+from domain.exceptions import PromoOutOfStockException
+from infra.db.repositories import PromoRepositoryImpl
+
+from tests.benchmarks.utils import BENCH_POOL_SIZE, latency_summary, report
+
+BUYERS = 500
+STOCK = 400
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_parallel_purchases_of_one_denomination(bench_session_factory):
+    """Сотни покупателей одного номинала: каждый получает свой промокод или отказ"""
+    expires_at = datetime.now(timezone.utc) + timedelta(days=7)
+    async with bench_session_factory() as session:
+        await PromoRepositoryImpl(session).bulk_create(
+            [f"STOCK-{i:05d}" for i in range(STOCK)], UcAmount.UC300, expires_at
+        )
+        await session.commit()
+
+    async def warm_up() -> None:
+        async with bench_session_factory() as session:
+            await PromoRepositoryImpl(session).get_by_code("WARMUP")
+
+    # Заполняем пул заранее, чтобы замер не включал подключение и интроспекцию типов
+    await asyncio.gather(*(warm_up() for _ in range(BENCH_POOL_SIZE)))
+
+    start = asyncio.Event()
+
+    async def buyer(idx: int) -> tuple[str | None, float]:
+        await start.wait()
+        began = time.perf_counter()
+        # Соединений в пуле меньше, чем покупателей: остальные ждут в очереди пула
+        async with bench_session_factory() as session:
+            try:
+                promo = await PromoRepositoryImpl(session).allocate(UcAmount.UC300, f"tg-{idx}")
+                await session.commit()
+                return promo.code, time.perf_counter() - began
+            except PromoOutOfStockException:
+                await session.rollback()
+                return None, time.perf_counter() - began
+
+    tasks = [asyncio.create_task(buyer(idx)) for idx in range(BUYERS)]
+    await asyncio.sleep(0)
+    began = time.perf_counter()
+    start.set()
+    results = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - began
+
+    codes = [code for code, _ in results if code is not None]
+    report(
+        "purchase_allocation",
+        {
+            "buyers": BUYERS,
+            "stock": STOCK,
+            "allocated": len(codes),
+            "seconds": round(elapsed, 3),
+            "purchases_per_second": int(BUYERS / elapsed),
+            **latency_summary([latency for _, latency in results]),
+        },
+    )
+
+    assert len(codes) == STOCK
+    assert len(set(codes)) == STOCK
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+import pytest
+from domain.entities import PromoEntity
+from domain.enums import PromoStatus, UcAmount
+from domain.exceptions.promo import PromoCodeAlreadyUsedException
+from infra.db.repositories import PromoRepositoryImpl
+
+from tests.benchmarks.utils import BENCH_POOL_SIZE, latency_summary, report
+
+CONTENDERS = BENCH_POOL_SIZE
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_parallel_redeem_of_one_code(bench_session_factory):
+    """N параллельных попыток использовать один промокод: ровно одна успешная"""
+    promo = PromoEntity.create(code="RACE-CODE", uc_amount=UcAmount.UC600, duration_days=7)
+    async with bench_session_factory() as session:
+        await PromoRepositoryImpl(session).save(promo)
+        await session.commit()
+
+    start = asyncio.Event()
+
+    async def contender(idx: int) -> tuple[bool, float]:
+        async with bench_session_factory() as session:
+            repo = PromoRepositoryImpl(session)
+            # Прогреваем соединение, чтобы замер не включал подключение и интроспекцию типов
+            await repo.get_by_code("WARMUP")
+            await start.wait()
+            began = time.perf_counter()
+            try:
+                await repo.redeem(f"user-{idx}", code=promo.code)
+                await session.commit()
+                return True, time.perf_counter() - began
+            except PromoCodeAlreadyUsedException:
+                await session.rollback()
+                return False, time.perf_counter() - began
+
+    tasks = [asyncio.create_task(contender(idx)) for idx in range(CONTENDERS)]
+    await asyncio.sleep(0)
+    start.set()
+    results = await asyncio.gather(*tasks)
+
+    successes = [ok for ok, _ in results if ok]
+    summary = latency_summary([latency for _, latency in results])
+    report("redeem_contention", {"contenders": CONTENDERS, "successes": len(successes), **summary})
+
+    assert len(successes) == 1
+
+    async with bench_session_factory() as session:
+        stored = await PromoRepositoryImpl(session).get_by_code(promo.code)
+    assert stored.status == PromoStatus.USED
+    assert stored.usage.used_by is not None
@@ -0,0 +1,111 @@
+"""Время сериализации 1000 строк списка промокодов
+
+- response_model: PromoShortResponse на строку, затем то, что делает
+  FastAPI с возвращенной моделью: повторная проверка по response_model,
+  dump в JSON-режиме и ORJSONResponse;
+- fast_path: строки чтения сразу в orjson (SERIALIZATION_FAST_PATH);
+- export_ndjson: выгрузка тех же строк, для сравнения.
+
+Запуск: pytest -s -m benchmark tests/benchmarks/test_response_serialization.py,
+сводка печатается строкой [benchmark] response_serialization.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from statistics import median
+from typing import Awaitable, Callable, List
+from uuid import uuid4
+
+import pytest
+from api.responses import promo_list_json
+from api.schemas import PromoListResponse, PromoShortResponse
+from application.services.export import iter_ndjson
+from asyncpg.pgproto.pgproto import UUID as AsyncpgUUID
+from domain.enums import PromoStatus, UcAmount
+from domain.values import PromoListRow
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+
+from tests.benchmarks.utils import report
+
+ITEMS = 1000
+ROUNDS = 50
+
+
+def make_rows() -> List[PromoListRow]:
+    now = datetime.now(timezone.utc)
+    return [
+        PromoListRow(
+            # Такой UUID отдает asyncpg: подкласс uuid.UUID
+            oid=AsyncpgUUID(str(uuid4())),
+            code=f"SERIAL-{idx:06d}",
+            uc_amount=UcAmount.UC300,
+            status=PromoStatus.ACTIVE,
+            expires_at=now + timedelta(days=idx % 30),
+            created_at=now.replace(tzinfo=None) - timedelta(seconds=idx),
+        )
+        for idx in range(ITEMS)
+    ]
+
+
+async def measure(encode: Callable[[], Awaitable[bytes]]) -> float:
+    """Медиана по раундам, мс на 1000 строк"""
+    timings = []
+    for _ in range(ROUNDS):
+        began = time.perf_counter()
+        await encode()
+        timings.append(time.perf_counter() - began)
+    return round(median(timings) * 1000 * 1000 / ITEMS, 3)
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_list_serialization_per_1000_items():
+    rows = make_rows()
+
+    router = APIRouter()
+
+    @router.get("/", response_model=PromoListResponse)
+    async def endpoint():  # pragma: no cover - нужен только response_field маршрута
+        pass
+
+    response_field = router.routes[0].response_field
+
+    async def response_model() -> bytes:
+        content = PromoListResponse(
+            items=[
+                PromoShortResponse(
+                    id=row.oid,
+                    code=row.code,
+                    uc_amount=row.uc_amount,
+                    expires_at=row.expires_at,
+                    status=row.status,
+                )
+                for row in rows
+            ],
+            next_cursor=None,
+        )
+        serialized = await serialize_response(field=response_field, response_content=content)
+        return ORJSONResponse(serialized).body
+
+    async def fast_path() -> bytes:
+        return promo_list_json(rows, None)
+
+    async def export_ndjson() -> bytes:
+        async def partitions():
+            yield [(*row[:5], None, None, row.created_at) for row in rows]
+
+        return b"".join([chunk async for chunk in iter_ndjson(partitions())])
+
+    assert await fast_path() == await response_model()
+
+    results = {
+        "response_model_ms": await measure(response_model),
+        "fast_path_ms": await measure(fast_path),
+        "export_ndjson_ms": await measure(export_ndjson),
+    }
+    results["speedup"] = round(results["response_model_ms"] / results["fast_path_ms"], 1)
+    report("response_serialization", {"items": ITEMS, "rounds": ROUNDS, **results})
+
+    assert results["fast_path_ms"] < results["response_model_ms"]
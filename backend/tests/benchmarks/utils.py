@@ -0,0 +1,28 @@
+import json
+from typing import Sequence
+
+BENCH_POOL_SIZE = 50
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Перцентиль методом ближайшего ранга"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def latency_summary(latencies: Sequence[float]) -> dict:
+    """Сводка задержек в миллисекундах"""
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(max(latencies, default=0.0) * 1000, 3),
+    }
+
+
+def report(name: str, payload: dict) -> None:
+    print(f"\n[benchmark] {name}: {json.dumps(payload, ensure_ascii=False)}")
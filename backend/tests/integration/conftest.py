@@ -0,0 +1,39 @@
+from pathlib import Path
+from typing import AsyncGenerator
+
+import pytest_asyncio
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def upgrade_to(connection: Connection, revision: str) -> None:
+    """Прогоняет настоящие миграции alembic вместо Base.metadata.create_all"""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.attributes["configure_logger"] = False
+    config.attributes["connection"] = connection
+    command.upgrade(config, revision)
+
+
+def upgrade_to_head(connection: Connection) -> None:
+    upgrade_to(connection, "head")
+
+
+@pytest_asyncio.fixture
+async def migrated_engine(postgresql) -> AsyncGenerator[AsyncEngine, None]:
+    db_uri = (
+        f"postgresql+asyncpg://{postgresql.info.user}:{postgresql.info.password}"
+        f"@{postgresql.info.host}:{postgresql.info.port}/"
+        f"{postgresql.info.dbname}"
+    )
+    engine = create_async_engine(url=db_uri)
+
+    async with engine.connect() as conn:
+        await conn.run_sync(upgrade_to_head)
+
+    yield engine
+    await engine.dispose()
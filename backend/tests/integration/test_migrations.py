@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import text
+
+from tests.integration.conftest import upgrade_to
+
+INDEX = "ix_promo_codes_active_expires_at"
+
+INDEX_STATE_SQL = text(
+    "SELECT indisvalid, pg_get_indexdef(indexrelid) FROM pg_index "
+    "WHERE indexrelid = to_regclass(:name)"
+)
+
+
+@pytest.mark.asyncio
+async def test_upgrade_rebuilds_index_left_invalid_by_interrupted_build(migrated_engine):
+    async with migrated_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(
+            text(
+                "INSERT INTO promo_codes (id, code, uc_amount, status, expires_at, created_at) "
+                "SELECT gen_random_uuid(), 'MIGRATE' || n, 'UC60', 'ACTIVE', "
+                "now() + interval '1 day', now() FROM generate_series(1, 2) AS n"
+            )
+        )
+        # Неудачное построение CONCURRENTLY оставляет индекс с indisvalid = false,
+        # а ревизия 0002 остается неприменённой
+        await conn.execute(text(f"DROP INDEX {INDEX}"))
+        with pytest.raises(Exception, match="could not create unique index"):
+            await conn.execute(
+                text(f"CREATE UNIQUE INDEX CONCURRENTLY {INDEX} ON promo_codes (status)")
+            )
+        await conn.execute(text("UPDATE alembic_version SET version_num = '0001'"))
+        assert (await conn.execute(INDEX_STATE_SQL, {"name": INDEX})).one()[0] is False
+
+    async with migrated_engine.connect() as conn:
+        await conn.run_sync(upgrade_to, "0002")
+        valid, definition = (await conn.execute(INDEX_STATE_SQL, {"name": INDEX})).one()
+        assert valid
+        assert "UNIQUE" not in definition
+        assert "(expires_at) WHERE (status = 'ACTIVE'" in definition
@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+from uuid import UUID
+
+import pytest
+from aio_pika import Message
+from domain.entities import PromoEntity
+from domain.enums import PromoStatus, UcAmount
+from domain.exceptions import PromoCodeAlreadyUsedException, PromoCodeNotFoundException
+from infra.broker.outbox import OutboxRelay
+from infra.db.models import OutboxEvent
+from infra.db.repositories import PromoRepositoryImpl, SqlAlchemyUnitOfWork
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class RecordingExchange:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.published: List[Message] = []
+
+    async def publish(self, message: Message, routing_key: str) -> None:
+        if self.fail:
+            raise ConnectionError("broker is unavailable")
+        self.published.append(message)
+
+
+class StubChannel:
+    def __init__(self, exchange: RecordingExchange) -> None:
+        self.exchange = exchange
+
+    async def declare_exchange(self, *args, **kwargs) -> RecordingExchange:
+        return self.exchange
+
+
+@pytest.fixture
+def session_factory(migrated_engine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(migrated_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def outbox_types(session: AsyncSession) -> List[str]:
+    result = await session.scalars(select(OutboxEvent.event_type).order_by(OutboxEvent.event_type))
+    return list(result.all())
+
+
+@pytest.mark.asyncio
+async def test_promo_changes_write_outbox_in_same_transaction(session_factory):
+    async with session_factory() as session:
+        repository = PromoRepositoryImpl(session)
+        unit_of_work = SqlAlchemyUnitOfWork(session)
+        promo = PromoEntity.create("OUTBOX1", UcAmount.UC60, duration_days=30)
+        await repository.save(promo)
+        unit_of_work.collect(promo)
+        await unit_of_work.commit()
+        assert promo.events == []
+
+        unit_of_work.collect(await repository.redeem("user-1", code="OUTBOX1"))
+        await unit_of_work.rollback()
+        assert await outbox_types(session) == ["CreatedPromoCodeEvent"]
+
+        used = await repository.redeem("user-1", code="OUTBOX1")
+        # Событие остается у сущности до коммита единицы работы
+        assert await outbox_types(session) == ["CreatedPromoCodeEvent"]
+        unit_of_work.collect(used)
+        await unit_of_work.commit()
+        assert used.events == []
+        assert await outbox_types(session) == ["CreatedPromoCodeEvent", "UsedPromoCodeEvent"]
+
+        expires_at = datetime.now(tz=timezone.utc) + timedelta(days=1)
+        inserted = await repository.bulk_create(["OUTBOX1", "OUTBOX2"], UcAmount.UC60, expires_at)
+        await unit_of_work.commit()
+
+        assert inserted == ["OUTBOX2"]
+        payloads = await session.scalars(select(OutboxEvent.payload))
+        assert {"code": "OUTBOX2", "message": "Промокод успешно создан"} in payloads.all()
+
+
+@pytest.mark.asyncio
+async def test_delete_returns_removed_promo(session_factory):
+    async with session_factory() as session:
+        repository = PromoRepositoryImpl(session)
+        unit_of_work = SqlAlchemyUnitOfWork(session)
+        created = PromoEntity.create("OUTBOXDEL", UcAmount.UC600, duration_days=30)
+        await repository.save(created)
+        unit_of_work.collect(created)
+        await unit_of_work.commit()
+
+        promo = await repository.get_by_code("OUTBOXDEL")
+        promo.delete()
+        deleted = await repository.delete(UUID(promo.oid))
+        unit_of_work.collect(promo)
+        await unit_of_work.commit()
+
+        assert (deleted.code, deleted.uc_amount) == ("OUTBOXDEL", UcAmount.UC600)
+        assert await repository.get_by_code("OUTBOXDEL") is None
+        with pytest.raises(PromoCodeNotFoundException):
+            await repository.delete(UUID(promo.oid))
+        assert await outbox_types(session) == ["CreatedPromoCodeEvent", "DeletedPromoCodeEvent"]
+
+
+@pytest.mark.asyncio
+async def test_delete_keeps_promo_used_after_it_was_read(session_factory):
+    async with session_factory() as session:
+        repository = PromoRepositoryImpl(session)
+        unit_of_work = SqlAlchemyUnitOfWork(session)
+        created = PromoEntity.create("OUTBOXUSED", UcAmount.ALL, duration_days=30)
+        await repository.save(created)
+        await unit_of_work.commit()
+
+        # Сервис мог получить промокод из кэша до того, как его использовали
+        stale = await repository.get_by_code("OUTBOXUSED")
+        await repository.redeem("user-1", code="OUTBOXUSED")
+        await unit_of_work.commit()
+
+        with pytest.raises(PromoCodeAlreadyUsedException):
+            await repository.delete(UUID(stale.oid))
+        assert (await repository.get_by_code("OUTBOXUSED")).status == PromoStatus.USED
+
+
+@pytest.mark.asyncio
+async def test_after_commit_runs_once_committed(session_factory):
+    calls: List[bool] = []
+
+    async def record() -> None:
+        calls.append(await outbox_types(other) == ["CreatedPromoCodeEvent"])
+
+    async with session_factory() as session, session_factory() as other:
+        repository = PromoRepositoryImpl(session)
+        unit_of_work = SqlAlchemyUnitOfWork(session)
+
+        promo = PromoEntity.create("OUTBOXHOOK", UcAmount.UC60, duration_days=30)
+        await repository.save(promo)
+        unit_of_work.collect(promo)
+        unit_of_work.after_commit(record)
+        await unit_of_work.rollback()
+        await unit_of_work.commit()
+        assert calls == []
+
+        await repository.save(promo)
+        unit_of_work.collect(promo)
+        unit_of_work.after_commit(record)
+        await unit_of_work.commit()
+
+    # Действие видит зафиксированные изменения из другой сессии
+    assert calls == [True]
+
+
+@pytest.mark.asyncio
+async def test_relay_deletes_only_confirmed_batches(session_factory):
+    async with session_factory() as session:
+        repository = PromoRepositoryImpl(session)
+        expires_at = datetime.now(tz=timezone.utc) + timedelta(days=1)
+        await repository.bulk_create([f"RELAY{i}" for i in range(5)], UcAmount.UC60, expires_at)
+        await session.commit()
+
+    failing = OutboxRelay(session_factory, StubChannel(RecordingExchange(fail=True)), "x", 3)
+    with pytest.raises(ConnectionError):
+        await failing.relay_batch()
+
+    exchange = RecordingExchange()
+    relay = OutboxRelay(session_factory, StubChannel(exchange), "x", 3)
+    result = await relay.drain(run_seconds=0.2, poll_interval=0.05)
+
+    assert result.published == 5
+    assert result.batches == 2
+    assert {message.type for message in exchange.published} == {"CreatedPromoCodeEvent"}
+    async with session_factory() as session:
+        assert await session.scalar(select(func.count()).select_from(OutboxEvent)) == 0
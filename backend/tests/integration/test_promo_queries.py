@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import pytest
+from application.services import PromoQueryService
+from domain.enums import PromoStatus, UcAmount
+from infra.db.repositories import PromoQueriesImpl, PromoRepositoryImpl
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+@pytest.mark.asyncio
+async def test_list_pages_match_repository_order(migrated_engine):
+    session_factory = async_sessionmaker(migrated_engine, class_=AsyncSession)
+    expires_at = datetime.now(tz=timezone.utc) + timedelta(days=7)
+
+    async with session_factory() as session:
+        repository = PromoRepositoryImpl(session)
+        await repository.bulk_create([f"QUERY{i}" for i in range(5)], UcAmount.UC60, expires_at)
+        await repository.bulk_create(["QUERY-BIG"], UcAmount.UC1800, expires_at)
+        await repository.redeem("user-1", code="QUERY3")
+        await session.commit()
+
+        service = PromoQueryService(PromoQueriesImpl(session))
+        rows, cursor = [], None
+        while True:
+            page = await service.list_promos(limit=2, cursor=cursor)
+            rows.extend(page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        entities = await repository.get_all()
+        assert [(row.oid, row.code) for row in rows] == [
+            (UUID(promo.oid), promo.code) for promo in entities
+        ]
+        assert isinstance(rows[0].uc_amount, UcAmount)
+
+        used = await service.list_promos(status=PromoStatus.USED.value)
+        assert [(row.code, row.status) for row in used.items] == [("QUERY3", PromoStatus.USED)]
+        big = await service.list_promos(uc_amount=UcAmount.UC1800.value)
+        assert [row.code for row in big.items] == ["QUERY-BIG"]
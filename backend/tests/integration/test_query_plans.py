@@ -0,0 +1,167 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Iterator, List, Tuple
+from uuid import uuid4
+
+import pytest
+from domain.entities import PromoEntity
+from domain.enums import PromoStatus, UcAmount
+from domain.exceptions import PromoCodeNotFoundException
+from domain.values import PageCursor
+from infra.db.models import Promocode
+from infra.db.repositories import PromoQueriesImpl, PromoRepositoryImpl
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
+
+SEED_ROWS = 50_000
+
+SEED_SQL = text(
+    """
+    INSERT INTO promo_codes (id, code, uc_amount, status, expires_at, used_by, used_at, created_at)
+    SELECT
+        gen_random_uuid(),
+        'SEED' || lpad(n::text, 8, '0'),
+        (enum_range(NULL::ucamount))[1 + n % 7],
+        (enum_range(NULL::promostatus))[1 + n % 3],
+        now() + make_interval(days => n % 60 - 10),
+        CASE WHEN n % 3 = 1 THEN 'user-' || (n % 1000) END,
+        CASE WHEN n % 3 = 1 THEN now() - make_interval(mins => n % 5000) END,
+        now() - make_interval(secs => n)
+    FROM generate_series(1, :rows) AS n
+    """
+)
+
+
+def iter_plan_nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", ()):
+        yield from iter_plan_nodes(child)
+
+
+async def exercise_repository(session: AsyncSession) -> None:
+    """Вызывает все запросы PromoRepositoryImpl и PromoQueriesImpl с типичными фильтрами
+
+    iter_codes не проверяется: он читает всю таблицу для фильтра Блума.
+    """
+    repository = PromoRepositoryImpl(session)
+    queries = PromoQueriesImpl(session)
+    cursor = PageCursor(sort_key=datetime.now(tz=timezone.utc).replace(tzinfo=None), oid=uuid4())
+    created_from = cursor.sort_key - timedelta(hours=1)
+
+    await repository.save(PromoEntity.create("PLANCHECK", UcAmount.UC60, duration_days=30))
+    await repository.get_by_id(uuid4())
+    await repository.get_by_code("SEED00000001")
+
+    for uc_amount in (None, UcAmount.UC60):
+        for status in (None, PromoStatus.ACTIVE):
+            await repository.get_all(uc_amount=uc_amount, status=status, limit=50)
+            await repository.get_all(uc_amount=uc_amount, status=status, limit=50, cursor=cursor)
+            await queries.list_promos(uc_amount=uc_amount, status=status, limit=50)
+            await queries.list_promos(uc_amount=uc_amount, status=status, limit=50, cursor=cursor)
+
+    for filters in (
+        {"uc_amount": UcAmount.UC300},
+        {"status": PromoStatus.USED},
+        {"uc_amount": UcAmount.UC300, "status": PromoStatus.USED},
+        {"created_from": created_from},
+    ):
+        async for _ in repository.iter_export(**filters):
+            break
+
+    await repository.get_user_history("user-1", limit=50)
+    await repository.get_user_history("user-1", limit=50, cursor=cursor)
+
+    await repository.redeem("user-1", code="SEED00000030")
+    await session.rollback()
+    with pytest.raises(PromoCodeNotFoundException):
+        await repository.redeem("user-1", promo_id=uuid4())
+    await session.rollback()
+    await repository.bulk_create(["PLANCHECK-BULK"], UcAmount.UC60, datetime.now(tz=timezone.utc))
+    await session.rollback()
+    await repository.count_available()
+    await repository.allocate(UcAmount.UC985, "buyer-1")
+    await session.rollback()
+    await repository.expire_batch(limit=100)
+    with pytest.raises(PromoCodeNotFoundException):
+        await repository.delete(uuid4())
+
+
+async def capture_statements(
+    engine: AsyncEngine, exercise: Callable[[AsyncSession], Awaitable[None]]
+) -> List[Tuple[str, Any]]:
+    statements: List[Tuple[str, Any]] = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if "promo_codes" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as session:
+            await exercise(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+    return statements
+
+
+async def seed(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(SEED_SQL, {"rows": SEED_ROWS})
+        # VACUUM заполняет visibility map, без нее index-only scan читает таблицу
+        await conn.execute(text(f"VACUUM ANALYZE {Promocode.__tablename__}"))
+
+
+async def explain(conn: AsyncConnection, statement: str, parameters: Any) -> dict:
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+@pytest.mark.asyncio
+async def test_repository_queries_never_seq_scan_promo_codes(migrated_engine):
+    await seed(migrated_engine)
+
+    statements = await capture_statements(migrated_engine, exercise_repository)
+    assert statements
+
+    offenders = []
+    async with migrated_engine.connect() as conn:
+        # Без seq scan планировщик возьмёт индекс, если он вообще применим к запросу;
+        # Seq Scan в плане означает, что подходящего индекса нет
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        for statement, parameters in statements:
+            plan = await explain(conn, statement, parameters)
+            for node in iter_plan_nodes(plan):
+                if node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "promo_codes":
+                    offenders.append(statement)
+                    break
+
+    assert not offenders, "Seq Scan по promo_codes:\n\n" + "\n\n".join(offenders)
+
+
+@pytest.mark.asyncio
+async def test_user_history_is_index_only_scan(migrated_engine):
+    await seed(migrated_engine)
+
+    async def exercise(session: AsyncSession) -> None:
+        repository = PromoRepositoryImpl(session)
+        first_page = await repository.get_user_history("user-1", limit=2)
+        last = first_page[-1]
+        await repository.get_user_history(
+            "user-1", limit=2, cursor=PageCursor(sort_key=last.used_at, oid=last.oid)
+        )
+
+    statements = await capture_statements(migrated_engine, exercise)
+
+    async with migrated_engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = await explain(conn, statement, parameters)
+            scans = [node for node in iter_plan_nodes(plan) if "Scan" in node["Node Type"]]
+            assert [(node["Node Type"], node["Index Name"]) for node in scans] == [
+                ("Index Only Scan", "ix_promo_codes_used_by_used_at_id")
+            ]
@@ -0,0 +1,95 @@
+import logging
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from domain.entities import PromoEntity
+from domain.enums import UcAmount
+from infra.db.repositories import PromoRepositoryImpl
+from infra.db.slow_query import SlowQueryLog, request_scope
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+def make_log(engine, threshold_ms=0.0, explain_sample_rate=1.0):
+    slow_query_log = SlowQueryLog(
+        engine,
+        threshold_ms=threshold_ms,
+        explain_sample_rate=explain_sample_rate,
+        explain_interval_seconds=300.0,
+        explain_timeout_seconds=5.0,
+    )
+    slow_query_log.attach()
+    return slow_query_log
+
+
+def detach(engine, slow_query_log):
+    for name, listener in (
+        ("before_cursor_execute", slow_query_log._before_cursor_execute),
+        ("after_cursor_execute", slow_query_log._after_cursor_execute),
+        ("handle_error", slow_query_log._handle_error),
+    ):
+        event.remove(engine.sync_engine, name, listener)
+
+
+def records(caplog, kind):
+    return [
+        orjson.loads(record.getMessage())
+        for record in caplog.records
+        if record.name == "infra.db.slow_query" and record.getMessage().startswith("{")
+        if orjson.loads(record.getMessage())["event"] == kind
+    ]
+
+
+@pytest.mark.asyncio
+async def test_slow_lookup_is_logged_with_route_and_plan(migrated_engine, caplog):
+    caplog.set_level(logging.WARNING, logger="infra.db.slow_query")
+    slow_query_log = make_log(migrated_engine, explain_sample_rate=0.0)
+    session_factory = async_sessionmaker(migrated_engine, class_=AsyncSession)
+    scope = {"type": "http", "method": "GET", "path": "/promocode/code/SLOW1"}
+    token = request_scope.set(scope)
+    try:
+        async with session_factory() as session:
+            repository = PromoRepositoryImpl(session)
+            await repository.save(PromoEntity.create("SLOW1", UcAmount.UC60, duration_days=30))
+            slow_query_log.explain_sample_rate = 1.0
+            # Маршрут появляется в scope после роутинга, уже после входа в запрос
+            scope["route"] = SimpleNamespace(path_format="/promocode/code/{promo_code}")
+            await repository.get_by_code("SLOW1")
+            await session.commit()
+        await slow_query_log.wait_explains()
+    finally:
+        request_scope.reset(token)
+        detach(migrated_engine, slow_query_log)
+
+    lookup = next(
+        r for r in records(caplog, "slow_query") if "WHERE promo_codes.code" in r["statement"]
+    )
+    assert lookup["route"] == "GET /promocode/code/{promo_code}"
+    assert lookup["parameters"]["types"][0] == "str"
+    assert "SLOW1" not in orjson.dumps(lookup).decode()
+
+    plans = {r["fingerprint"]: r for r in records(caplog, "slow_query_plan")}
+    assert plans[lookup["fingerprint"]]["summary"]["indexes"]
+    assert "SLOW1" not in orjson.dumps(plans[lookup["fingerprint"]]).decode()
+
+
+@pytest.mark.asyncio
+async def test_fast_statements_and_repeats_are_not_explained(migrated_engine, caplog):
+    caplog.set_level(logging.WARNING, logger="infra.db.slow_query")
+    slow_query_log = make_log(migrated_engine, threshold_ms=10_000)
+    try:
+        async with migrated_engine.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+        assert records(caplog, "slow_query") == []
+
+        slow_query_log.threshold = 0.0
+        async with migrated_engine.connect() as conn:
+            for _ in range(3):
+                await conn.exec_driver_sql("SELECT 1")
+                await slow_query_log.wait_explains()
+    finally:
+        detach(migrated_engine, slow_query_log)
+
+    assert len(records(caplog, "slow_query")) == 3
+    assert len(records(caplog, "slow_query_plan")) == 1
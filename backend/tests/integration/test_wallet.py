@@ -0,0 +1,90 @@
+from uuid import UUID
+
+import pytest
+from application.services import PromoService, WalletService
+from domain.enums import PromoStatus, UcAmount
+from domain.exceptions import PromoCodeAlreadyUsedException
+from domain.services import PromoCodeGenerator, PromoValidator
+from infra.db.models import UcLedgerEntry
+from infra.db.repositories import PromoRepositoryImpl, SqlAlchemyUnitOfWork, WalletRepositoryImpl
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class FailingWalletRepository(WalletRepositoryImpl):
+    async def credit(self, user_id: str, amount: int, promo_id: UUID) -> int:
+        await super().credit(user_id, amount, promo_id)
+        raise ConnectionError("connection lost before commit")
+
+
+@pytest.mark.asyncio
+async def test_redemption_credits_wallet_in_same_transaction(migrated_engine):
+    session_factory = async_sessionmaker(migrated_engine, class_=AsyncSession)
+
+    async with session_factory() as session:
+        promo_repository = PromoRepositoryImpl(session)
+        wallet_repository = WalletRepositoryImpl(session)
+        unit_of_work = SqlAlchemyUnitOfWork(session)
+        promo_service = PromoService(
+            promo_repository,
+            PromoValidator(),
+            PromoCodeGenerator(),
+            wallet_repository,
+            unit_of_work,
+        )
+        wallet_service = WalletService(wallet_repository)
+
+        for code, uc_amount in (("WALLET1", UcAmount.UC300), ("WALLET2", UcAmount.UC60)):
+            await promo_service.create_promo(code, uc_amount, duration_days=30)
+
+        failing_service = PromoService(
+            promo_repository,
+            PromoValidator(),
+            PromoCodeGenerator(),
+            FailingWalletRepository(session),
+            unit_of_work,
+        )
+        with pytest.raises(ConnectionError):
+            await failing_service.use_promo_by_code("WALLET1", "user-1")
+        await session.rollback()
+        assert (await wallet_service.get_balance("user-1")).balance == 0
+        assert (await promo_service.get_promo_by_code("WALLET1")).status == PromoStatus.ACTIVE
+
+        await promo_service.use_promo_by_code("WALLET1", "user-1")
+        await promo_service.use_promo_by_code("WALLET2", "user-1")
+
+        with pytest.raises(PromoCodeAlreadyUsedException):
+            await promo_service.use_promo_by_code("WALLET1", "user-2")
+        await session.rollback()
+
+        balance = await wallet_service.get_balance("user-1")
+        entries = await session.scalar(select(func.count()).select_from(UcLedgerEntry))
+
+    assert balance.balance == 325 + 60
+    assert balance.updated_at is not None
+    assert entries == 2
+
+
+@pytest.mark.asyncio
+async def test_redeeming_all_code_skips_wallet(migrated_engine):
+    session_factory = async_sessionmaker(migrated_engine, class_=AsyncSession)
+
+    async with session_factory() as session:
+        wallet_repository = WalletRepositoryImpl(session)
+        promo_service = PromoService(
+            PromoRepositoryImpl(session),
+            PromoValidator(),
+            PromoCodeGenerator(),
+            wallet_repository,
+            SqlAlchemyUnitOfWork(session),
+        )
+
+        await promo_service.create_promo("WALLETALL", UcAmount.ALL, duration_days=30)
+        promo = await promo_service.use_promo_by_code("WALLETALL", "user-1")
+
+        balance = await WalletService(wallet_repository).get_balance("user-1")
+        entries = await session.scalar(select(func.count()).select_from(UcLedgerEntry))
+
+    assert promo.status == PromoStatus.USED
+    assert balance.balance == 0
+    assert entries == 0
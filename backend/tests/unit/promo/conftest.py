@@ -3,9 +3,38 @@ from unittest.mock import AsyncMock
 import pytest
 from domain.entities import PromoEntity
 from domain.enums import PromoStatus, UcAmount
+from domain.repositories import UnitOfWork
 from domain.services import PromoValidator
 
 
+class InMemoryUnitOfWork(UnitOfWork):
+    """Единица работы без базы: коммит только выполняет действия после коммита"""
+
+    def __init__(self):
+        self.commits = 0
+        self._after_commit = []
+
+    def collect(self, *entities):
+        pass
+
+    def after_commit(self, callback):
+        self._after_commit.append(callback)
+
+    async def commit(self):
+        self.commits += 1
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            await callback()
+
+    async def rollback(self):
+        self._after_commit.clear()
+
+
+@pytest.fixture
+def unit_of_work():
+    return InMemoryUnitOfWork()
+
+
 @pytest.fixture
 def promo_validator():
     return PromoValidator()
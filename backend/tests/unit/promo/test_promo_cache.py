@@ -0,0 +1,123 @@
+from unittest.mock import AsyncMock
+from uuid import UUID
+
+import pytest
+from domain.enums import PromoStatus
+from infra.cache.promo import CachedPromoRepository, CacheStats
+from redis.exceptions import ConnectionError
+
+
+class InMemoryRedis:
+    """Минимальная замена Redis для get/set/delete/pipeline"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return InMemoryPipeline(self)
+
+
+class InMemoryPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.redis.data[key] = value
+
+    async def execute(self):
+        return []
+
+
+@pytest.fixture
+def inner_repository(active_promo_entity):
+    repository = AsyncMock()
+    repository.get_by_id.return_value = active_promo_entity
+    repository.get_by_code.return_value = active_promo_entity
+    return repository
+
+
+class TestCachedPromoRepository:
+    """Тесты для кэша промокодов"""
+
+    @pytest.mark.asyncio
+    async def test_second_lookup_served_from_cache(
+        self, inner_repository, active_promo_entity, unit_of_work
+    ):
+        """Повторный поиск по коду не обращается к базе"""
+        stats = CacheStats()
+        repository = CachedPromoRepository(
+            inner_repository, InMemoryRedis(), stats, 300, unit_of_work
+        )
+
+        first = await repository.get_by_code(active_promo_entity.code)
+        second = await repository.get_by_code(active_promo_entity.code)
+
+        assert inner_repository.get_by_code.await_count == 1
+        assert second.oid == first.oid
+        assert second.code == first.code
+        assert second.uc_amount == first.uc_amount
+        assert second.expires_at == first.expires_at
+        assert (stats.hits, stats.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_lookup_by_code_fills_id_entry(
+        self, inner_repository, active_promo_entity, unit_of_work
+    ):
+        """После поиска по коду промокод находится в кэше и по ID"""
+        repository = CachedPromoRepository(
+            inner_repository, InMemoryRedis(), CacheStats(), 300, unit_of_work
+        )
+
+        await repository.get_by_code(active_promo_entity.code)
+        await repository.get_by_id(UUID(active_promo_entity.oid))
+
+        inner_repository.get_by_id.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_redeem_invalidates_entries_after_commit(
+        self, inner_repository, active_promo_entity, promo_validator, unit_of_work
+    ):
+        """Использование промокода удаляет его из кэша после коммита"""
+        redis = InMemoryRedis()
+        repository = CachedPromoRepository(inner_repository, redis, CacheStats(), 300, unit_of_work)
+        await repository.get_by_code(active_promo_entity.code)
+
+        active_promo_entity.use("user-123", promo_validator)
+        inner_repository.redeem.return_value = active_promo_entity
+        await repository.redeem("user-123", code=active_promo_entity.code)
+
+        # До коммита другие запросы видят в базе прежнюю строку, кэш не трогается
+        assert len(redis.data) == 2
+        await unit_of_work.commit()
+        assert redis.data == {}
+        promo = await repository.get_by_code(active_promo_entity.code)
+        assert promo.status == PromoStatus.USED
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_falls_back_to_repository(
+        self, inner_repository, active_promo_entity, unit_of_work
+    ):
+        """При недоступном Redis данные берутся из базы"""
+        redis = AsyncMock()
+        redis.get.side_effect = ConnectionError("down")
+        stats = CacheStats()
+        repository = CachedPromoRepository(inner_repository, redis, stats, 300, unit_of_work)
+
+        promo = await repository.get_by_code(active_promo_entity.code)
+
+        assert promo is active_promo_entity
+        assert stats.errors == 1
+        assert not stats.available
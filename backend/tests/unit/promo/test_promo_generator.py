@@ -0,0 +1,26 @@
+from domain.services import PromoCodeGenerator
+
+
+class TestPromoCodeGenerator:
+    """Тесты для генератора промокодов"""
+
+    def test_generate_unique_codes(self):
+        """Генерируется запрошенное количество уникальных кодов"""
+        codes = PromoCodeGenerator().generate(10_000)
+
+        assert len(codes) == 10_000
+        assert len(set(codes)) == 10_000
+
+    def test_generate_with_prefix(self):
+        """Коды начинаются с префикса и имеют заданную длину"""
+        generator = PromoCodeGenerator(length=8)
+        codes = generator.generate(100, prefix="SALE-")
+
+        assert all(code.startswith("SALE-") for code in codes)
+        assert all(len(code) == len("SALE-") + 8 for code in codes)
+
+    def test_generate_uses_base32_alphabet(self):
+        """Коды состоят только из символов base32"""
+        codes = PromoCodeGenerator().generate(100)
+
+        assert all(set(code) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZ234567") for code in codes)
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from domain.enums import PromoStatus, UcAmount
+from domain.exceptions import PromoCodeAlreadyUsedException, PromoCodeExpiredException
+from infra.db.models import Promocode
+from infra.db.models.mixins import Base
+from infra.db.repositories import PromoRepositoryImpl
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+@pytest_asyncio.fixture
+async def session_factory(async_engine):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return async_sessionmaker(async_engine, class_=AsyncSession)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("status", "expires_in_days", "used_by", "exception"),
+    [
+        # Повтор использованного кода после истечения срока - по-прежнему "уже использован"
+        (PromoStatus.USED, -1, "user-1", PromoCodeAlreadyUsedException),
+        (PromoStatus.USED, 1, "user-1", PromoCodeAlreadyUsedException),
+        (PromoStatus.EXPIRED, -1, None, PromoCodeExpiredException),
+        (PromoStatus.ACTIVE, -1, None, PromoCodeExpiredException),
+    ],
+)
+async def test_redeem_rejects_with_status_error(
+    session_factory, status, expires_in_days, used_by, exception
+):
+    now = datetime.now(timezone.utc)
+
+    async with session_factory() as session:
+        session.add(
+            Promocode(
+                id=uuid4(),
+                code="REDEEMED",
+                uc_amount=UcAmount.UC60,
+                status=status,
+                expires_at=now + timedelta(days=expires_in_days),
+                used_by=used_by,
+                used_at=now - timedelta(days=2) if used_by else None,
+            )
+        )
+        await session.commit()
+
+        with pytest.raises(exception):
+            await PromoRepositoryImpl(session).redeem("user-2", code="REDEEMED")
@@ -0,0 +1,105 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from infra.cache.single_flight import (
+    PromoLookupFlights,
+    SingleFlightPromoRepository,
+    SingleFlightStats,
+)
+
+
+@pytest.fixture
+def slow_repository(active_promo_entity):
+    repository = AsyncMock()
+
+    async def get_by_code(code):
+        await asyncio.sleep(0.01)
+        return active_promo_entity
+
+    repository.get_by_code.side_effect = get_by_code
+    repository.redeem.return_value = active_promo_entity
+    return repository
+
+
+def make_repository(inner, unit_of_work, window_seconds=0.0):
+    flights = PromoLookupFlights(SingleFlightStats(), window_seconds=window_seconds)
+    return SingleFlightPromoRepository(inner, flights, unit_of_work)
+
+
+class TestSingleFlightPromoRepository:
+    """Тесты объединения одновременных поисков промокода"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_query(
+        self, slow_repository, active_promo_entity, unit_of_work
+    ):
+        repository = make_repository(slow_repository, unit_of_work)
+
+        results = await asyncio.gather(*(repository.get_by_code("TEST123") for _ in range(50)))
+
+        assert slow_repository.get_by_code.await_count == 1
+        assert {promo.oid for promo in results} == {active_promo_entity.oid}
+        assert repository.flights.stats.leaders == 1
+        assert repository.flights.stats.coalesced == 49
+
+    @pytest.mark.asyncio
+    async def test_each_request_gets_own_entity(self, slow_repository, unit_of_work):
+        repository = make_repository(slow_repository, unit_of_work)
+
+        first, second = await asyncio.gather(
+            repository.get_by_code("TEST123"), repository.get_by_code("TEST123")
+        )
+
+        assert first is not second
+        assert first.events == []
+
+    @pytest.mark.asyncio
+    async def test_recent_result_served_within_window(self, slow_repository, unit_of_work):
+        repository = make_repository(slow_repository, unit_of_work, window_seconds=60)
+
+        await repository.get_by_code("TEST123")
+        await repository.get_by_code("TEST123")
+
+        assert slow_repository.get_by_code.await_count == 1
+        assert repository.flights.stats.window_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_committed_write_resets_window(self, slow_repository, unit_of_work):
+        repository = make_repository(slow_repository, unit_of_work, window_seconds=60)
+
+        await repository.get_by_code("TEST123")
+        await repository.redeem("user-1", code="TEST123")
+        await repository.get_by_code("TEST123")
+        assert slow_repository.get_by_code.await_count == 1
+
+        await unit_of_work.commit()
+        await repository.get_by_code("TEST123")
+        assert slow_repository.get_by_code.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_error_is_shared_and_not_remembered(self, slow_repository, unit_of_work):
+        slow_repository.get_by_code.side_effect = ConnectionRefusedError("db is down")
+        repository = make_repository(slow_repository, unit_of_work, window_seconds=60)
+
+        results = await asyncio.gather(
+            *(repository.get_by_code("TEST123") for _ in range(3)), return_exceptions=True
+        )
+        slow_repository.get_by_code.side_effect = None
+        slow_repository.get_by_code.return_value = None
+
+        assert all(isinstance(result, ConnectionRefusedError) for result in results)
+        assert await repository.get_by_code("TEST123") is None
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_followers(self, slow_repository, unit_of_work):
+        repository = make_repository(slow_repository, unit_of_work)
+
+        leader = asyncio.create_task(repository.get_by_code("TEST123"))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(repository.get_by_code("TEST123"))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert (await follower).code == "TEST123"
+        assert slow_repository.get_by_code.await_count == 2
@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+from application.services import CatalogService
+from domain.enums import UcAmount
+from infra.cache.stock import PromoStockCounter, StockCountingPromoRepository
+from redis.exceptions import ConnectionError
+
+PRICES = {"UC60": 89, "UC300": 449}
+
+
+class InMemoryHashRedis:
+    """Минимальная замена Redis для hgetall/hincrby/hset"""
+
+    def __init__(self):
+        self.hashes = {}
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        name = field.encode()
+        fields[name] = int(fields.get(name, 0)) + amount
+        return fields[name]
+
+    async def hset(self, key, mapping):
+        fields = self.hashes.setdefault(key, {})
+        for field, value in mapping.items():
+            fields[field if isinstance(field, bytes) else field.encode()] = value
+
+
+@pytest.fixture
+def inner_repository(active_promo_entity):
+    repository = AsyncMock()
+    repository.count_available.return_value = {UcAmount.UC60: 5}
+    repository.redeem.return_value = active_promo_entity
+    repository.bulk_create.side_effect = lambda codes, uc_amount, expires_at: list(codes)
+    return repository
+
+
+class TestCatalogStock:
+    """Тесты остатков витрины"""
+
+    @pytest.mark.asyncio
+    async def test_counts_database_once_then_serves_counters(self, inner_repository):
+        """Пока счетчики не сверены, остатки считаются в базе, дальше берутся из Redis"""
+        counter = PromoStockCounter(InMemoryHashRedis(), ttl_seconds=0)
+        service = CatalogService(inner_repository, counter, PRICES, "/uc/{units}.png")
+
+        first = await service.get_catalog()
+        second = await service.get_catalog()
+
+        assert inner_repository.count_available.await_count == 1
+        assert [(item.title, item.stock) for item in first] == [("60UC", 5), ("325UC", 0)]
+        assert second == first
+        assert first[1].image_url == "/uc/325.png"
+
+    @pytest.mark.asyncio
+    async def test_repository_changes_adjust_counters(
+        self, inner_repository, active_promo_entity, unit_of_work
+    ):
+        """Создание, пакетная вставка и использование меняют счетчики после коммита"""
+        counter = PromoStockCounter(InMemoryHashRedis(), ttl_seconds=0)
+        await counter.reset({})
+        repository = StockCountingPromoRepository(inner_repository, counter, unit_of_work)
+
+        await repository.save(active_promo_entity)
+        await repository.bulk_create(
+            ["A", "B"], UcAmount.UC60, datetime.now(timezone.utc) + timedelta(days=1)
+        )
+        await repository.redeem("user-1", code=active_promo_entity.code)
+        assert not any((await counter.snapshot()).values())
+        await unit_of_work.commit()
+
+        stock = await counter.snapshot()
+        assert stock[UcAmount.UC300] == 0
+        assert stock[UcAmount.UC60] == 2
+
+    @pytest.mark.asyncio
+    async def test_rollback_leaves_counters_unchanged(
+        self, inner_repository, active_promo_entity, unit_of_work
+    ):
+        """Откаченные изменения не попадают в счетчики"""
+        counter = PromoStockCounter(InMemoryHashRedis(), ttl_seconds=0)
+        await counter.reset({UcAmount.UC300: 3})
+        repository = StockCountingPromoRepository(inner_repository, counter, unit_of_work)
+
+        await repository.bulk_create(
+            ["A", "B"], UcAmount.UC300, datetime.now(timezone.utc) + timedelta(days=1)
+        )
+        await repository.redeem("user-1", code=active_promo_entity.code)
+        await unit_of_work.rollback()
+        await unit_of_work.commit()
+
+        assert (await counter.snapshot())[UcAmount.UC300] == 3
+
+    @pytest.mark.asyncio
+    async def test_delete_uses_returned_row(
+        self, inner_repository, active_promo_entity, unit_of_work
+    ):
+        """Удаление активного кода уменьшает счетчик без отдельного чтения промокода"""
+        counter = PromoStockCounter(InMemoryHashRedis(), ttl_seconds=0)
+        await counter.reset({UcAmount.UC300: 1})
+        inner_repository.delete.return_value = active_promo_entity
+        repository = StockCountingPromoRepository(inner_repository, counter, unit_of_work)
+
+        assert await repository.delete(active_promo_entity.oid) is active_promo_entity
+        await unit_of_work.commit()
+
+        inner_repository.get_by_id.assert_not_awaited()
+        assert (await counter.snapshot())[UcAmount.UC300] == 0
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_falls_back_to_database(self, inner_repository):
+        """При недоступном Redis остатки считаются в базе"""
+        redis = AsyncMock()
+        redis.hgetall.side_effect = ConnectionError("redis is down")
+        redis.hset.side_effect = ConnectionError("redis is down")
+        service = CatalogService(
+            inner_repository, PromoStockCounter(redis, ttl_seconds=1), PRICES, "/uc/{units}.png"
+        )
+
+        catalog = await service.get_catalog()
+
+        assert catalog[0].stock == 5
@@ -83,3 +83,20 @@ class TestPromoCodeUsage:
         assert usage.used_by == user_id
         assert usage.used_at is not None
         assert usage.used_at <= datetime.now(timezone.utc)
+
+
+class TestUcAmountUnits:
+    """Тесты числового номинала UC"""
+
+    @pytest.mark.parametrize(
+        "uc_amount, units",
+        [(UcAmount.UC60, 60), (UcAmount.UC300, 325), (UcAmount.UC3850, 3850)],
+    )
+    def test_units_parsed_from_value(self, uc_amount, units):
+        """Номинал берется из значения enum, а не из имени"""
+        assert uc_amount.units == units
+
+    def test_all_has_no_units(self):
+        """ALL используется только как фильтр и номиналом не является"""
+        with pytest.raises(ValueError):
+            UcAmount.ALL.units
@@ -0,0 +1,203 @@
+import os
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+from infra.cache.bloom import (
+    BloomFilter,
+    BloomFilteredPromoRepository,
+    BloomFilterFeed,
+    BloomFilterFollower,
+    open_or_build,
+)
+from redis.exceptions import ConnectionError
+
+
+async def code_chunks(codes):
+    yield codes
+
+
+class InMemoryStreamRedis:
+    """Минимальная замена Redis для xadd/xrange/xread одного потока"""
+
+    def __init__(self):
+        self.entries = []
+        self.down = False
+        self.commands = []
+
+    def _check(self, command):
+        if self.down:
+            raise ConnectionError("redis is down")
+        self.commands.append(command)
+
+    async def xadd(self, name, fields, maxlen=None, approximate=True):
+        self._check("xadd")
+        last = self.entries[-1][0] if self.entries else (0, 0)
+        now = int(time.time() * 1000)
+        entry_id = (now, 0) if now > last[0] else (last[0], last[1] + 1)
+        self.entries.append((entry_id, {k.encode(): v.encode() for k, v in fields.items()}))
+        del self.entries[: max(len(self.entries) - maxlen, 0)]
+        return f"{entry_id[0]}-{entry_id[1]}".encode()
+
+    async def xrange(self, name, count=None):
+        self._check("xrange")
+        return [(f"{i[0]}-{i[1]}".encode(), f) for i, f in self.entries[:count]]
+
+    async def xread(self, streams, count=None, block=None):
+        self._check("xread")
+        ms, seq = map(int, next(iter(streams.values())).split("-"))
+        after = [(i, f) for i, f in self.entries if i > (ms, seq)][:count]
+        if not after:
+            return []
+        return [[b"stream", [(f"{i[0]}-{i[1]}".encode(), f) for i, f in after]]]
+
+
+class ImmediateUnitOfWork:
+    """Коммит сразу после записи: действия после коммита выполняются на месте"""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after_commit(self, callback):
+        self.callbacks.append(callback)
+
+    async def commit(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            await callback()
+
+
+async def make_host(path, feed, codes=()):
+    """Фильтр и follower одного хоста API"""
+    bloom_filter = await open_or_build(path, 1000, 0.01, code_chunks(list(codes)), feed)
+
+    async def rebuild():
+        (await open_or_build(path, 1000, 0.01, code_chunks(list(codes)), feed)).close()
+        bloom_filter.reopen()
+
+    follower = BloomFilterFollower(
+        bloom_filter, feed, feed, rebuild, batch_size=10, block_ms=1, retry_seconds=0
+    )
+    return bloom_filter, follower
+
+
+class TestBloomFilter:
+    """Тесты для фильтра Блума"""
+
+    def test_added_codes_are_found(self, tmp_path):
+        """Добавленные коды всегда находятся в фильтре"""
+        bloom_filter = BloomFilter.create(str(tmp_path / "codes.bloom"), 10_000, 0.01)
+        codes = [f"CODE{i}" for i in range(10_000)]
+
+        bloom_filter.add_many(codes)
+
+        assert all(code in bloom_filter for code in codes)
+
+    def test_false_positive_rate_within_bound(self, tmp_path):
+        """Доля ложных срабатываний близка к заданной"""
+        bloom_filter = BloomFilter.create(str(tmp_path / "codes.bloom"), 10_000, 0.01)
+        bloom_filter.add_many(f"CODE{i}" for i in range(10_000))
+
+        false_positives = sum(f"MISSING{i}" in bloom_filter for i in range(10_000))
+
+        assert false_positives / 10_000 < 0.02
+        assert bloom_filter.stats().estimated_false_positive_rate < 0.02
+
+    def test_filter_is_shared_through_file(self, tmp_path):
+        """Второй экземпляр на том же файле видит добавленные коды"""
+        path = str(tmp_path / "codes.bloom")
+        writer = BloomFilter.create(path, 1000, 0.01)
+        reader = BloomFilter(path, 1000)
+
+        writer.add("SHARED")
+
+        assert "SHARED" in reader
+        assert "OTHER" not in reader
+
+    def test_optimal_parameters(self):
+        """Около 1.2 МБ на миллион кодов при доле ошибок 1%"""
+        bits, hash_count = BloomFilter.optimal_parameters(1_000_000, 0.01)
+
+        assert 1_150_000 < bits / 8 < 1_250_000
+        assert hash_count == 7
+
+    @pytest.mark.asyncio
+    async def test_open_or_build_reuses_filter_covered_by_feed(self, tmp_path):
+        """Файл переиспользуется, пока поток хранит все коды после его позиции"""
+        path = str(tmp_path / "codes.bloom")
+        redis = InMemoryStreamRedis()
+        feed = BloomFilterFeed(redis, "stream", maxlen=2)
+        await open_or_build(path, 1000, 0.01, code_chunks(["FIRST"]), feed)
+        built_at = os.stat(path).st_ino
+
+        bloom_filter = await open_or_build(path, 1000, 0.01, code_chunks(["SECOND"]), feed)
+        assert os.stat(path).st_ino == built_at
+        assert "FIRST" in bloom_filter
+        assert "SECOND" not in bloom_filter
+
+        # Метка фильтра вытеснена из потока: часть кодов после нее могла потеряться
+        await feed.publish(["A"])
+        await feed.publish(["B"])
+        bloom_filter = await open_or_build(path, 1000, 0.01, code_chunks(["SECOND"]), feed)
+        assert os.stat(path).st_ino != built_at
+        assert "SECOND" in bloom_filter
+
+    @pytest.mark.asyncio
+    async def test_codes_created_on_another_host_are_not_rejected(self, tmp_path):
+        """Код, созданный через другой хост, доходит до фильтра этого хоста"""
+        feed = BloomFilterFeed(InMemoryStreamRedis(), "stream", maxlen=100)
+        first, _ = await make_host(str(tmp_path / "first.bloom"), feed)
+        second, follower = await make_host(str(tmp_path / "second.bloom"), feed)
+
+        unit_of_work = ImmediateUnitOfWork()
+        inner = AsyncMock()
+        inner.bulk_create.return_value = ["REMOTE"]
+        repository = BloomFilteredPromoRepository(inner, first, feed, unit_of_work)
+        await repository.bulk_create(["REMOTE"], None, None)
+        await unit_of_work.commit()
+
+        await follower.step()
+
+        assert second.synced
+        assert not second.rejects("REMOTE")
+        assert second.rejects("MISSING")
+
+    @pytest.mark.asyncio
+    async def test_filter_fails_open_until_feed_is_back(self, tmp_path):
+        """Без потока фильтр не отвергает коды, а после сбоя Redis перестраивается"""
+        path = str(tmp_path / "codes.bloom")
+        redis = InMemoryStreamRedis()
+        redis.down = True
+        feed = BloomFilterFeed(redis, "stream", maxlen=100)
+        bloom_filter, follower = await make_host(path, feed, codes=["KNOWN"])
+
+        with pytest.raises(ConnectionError):
+            await follower.step()
+        assert not bloom_filter.rejects("MISSING")
+
+        redis.down = False
+        await follower.step()
+
+        assert bloom_filter.feed_id == redis.entries[0][0]
+        assert bloom_filter.rejects("MISSING")
+        assert not bloom_filter.rejects("KNOWN")
+
+    @pytest.mark.asyncio
+    async def test_follower_checks_feed_only_after_gap(self, tmp_path):
+        """Простаивающий follower только читает поток, полноту проверяет после отставания"""
+        redis = InMemoryStreamRedis()
+        feed = BloomFilterFeed(redis, "stream", maxlen=100)
+        _, follower = await make_host(str(tmp_path / "codes.bloom"), feed)
+
+        await follower.step()
+        redis.commands.clear()
+        await follower.step()
+        await follower.step()
+        assert redis.commands == ["xread", "xread"]
+
+        for i in range(11):
+            await feed.publish([f"CODE{i}"])
+        redis.commands.clear()
+        await follower.step()
+        await follower.step()
+        assert redis.commands == ["xread", "xrange", "xread"]
@@ -1,4 +1,5 @@
 import pytest
+from infra.db.engine import ConnectionBudgetExceeded, check_connection_budget, engine_options
 from sqlalchemy import text
 
 
@@ -8,3 +9,33 @@ async def test_database(db_session):
     result = await db_session.execute(text("SELECT current_database()"))
     value = result.scalar()
     assert value == "tests"
+
+
+@pytest.mark.asyncio
+async def test_connection_budget(async_engine):
+    await check_connection_budget(async_engine, required=10)
+
+    with pytest.raises(ConnectionBudgetExceeded):
+        await check_connection_budget(async_engine, required=100_000)
+
+
+def test_pgbouncer_mode_disables_statement_cache():
+    options = engine_options(
+        pool_size=5,
+        max_overflow=10,
+        pool_timeout=30.0,
+        pool_recycle=-1,
+        pool_pre_ping=True,
+        prepared_statement_cache_size=100,
+        statement_timeout_ms=5000,
+        pgbouncer=True,
+    )
+    connect_args = options["connect_args"]
+
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["statement_cache_size"] == 0
+    assert (
+        connect_args["prepared_statement_name_func"]()
+        != connect_args["prepared_statement_name_func"]()
+    )
+    assert connect_args["server_settings"] == {"statement_timeout": "5000"}
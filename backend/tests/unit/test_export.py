@@ -0,0 +1,63 @@
+import gzip
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import orjson
+import pytest
+from application.services.export import encode_export
+from domain.enums import ExportFormat, PromoStatus, UcAmount
+
+ROW = (
+    uuid4(),
+    "CODE123",
+    UcAmount.UC300,
+    PromoStatus.ACTIVE,
+    datetime(2030, 1, 1, tzinfo=timezone.utc),
+    None,
+    None,
+    datetime(2025, 1, 1),
+)
+
+
+async def partitions(count: int = 2):
+    for _ in range(count):
+        yield [ROW, ROW]
+
+
+async def collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+class TestPromoExport:
+    """Тесты для потоковой выгрузки промокодов"""
+
+    @pytest.mark.asyncio
+    async def test_ndjson_export(self):
+        """Каждая строка NDJSON - отдельный JSON-объект"""
+        body = await collect(encode_export(partitions(), ExportFormat.NDJSON))
+        lines = body.splitlines()
+
+        assert len(lines) == 4
+        item = orjson.loads(lines[0])
+        assert item["id"] == str(ROW[0])
+        assert item["uc_amount"] == "325UC"
+        assert item["status"] == "active"
+        assert item["used_by"] is None
+
+    @pytest.mark.asyncio
+    async def test_csv_export(self):
+        """CSV содержит заголовок и значения перечислений"""
+        body = await collect(encode_export(partitions(), ExportFormat.CSV))
+        lines = body.decode().splitlines()
+
+        assert lines[0] == "id,code,uc_amount,status,expires_at,used_by,used_at,created_at"
+        assert len(lines) == 5
+        assert ",325UC,active," in lines[1]
+
+    @pytest.mark.asyncio
+    async def test_gzip_export(self):
+        """Сжатая выгрузка распаковывается в тот же NDJSON"""
+        plain = await collect(encode_export(partitions(), ExportFormat.NDJSON))
+        compressed = await collect(encode_export(partitions(), ExportFormat.NDJSON, compress=True))
+
+        assert gzip.decompress(compressed) == plain
@@ -0,0 +1,163 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from api.middleware import IdempotencyMiddleware
+from infra.cache.idempotency import IdempotencyStore
+from redis.exceptions import ConnectionError
+
+
+class InMemoryRedis:
+    """Минимальная замена Redis для set/get/delete"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+class FailingRedis:
+    async def set(self, *args, **kwargs):
+        raise ConnectionError("redis is down")
+
+
+class CountingApp:
+    """Маршрут, который отвечает телом с номером вызова"""
+
+    def __init__(self, status=200, delay=0.0):
+        self.calls = 0
+        self.status = status
+        self.delay = delay
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        request = await receive()
+        await asyncio.sleep(self.delay)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        body = b'{"call":%d,"request":"%s"}' % (self.calls, request["body"])
+        await send({"type": "http.response.body", "body": body})
+
+
+def make_store(redis=None):
+    return IdempotencyStore(
+        redis or InMemoryRedis(), ttl_seconds=60, lock_seconds=5, wait_seconds=1, poll_interval=0.01
+    )
+
+
+def make_scope(store, key=b"retry-1", path="/promocode/code/ABC/use", query=b"user_id=42"):
+    state = SimpleNamespace(dishka_container=SimpleNamespace(get=AsyncMock(return_value=store)))
+    headers = [(b"idempotency-key", key)] if key else []
+    return {
+        "type": "http",
+        "method": "POST",
+        "path": path,
+        "query_string": query,
+        "headers": headers,
+        "app": SimpleNamespace(state=state),
+    }
+
+
+async def call(middleware, scope, body=b""):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages[0], b"".join(m.get("body", b"") for m in messages[1:])
+
+
+class TestIdempotencyMiddleware:
+    """Тесты повтора ответов по Idempotency-Key"""
+
+    @pytest.mark.asyncio
+    async def test_retry_replays_first_response(self):
+        app = CountingApp()
+        middleware = IdempotencyMiddleware(app)
+        store = make_store()
+
+        first_start, first_body = await call(middleware, make_scope(store))
+        retry_start, retry_body = await call(middleware, make_scope(store))
+
+        assert app.calls == 1
+        assert retry_body == first_body
+        assert retry_start["status"] == first_start["status"]
+        assert (b"idempotent-replayed", b"true") in retry_start["headers"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_wait_for_first_result(self):
+        app = CountingApp(delay=0.05)
+        middleware = IdempotencyMiddleware(app)
+        store = make_store()
+
+        results = await asyncio.gather(*(call(middleware, make_scope(store)) for _ in range(5)))
+
+        assert app.calls == 1
+        assert {body for _, body in results} == {b'{"call":1,"request":""}'}
+
+    @pytest.mark.asyncio
+    async def test_server_error_is_not_stored(self):
+        app = CountingApp(status=500)
+        middleware = IdempotencyMiddleware(app)
+        store = make_store()
+
+        await call(middleware, make_scope(store))
+        await call(middleware, make_scope(store))
+
+        assert app.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_same_key_with_other_body_is_rejected(self):
+        app = CountingApp()
+        middleware = IdempotencyMiddleware(app)
+        store = make_store()
+        scope = make_scope(store, path="/api/v1/set_by_user_card", query=b"")
+
+        _, body = await call(middleware, scope, body=b'{"tg_id":1}')
+        start, _ = await call(middleware, scope, body=b'{"tg_id":2}')
+
+        assert body == b'{"call":1,"request":"{"tg_id":1}"}'
+        assert start["status"] == 422
+        assert app.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_requests_without_key_are_not_stored(self):
+        app = CountingApp()
+        middleware = IdempotencyMiddleware(app)
+        store = make_store()
+
+        await call(middleware, make_scope(store, key=None))
+        await call(middleware, make_scope(store, key=None))
+
+        assert app.calls == 2
+        assert store.redis.values == {}
+
+    @pytest.mark.asyncio
+    async def test_request_runs_when_redis_is_down(self):
+        app = CountingApp()
+        middleware = IdempotencyMiddleware(app)
+
+        start, _ = await call(middleware, make_scope(make_store(FailingRedis())))
+
+        assert start["status"] == 200
+        assert app.calls == 1
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pytest
+from api.middleware import MetricsMiddleware
+from infra.metrics.db import _statement_kind
+from prometheus_client import REGISTRY
+
+
+def duration_count(method, route, status):
+    value = REGISTRY.get_sample_value(
+        "http_request_duration_seconds_count",
+        {"method": method, "route": route, "status": status},
+    )
+    return value or 0.0
+
+
+def route_app(path_format, status=200):
+    async def app(scope, receive, send):
+        if path_format is not None:
+            scope["route"] = SimpleNamespace(path_format=path_format)
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    return app
+
+
+async def call(app, path, method="GET"):
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    await app({"type": "http", "method": method, "path": path}, receive, send)
+
+
+class TestMetricsMiddleware:
+    """Тесты метрик HTTP-запросов"""
+
+    @pytest.mark.asyncio
+    async def test_observes_route_template_and_status(self):
+        before = duration_count("GET", "/promocode/code/{promo_code}", "404")
+
+        await call(
+            MetricsMiddleware(route_app("/promocode/code/{promo_code}", status=404)),
+            "/promocode/code/ABC",
+        )
+
+        assert duration_count("GET", "/promocode/code/{promo_code}", "404") == before + 1
+
+    @pytest.mark.asyncio
+    async def test_unmatched_paths_share_one_label(self):
+        before = duration_count("POST", "unmatched", "404")
+
+        await call(MetricsMiddleware(route_app(None, status=404)), "/random/1", method="POST")
+        await call(MetricsMiddleware(route_app(None, status=404)), "/random/2", method="POST")
+
+        assert duration_count("POST", "unmatched", "404") == before + 2
+
+    @pytest.mark.asyncio
+    async def test_failed_request_is_counted_as_server_error(self):
+        async def failing_app(scope, receive, send):
+            raise RuntimeError("boom")
+
+        before = duration_count("GET", "unmatched", "500")
+
+        with pytest.raises(RuntimeError):
+            await call(MetricsMiddleware(failing_app), "/promocode/")
+
+        assert duration_count("GET", "unmatched", "500") == before + 1
+
+
+@pytest.mark.parametrize(
+    "statement, kind",
+    [
+        ("SELECT promo_codes.id FROM promo_codes", "SELECT"),
+        ("\n  WITH candidate AS (SELECT 1) UPDATE promo_codes SET", "WITH"),
+        ("insert into outbox_events values ($1)", "INSERT"),
+        ("SET enable_seqscan = off", "OTHER"),
+        ("", "OTHER"),
+    ],
+)
+def test_statement_kind(statement, kind):
+    assert _statement_kind(statement) == kind
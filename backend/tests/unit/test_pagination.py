@@ -0,0 +1,28 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from domain.exceptions import InvalidCursorException
+from domain.values import PageCursor
+
+
+class TestPageCursor:
+    """Тесты для курсора keyset-пагинации"""
+
+    def test_encode_decode_roundtrip(self):
+        """Курсор после кодирования декодируется в то же значение"""
+        cursor = PageCursor(sort_key=datetime(2025, 1, 2, 3, 4, 5, 678), oid=uuid4())
+
+        assert PageCursor.decode(cursor.encode()) == cursor
+
+    def test_encoded_cursor_is_url_safe(self):
+        """Закодированный курсор не требует экранирования в URL"""
+        token = PageCursor(sort_key=datetime.now(), oid=uuid4()).encode()
+
+        assert all(ch.isalnum() or ch in "-_" for ch in token)
+
+    @pytest.mark.parametrize("token", ["garbage", "", "W10", "WyJ4IiwieSJd"])
+    def test_decode_invalid_cursor_raises_error(self, token):
+        """Некорректный курсор вызывает ошибку"""
+        with pytest.raises(InvalidCursorException):
+            PageCursor.decode(token)
@@ -0,0 +1,100 @@
+import asyncio
+
+import orjson
+import pytest
+from api.middleware import ProfilingMiddleware
+from application.create_app import create_app
+from settings.config import settings
+
+
+async def slow_app(scope, receive, send):
+    await asyncio.sleep(0.01)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b'{"ok":true}'})
+
+
+def make_middleware(tmp_path, sample_rate=0.0, trace_allocations=False):
+    return ProfilingMiddleware(
+        slow_app,
+        header="X-Profile",
+        sample_rate=sample_rate,
+        interval=0.001,
+        output_dir=str(tmp_path),
+        trace_allocations=trace_allocations,
+    )
+
+
+async def call(middleware, headers=()):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/promocode/code/ABC",
+        "query_string": b"",
+        "headers": list(headers),
+    }
+    await middleware(scope, receive, send)
+    return dict(messages[0]["headers"]), b"".join(m.get("body", b"") for m in messages[1:])
+
+
+class TestProfilingMiddleware:
+    """Тесты профилирования запросов"""
+
+    @pytest.mark.asyncio
+    async def test_requests_without_header_are_not_profiled(self, tmp_path):
+        headers, body = await call(make_middleware(tmp_path))
+
+        assert body == b'{"ok":true}'
+        assert b"x-profile-file" not in headers
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_header_writes_speedscope_file(self, tmp_path):
+        headers, body = await call(
+            make_middleware(tmp_path, trace_allocations=True), [(b"x-profile", b"1")]
+        )
+
+        profile = tmp_path / headers[b"x-profile-file"].decode()
+        assert body == b'{"ok":true}'
+        assert orjson.loads(profile.read_bytes())["$schema"].endswith("file-format-schema.json")
+        assert headers[b"x-profile-memory"].startswith(b"peak=")
+        assert len(list(tmp_path.glob("*.alloc.txt"))) == 1
+
+    @pytest.mark.asyncio
+    async def test_inline_profile_replaces_response(self, tmp_path):
+        headers, body = await call(make_middleware(tmp_path), [(b"x-profile", b"speedscope")])
+
+        assert headers[b"content-type"] == b"application/json"
+        assert "profiles" in orjson.loads(body)
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_sampling_profiles_without_header(self, tmp_path):
+        headers, _ = await call(make_middleware(tmp_path, sample_rate=1.0))
+
+        assert (tmp_path / headers[b"x-profile-file"].decode()).exists()
+
+    @pytest.mark.asyncio
+    async def test_create_app_wires_profiling(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings.profiling, "enabled", True)
+        monkeypatch.setattr(settings.profiling, "output_dir", str(tmp_path))
+        monkeypatch.setattr(settings.rate_limit, "enabled", False)
+        monkeypatch.setattr(settings.idempotency, "enabled", False)
+        app = create_app()
+
+        @app.get("/promocode/code/{code}")
+        async def lookup(code: str):
+            await asyncio.sleep(0.01)
+            return {"ok": True}
+
+        headers, body = await call(app, [(b"x-profile", b"1")])
+
+        assert body == b'{"ok":true}'
+        assert (tmp_path / headers[b"x-profile-file"].decode()).exists()
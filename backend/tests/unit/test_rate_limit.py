@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from api.middleware import RateLimitMiddleware
+from infra.cache.rate_limit import RateLimitDecision, TokenBucket, TokenBucketRateLimiter
+from redis.exceptions import ConnectionError
+
+USER_BUCKET = TokenBucket(rate=1, capacity=5)
+IP_BUCKET = TokenBucket(rate=10, capacity=50)
+
+
+class FailingScriptRedis:
+    """Redis, в котором любой вызов скрипта падает"""
+
+    def register_script(self, script):
+        return AsyncMock(side_effect=ConnectionError("redis is down"))
+
+
+def make_scope(limiter, path, method="POST", query_string=b"user_id=42"):
+    state = SimpleNamespace(dishka_container=SimpleNamespace(get=AsyncMock(return_value=limiter)))
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query_string,
+        "headers": [],
+        "client": ("10.0.0.1", 50000),
+        "app": SimpleNamespace(state=state),
+    }
+
+
+async def call(middleware, scope):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages
+
+
+@pytest.fixture
+def inner_app():
+    return AsyncMock()
+
+
+def make_limiter(decision):
+    limiter = AsyncMock(spec=TokenBucketRateLimiter)
+    limiter.acquire.return_value = decision
+    return limiter
+
+
+class TestRateLimitMiddleware:
+    """Тесты ограничения частоты погашений"""
+
+    @pytest.mark.asyncio
+    async def test_throttled_request_does_not_reach_app(self, inner_app):
+        """Отклоненный запрос получает 429 и не доходит до маршрутов и сессии БД"""
+        limiter = make_limiter(RateLimitDecision(allowed=False, retry_after_seconds=0.2))
+        middleware = RateLimitMiddleware(inner_app, USER_BUCKET, IP_BUCKET)
+
+        messages = await call(middleware, make_scope(limiter, "/promocode/code/ABC/use"))
+
+        inner_app.assert_not_awaited()
+        assert messages[0]["status"] == 429
+        assert (b"retry-after", b"1") in messages[0]["headers"]
+
+    @pytest.mark.asyncio
+    async def test_checks_user_and_ip_buckets_together(self, inner_app):
+        limiter = make_limiter(RateLimitDecision(allowed=True))
+        middleware = RateLimitMiddleware(inner_app, USER_BUCKET, IP_BUCKET)
+
+        await call(middleware, make_scope(limiter, "/promocode/0b6e/use"))
+
+        limiter.acquire.assert_awaited_once_with(
+            [("user:42", USER_BUCKET), ("ip:10.0.0.1", IP_BUCKET)]
+        )
+        inner_app.assert_awaited_once()
+
+    @pytest.mark.parametrize(
+        "method, path",
+        [("GET", "/promocode/code/ABC"), ("POST", "/promocode/"), ("GET", "/promocode/0b6e/use")],
+    )
+    @pytest.mark.asyncio
+    async def test_other_routes_are_not_limited(self, inner_app, method, path):
+        limiter = make_limiter(RateLimitDecision(allowed=False))
+        middleware = RateLimitMiddleware(inner_app, USER_BUCKET, IP_BUCKET)
+
+        await call(middleware, make_scope(limiter, path, method=method))
+
+        limiter.acquire.assert_not_awaited()
+        inner_app.assert_awaited_once()
+
+
+class TestTokenBucketRateLimiter:
+    """Тесты ограничителя на корзинах жетонов"""
+
+    @pytest.mark.asyncio
+    async def test_allows_requests_when_redis_is_down(self):
+        limiter = TokenBucketRateLimiter(FailingScriptRedis())
+
+        decision = await limiter.acquire([("user:42", USER_BUCKET)])
+
+        assert decision.allowed
+
+    @pytest.mark.asyncio
+    async def test_passes_bucket_parameters_to_script(self):
+        redis = FailingScriptRedis()
+        limiter = TokenBucketRateLimiter(redis)
+        limiter._script = AsyncMock(return_value=[0, 250])
+
+        decision = await limiter.acquire([("user:42", USER_BUCKET), ("ip:1", IP_BUCKET)])
+
+        limiter._script.assert_awaited_once_with(
+            keys=["ratelimit:user:42", "ratelimit:ip:1"], args=[1, 5, 10, 50]
+        )
+        assert decision == RateLimitDecision(allowed=False, retry_after_seconds=0.25)
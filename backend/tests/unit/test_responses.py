@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from api.responses import promo_json, promo_list_json
+from api.schemas import PromoListResponse, PromoResponse, PromoShortResponse
+from asyncpg.pgproto.pgproto import UUID as AsyncpgUUID
+from domain.entities import PromoEntity
+from domain.enums import PromoStatus, UcAmount
+from domain.services import PromoValidator
+from domain.values import PromoListRow
+
+ROWS = [
+    PromoListRow(
+        oid=AsyncpgUUID(str(uuid4())),
+        code="FAST1",
+        uc_amount=UcAmount.UC300,
+        status=PromoStatus.ACTIVE,
+        expires_at=datetime(2030, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+        created_at=datetime(2025, 1, 1),
+    ),
+    PromoListRow(
+        oid=AsyncpgUUID(str(uuid4())),
+        code="FAST2",
+        uc_amount=UcAmount.UC60,
+        status=PromoStatus.EXPIRED,
+        expires_at=datetime(2030, 1, 1, tzinfo=timezone(timedelta(hours=3))),
+        created_at=datetime(2025, 1, 2),
+    ),
+]
+
+
+class TestFastResponses:
+    """Быстрый путь должен отдавать те же байты, что модели ответа"""
+
+    def test_promo_list_matches_response_model(self):
+        expected = PromoListResponse(
+            items=[
+                PromoShortResponse(
+                    id=row.oid,
+                    code=row.code,
+                    uc_amount=row.uc_amount,
+                    expires_at=row.expires_at,
+                    status=row.status,
+                )
+                for row in ROWS
+            ],
+            next_cursor="cursor",
+        )
+
+        assert promo_list_json(ROWS, "cursor") == expected.model_dump_json().encode()
+        assert promo_list_json([], None) == b'{"items":[],"next_cursor":null}'
+
+    def test_promo_matches_response_model(self):
+        promo = PromoEntity.create("FAST3", UcAmount.UC600, duration_days=7)
+        used = PromoEntity.create("FAST4", UcAmount.UC600, duration_days=7)
+        used.use("user-1", PromoValidator())
+
+        for entity in (promo, used):
+            expected = PromoResponse(
+                id=UUID(entity.oid),
+                code=entity.code,
+                uc_amount=entity.uc_amount,
+                expires_at=entity.expires_at,
+                status=entity.status,
+                used_by=entity.usage.used_by,
+                used_at=entity.usage.used_at,
+            )
+            assert promo_json(entity) == expected.model_dump_json().encode()
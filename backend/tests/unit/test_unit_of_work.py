@@ -0,0 +1,26 @@
+import pytest
+from infra.db.repositories import SqlAlchemyUnitOfWork
+from sqlalchemy import text
+
+
+@pytest.mark.asyncio
+async def test_after_commit_runs_once_committed(db_session):
+    """Действия выполняются после коммита один раз; сбой одного не мешает остальным"""
+    unit_of_work = SqlAlchemyUnitOfWork(db_session)
+    calls = []
+
+    async def failing():
+        raise RuntimeError("redis is down")
+
+    async def record():
+        calls.append(db_session.in_transaction())
+
+    await db_session.execute(text("SELECT 1"))
+    unit_of_work.after_commit(failing)
+    unit_of_work.after_commit(record)
+    assert calls == []
+
+    await unit_of_work.commit()
+    await unit_of_work.commit()
+
+    assert calls == [False]